@@ -1,4 +1,3 @@
-from bs4 import BeautifulSoup
 import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -6,207 +5,188 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+import requests
 import traceback
+import os
+
+from ao_scraping import tables
+from ao_scraping.cache import HttpCache, fetch_page
+from ao_scraping.driver_pool import DRIVER_PATH_ENV
+from ao_scraping.rankings import fast_frame, ranking_urls
+
+LEADERS_URL = "https://www.tennisabstract.com/cgi-bin/leaders.cgi"
+
+# Top 100, 50 players per page
+target_urls = ranking_urls(LEADERS_URL, max_rank=100)
+
+OUTPUT_CSV = "ao_atp_rankings_data.csv"
+
+# As the table data is loaded and rendered after the initial page load -> selenium and chromedriver,
+# when the fast path can't read the data from the page's script (CHROMEDRIVER_PATH overrides the path)
+DRIVER_PATH = os.environ.get(DRIVER_PATH_ENV, r"F:\mainProjects\AOFever\DataScraping\chromedriver.exe")
+
+# Rendered 'tablesorter' table: column -> how to read it from the row's cells
+TABLE_SPEC = {
+    'table_class': 'tablesorter',
+    'table_index': 0,
+    # Skip rows that don't have enough data cells
+    'min_cells': 19,
+    # Skip rows with "partially empty" critical columns: Rank, Player_Name, Country_Code, Total_Matches
+    'required': [0, 1, 2, 3],
+    'columns': {
+        "Rank": tables.cell_text(0),
+        # Player name is the link, the country the second span, e.g. [ITA]
+        "Player_Name": tables.link_text(1),
+        "Country_Code": tables.span_text(1, 1, '[]'),
+        "Total_Matches": tables.link_text(2),
+        "Win-Loss": tables.cell_text(3),
+        "Win-Loss_Percentage": tables.cell_text(4),
+        "Service_Points_Won_Percentage": tables.cell_text(5),
+        "Ace_Rate_Percentage": tables.cell_text(8),
+        "Double_Fault_Rate": tables.cell_text(10),
+        "First_Serves_In_Percentage": tables.cell_text(12),
+        "First_Serve_Points_Won_Percentage": tables.cell_text(13),
+        "Second_Serve_Points_Won_Percentage": tables.cell_text(14),
+        "Service_Games_Won_Percentage": tables.cell_text(16),
+        "Points_Per_Service_Game": tables.cell_text(17),
+        "Points_Lost_Per_Service_Game": tables.cell_text(18),
+    },
+    'dtypes': {"Rank": 'Int64', "Total_Matches": 'Int64'},
+}
+
+cleaned_headers = list(TABLE_SPEC['columns'])
+
+
+def make_chrome_options():
+    chrome_options = Options()
+
+    # Run Chrome in headless mode
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36") # Add User-Agent
+    return chrome_options
+
+
+def fetch_rendered(driver, url):
+    """Page source of url once JavaScript has rendered the 'tablesorter' table"""
+    driver.get(url)
+
+    print("Waiting for table to load...")
+    WebDriverWait(driver, 20).until(
+        EC.presence_of_element_located((By.CLASS_NAME, "tablesorter"))
+    )
+    print("Table element found. Getting page source...")
+
+    # Get the page source after JavaScript has rendered the table
+    return driver.page_source
+
+
+def parse_page(html_content, url):
+    """Rows of the rendered 'tablesorter' table as a DataFrame, None when the table is missing"""
+    rankings_df = tables.extract_table(html_content, TABLE_SPEC, url)
+    if rankings_df is None:
+        print(f"Error: Could not find the main 'tablesorter' table on {url}.")
+        print("Skipping this URL and proceeding to the next if available.")
+    return rankings_df
+
+
+def save(frames, path=OUTPUT_CSV):
+    if frames:
+        # Use ignore_index=True to reset DataFrame index
+        stat_df = pd.concat(frames, ignore_index=True)
+        stat_df.to_csv(path, index=False)
+        print(f"\nAll data successfully saved to {path}")
+        print("\nFirst 5 rows of the combined DataFrame:")
+        print(stat_df.head())
+        print(f"\nTotal rows in combined DataFrame: {len(stat_df)}")
+    else:
+        print("No data was extracted from any URL.")
+
+
+def scrape_rendered(urls):
+    """Frames of urls rendered in Chrome, for pages the fast path couldn't read"""
+    frames = {}
+
+    # service object for the ChromeDriver
+    service = Service(DRIVER_PATH)
+
+    # Driver init
+    driver = None
+
+    try:
+        print("Starting WebDriver...")
+        driver = webdriver.Chrome(service=service, options=make_chrome_options())
+        print("WebDriver started.")
+
+        # Loop through each target URL
+        for url in urls:
+            print(f"\n--- Rendering URL: {url} ---")
+            try:
+                current_url_df = parse_page(fetch_rendered(driver, url), url)
+                if current_url_df is None:
+                    continue # Skip to the next URL in the list
+
+                frames[url] = current_url_df
+
+            except Exception as e:
+                print(f"Error processing URL {url}: {e}")
+                # Print full traceback for unexpected errors
+                traceback.print_exc()
+                # Continue to the next URL in the loop even if this one fails
+                continue
+
+    except Exception as e:
+        print(f"Fatal error during WebDriver setup or overall process: {e}")
+        traceback.print_exc()
+    finally:
+        if driver:
+            print("\nClosing chromedriver")
+            driver.quit()
+            print("chromedriver closed.")
+
+    return frames
+
+
+def main():
+    ao_atp_rankings = []
 
-ao_atp_rankings = []
+    cache = HttpCache()
 
-target_urls = [
-    "https://www.tennisabstract.com/cgi-bin/leaders.cgi",
-    "https://www.tennisabstract.com/cgi-bin/leaders.cgi?players=51-100"
-]
+    # The table's rows ship in the page's script payload, a plain download is enough unless that fails validation
+    downloaded = []
+    for url in target_urls:
+        print(f"\n--- Downloading URL: {url} ---")
+        try:
+            downloaded.append((url, fetch_page(url, cache)))
+        except requests.exceptions.RequestException as e:
+            print(f"Error: An error occurred during the request to {url}: {e}")
 
-# As the table data is loaded and rendered after the initial page load -> selenium and chromedriver
-DRIVER_PATH = r"F:\mainProjects\AOFever\DataScraping\chromedriver.exe"
+    if len(downloaded) == len(target_urls) and cache.unchanged(target_urls, OUTPUT_CSV):
+        print(f"\nAll pages are unchanged since the last run, keeping {OUTPUT_CSV}")
+        return
 
-chrome_options = Options()
+    frames = {}
+    for url, html_content in downloaded:
+        current_url_df = fast_frame(html_content, url, parse_page, cleaned_headers)
+        if current_url_df is not None:
+            frames[url] = current_url_df
 
-# Run Chrome in headless mode
-chrome_options.add_argument("--headless")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36") # Add User-Agent
+    # Chrome fallback for pages that failed to download or to validate
+    needs_browser = [url for url in target_urls if url not in frames]
+    if needs_browser:
+        frames.update(scrape_rendered(needs_browser))
 
-# service object for the ChromeDriver
-service = Service(DRIVER_PATH)
+    for url in target_urls:
+        if url in frames:
+            ao_atp_rankings.append(frames[url])
+            print(f"Successfully scraped {len(frames[url])} rows from {url}.")
 
-# Driver init
-driver = None
+    save(ao_atp_rankings)
+    # Pages only count as seen once their rows are in the written CSV, the others are parsed again next run
+    if ao_atp_rankings:
+        cache.commit([url for url in target_urls if url in frames], OUTPUT_CSV)
 
-try:
-    print("Starting WebDriver...")
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    print("WebDriver started.")
 
-    # Loop through each target URL
-    for url in target_urls:
-        print(f"\n--- Processing URL: {url} ---")
-        try:
-            driver.get(url)
-
-            print("Waiting for table to load...")
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "tablesorter"))
-            )
-            print("Table element found. Getting page source...")
-
-            # Get the page source after JavaScript has rendered the table
-            html_content = driver.page_source
-
-            soup = BeautifulSoup(html_content, 'lxml')
-
-            rankings_tables = soup.find_all('table', {'class': 'tablesorter'})
-
-            table = None
-            if rankings_tables:
-                table = rankings_tables[0]
-
-            if table is None:
-                print(f"Error: Could not find the main 'tablesorter' table on {url}.")
-                print("Skipping this URL and proceeding to the next if available.")
-                continue # Skip to the next URL in the list
-
-            cleaned_headers = [
-                "Rank",
-                "Player_Name",
-                "Country_Code",
-                "Total_Matches",
-                "Win-Loss",
-                "Win-Loss_Percentage",
-                "Service_Points_Won_Percentage",
-                "Ace_Rate_Percentage",
-                "Double_Fault_Rate",
-                "First_Serves_In_Percentage",
-                "First_Serve_Points_Won_Percentage",
-                "Second_Serve_Points_Won_Percentage",
-                "Service_Games_Won_Percentage",
-                "Points_Per_Service_Game",
-                "Points_Lost_Per_Service_Game"
-            ]
-
-            # Temporary list for rows from the current URL
-            rows_for_current_url = [] 
-
-            for tr in table.find_all('tr')[1:]:
-                cells = tr.find_all('td')
-
-                if len(cells) < 19:
-                    continue # Skip rows that don't have enough data cells
-
-                row_data = []
-
-                # Rank
-                rank = cells[0].get_text(strip=True)
-                row_data.append(rank)
-
-                # Player Name and Country
-                player_name = ''
-                country_code = ''
-
-                player_tag = cells[1].find('a')
-                if player_tag:
-                    player_name = player_tag.get_text(strip=True)
-
-                all_spans_in_player_cell = cells[1].find_all('span')
-                if len(all_spans_in_player_cell) >= 2:
-                    country_text_with_brackets = all_spans_in_player_cell[1].get_text(strip=True)
-                    country_code = country_text_with_brackets.strip('[]')
-
-                row_data.append(player_name)
-                row_data.append(country_code)
-
-                # Total Matches
-                total_matches_tag = cells[2].find('a')
-                total_matches = total_matches_tag.get_text(strip=True) if total_matches_tag else ""
-                row_data.append(total_matches)
-
-                # Win-Loss
-                win_loss = cells[3].get_text(strip=True)
-                row_data.append(win_loss)
-
-                # Win-Loss %
-                win_loss_percentage = cells[4].get_text(strip=True)
-                row_data.append(win_loss_percentage)
-
-                # Service Points Won %
-                service_points_won_percentage = cells[5].get_text(strip=True)
-                row_data.append(service_points_won_percentage)
-
-                # Ace Rate %
-                ace_rate_percentage = cells[8].get_text(strip=True)
-                row_data.append(ace_rate_percentage)
-
-                # Double Fault Rate %
-                double_fault_rate = cells[10].get_text(strip=True)
-                row_data.append(double_fault_rate)
-
-                # First Serves In %
-                first_serves_in_percentage = cells[12].get_text(strip=True)
-                row_data.append(first_serves_in_percentage)
-
-                # First Serve Points Won %
-                first_serve_points_won_percentage = cells[13].get_text(strip=True)
-                row_data.append(first_serve_points_won_percentage)
-
-                # Second Serve Points Won %
-                second_serve_points_won_percentage = cells[14].get_text(strip=True)
-                row_data.append(second_serve_points_won_percentage)
-
-                # Service Games Won %
-                service_games_won_percentage = cells[16].get_text(strip=True)
-                row_data.append(service_games_won_percentage)
-
-                # Points Per Service Game
-                points_per_service_game = cells[17].get_text(strip=True)
-                row_data.append(points_per_service_game)
-
-                # Points Lost Per Service Game
-                points_lost_per_service_game = cells[18].get_text(strip=True)
-                row_data.append(points_lost_per_service_game)
-
-                # Check for "partially empty" critical columns
-                # Rank, Player_Name, Country_Code, Total_Matches
-                critical_data_indices = [0, 1, 2, 3] 
-
-                skip_current_row_data = False
-                for index in critical_data_indices:
-                    if not row_data[index]:
-                        skip_current_row_data = True
-                        print(f"Skipping row data in {url} due to empty critical data at index {index}: {row_data}")
-                        break
-
-                if skip_current_row_data:
-                    continue
-
-                # Add to the temporary list for this URL
-                rows_for_current_url.append(row_data)
-
-            current_url_df = pd.DataFrame(rows_for_current_url, columns=cleaned_headers)
-            ao_atp_rankings.append(current_url_df)
-            print(f"Successfully scraped {len(rows_for_current_url)} rows from {url}.")
-
-        except Exception as e:
-            print(f"Error processing URL {url}: {e}")
-            # Print full traceback for unexpected errors
-            traceback.print_exc()
-            # Continue to the next URL in the loop even if this one fails
-            continue
-
-except Exception as e:
-    print(f"Fatal error during WebDriver setup or overall process: {e}")
-    traceback.print_exc()
-finally:
-    if driver:
-        print("\nClosing chromedriver")
-        driver.quit()
-        print("chromedriver closed.")
-
-if ao_atp_rankings:
-    # Use ignore_index=True to reset DataFrame index
-    stat_df = pd.concat(ao_atp_rankings, ignore_index=True)
-    stat_df.to_csv("ao_atp_rankings_data.csv", index=False)
-    print("\nAll data successfully saved to ao_atp_rankings_data.csv")
-    print("\nFirst 5 rows of the combined DataFrame:")
-    print(stat_df.head())
-    print(f"\nTotal rows in combined DataFrame: {len(stat_df)}")
-else:
-    print("No data was extracted from any URL.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
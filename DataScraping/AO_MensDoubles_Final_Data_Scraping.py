@@ -1,10 +1,10 @@
-from bs4 import BeautifulSoup
 import pandas as pd
 import requests
-import sys
-import re
 import pycountry
 
+from ao_scraping import tables
+from ao_scraping.cache import HttpCache, fetch_page
+
 def convert_country_to_iso3(country_name):
     """Convert country name to 3-letter ISO code using pycountry"""
     if not country_name or country_name.strip() == "":
@@ -63,118 +63,79 @@ def convert_countries_list_to_iso3(countries_string):
 
 # Scraping start
 
-ao_mensdoubles_finals_data = []  # List to store all finals data
-
 target_url = "https://en.wikipedia.org/wiki/List_of_Australian_Open_men%27s_doubles_champions"
 
-try:
-    html_content = requests.get(target_url).text
+OUTPUT_CSV = "australian_open_mens_doubles_finals_data.csv"
+
+# Finals table: column -> how to read it from the row's cells
+TABLE_SPEC = {
+    'table_class': 'sortable wikitable',
+    'table_index': 2,
+    # Skip rows that are not data rows (e.g., "No competition" rows)
+    'min_cells': 4,
+    'columns': {
+        "Year": tables.cell_text(0),
+        # Flag images and player names of the Champions column, countries converted to ISO3 codes
+        "Champions_Countries": tables.flag_countries(1, convert_country_to_iso3),
+        "Champions": tables.flag_names(1),
+        "Runners_up_Countries": tables.flag_countries(2, convert_country_to_iso3),
+        "Runners-up": tables.flag_names(2),
+        # Removes any bracketed references like '[14]'
+        "Score_in_final": tables.without_references(3),
+    },
+    'dtypes': {"Year": 'Int64'},
+}
+
+cleaned_headers = list(TABLE_SPEC['columns'])
+
+
+def parse_page(html_content, url=target_url):
+    """'Open era' finals table of the page as a DataFrame, None when the table is missing"""
+    finals_df = tables.extract_table(html_content, TABLE_SPEC, url)
+    if finals_df is None:
+        print("Error: Could not find the 'Open era' table on the Wikipedia page.")
+        print("Expected to find at least two tables with 'sortable wikitable' classes.")
+    return finals_df
+
+
+def save(frames, path=OUTPUT_CSV):
+    if frames:
+        stat_df = pd.concat(frames)
+        # Output to CSV
+        stat_df.to_csv(path, index=False)
+        print(f"Data successfully saved to {path}")
+        print("\nFirst 5 rows of the DataFrame:")
+        print(stat_df.head())
+    else:
+        print("No data was extracted.")
+
+
+def main():
+    ao_mensdoubles_finals_data = []  # List to store all finals data
+
+    cache = HttpCache()
 
     try:
-        soup = BeautifulSoup(html_content, 'lxml')
+        # Conditional request through the on-disk cache, an unchanged page keeps the CSV written from it
+        html_content = fetch_page(target_url, cache)
+        if cache.unchanged([target_url], OUTPUT_CSV):
+            print(f"{target_url} is unchanged since the last run, keeping {OUTPUT_CSV}")
+            return
+
+        ao_mensdoubles_final_data_df = parse_page(html_content)
+        if ao_mensdoubles_final_data_df is not None:
+            ao_mensdoubles_finals_data.append(ao_mensdoubles_final_data_df)
+
+    except requests.exceptions.RequestException as e:
+        print(f"Error: An error occurred during the request to {target_url}: {e}")
     except Exception as e:
-        print(f"Error: lxml parser not found or an issue occurred with it. Please ensure it's installed by running: pip install lxml. Details: {e}")
-        sys.exit()
+        print(f"Error: An unexpected error occurred: {e}")
 
-    # Find all tables with the classes 'sortable wikitable'
-    all_championship_tables = soup.find_all('table', {'class': 'sortable wikitable'})
+    save(ao_mensdoubles_finals_data)
+    # The page only counts as seen once its CSV is written
+    if ao_mensdoubles_finals_data:
+        cache.commit([target_url], OUTPUT_CSV)
 
-    table = None
-    if len(all_championship_tables) > 2:
-        table = all_championship_tables[2]
 
-    if table is None:
-        print("Error: Could not find the 'Open era' table on the Wikipedia page.")
-        print("Expected to find at least two tables with 'sortable wikitable' classes.")
-    else:
-        cleaned_headers = [
-            "Year",
-            "Champions_Countries",
-            "Champions",
-            "Runners_up_Countries",
-            "Runners-up",
-            "Score_in_final"
-        ]
-
-        rows = []
-        # Iterate through each table row, skipping the first row (headers)
-        for tr in table.find_all('tr')[1:]:
-            cells = tr.find_all('td')
-
-            # Skip rows that are not data rows (e.g., "No competition" rows)
-            if len(cells) < 4:
-                continue
-
-            row_data = []
-
-            # Year
-            year = cells[0].get_text(strip=True)
-            row_data.append(year)
-
-            # Champions and their Countries
-            champions_countries = []
-            champions_names = []
-            
-            # Find all flag images and player names in the Champions column (cells[1])
-            for item in cells[1].children:
-                if item.name == 'span' and 'flagicon' in item.get('class', []):
-                    img_tag = item.find('img')
-                    if img_tag and 'alt' in img_tag.attrs:
-                        champions_countries.append(img_tag['alt'].strip())
-                elif item.name == 'a' and item.get_text(strip=True):
-                    champions_names.append(item.get_text(strip=True))
-                elif item.name is None and item.strip():
-                    pass
-
-            # Convert country names to ISO3 codes
-            champions_countries_iso = [convert_country_to_iso3(country) for country in champions_countries]
-            row_data.append(", ".join(champions_countries_iso))
-            row_data.append(", ".join(champions_names))
-
-            # Runners-up and their Countries
-            runner_up_countries = []
-            runner_up_names = []
-            
-            # Find all flag images and player names in the Runners-up column (cells[2])
-            for item in cells[2].children:
-                if item.name == 'span' and 'flagicon' in item.get('class', []):
-                    img_tag = item.find('img')
-                    if img_tag and 'alt' in img_tag.attrs:
-                        runner_up_countries.append(img_tag['alt'].strip())
-                elif item.name == 'a' and item.get_text(strip=True):
-                    runner_up_names.append(item.get_text(strip=True))
-                elif item.name is None and item.strip():
-                    pass
-            
-            # Convert country names to ISO3 codes
-            runner_up_countries_iso = [convert_country_to_iso3(country) for country in runner_up_countries]
-            row_data.append(", ".join(runner_up_countries_iso))
-            row_data.append(", ".join(runner_up_names))
-
-            # Score in the final (cells[3])
-            score = cells[3].get_text(strip=True)
-            
-            # Removes any bracketed references like '[14]'
-            score = re.sub(r'\[.*?\]', '', score).strip()
-            row_data.append(score)
-
-            rows.append(row_data)
-
-        # Pandas DataFrame with cleaned headers
-        ao_mensdoubles_final_data_df = pd.DataFrame(rows, columns=cleaned_headers)
-        ao_mensdoubles_finals_data.append(ao_mensdoubles_final_data_df)
-
-except requests.exceptions.RequestException as e:
-    print(f"Error: An error occurred during the request to {target_url}: {e}")
-except Exception as e:
-    print(f"Error: An unexpected error occurred: {e}")
-
-if ao_mensdoubles_finals_data:
-    stat_df = pd.concat(ao_mensdoubles_finals_data)
-    # Output to CSV
-    stat_df.to_csv("australian_open_mens_doubles_finals_data.csv", index=False)
-    print("Data successfully saved to australian_open_mens_doubles_finals_data.csv")
-    print("\nFirst 5 rows of the DataFrame:")
-    print(stat_df.head())
-else:
-    print("No data was extracted.")
+if __name__ == "__main__":
+    main()
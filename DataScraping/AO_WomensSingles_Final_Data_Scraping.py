@@ -1,93 +1,79 @@
-from bs4 import BeautifulSoup
 import pandas as pd
 import requests
-import sys
-import re
 
-ao_womens_finals_data = []
+from ao_scraping import tables
+from ao_scraping.cache import HttpCache, fetch_page
 
 target_url = "https://en.wikipedia.org/wiki/List_of_Australian_Open_women%27s_singles_champions"
 
-try:
-    html_content = requests.get(target_url).text
-    
+OUTPUT_CSV = "australian_open_women_singles_finals_data.csv"
+
+# Open era finals table: column -> how to read it from the row's cells
+TABLE_SPEC = {
+    'table_class': 'sortable wikitable',
+    'table_index': 0,
+    # Rows with fewer cells are special rows (e.g., "No competition")
+    'min_cells': 6,
+    'columns': {
+        "Year": tables.cell_text(0),
+        "Champion_Country": tables.cell_text(1),
+        # Champion and runner-up names are the text of their <a> tag
+        "Champion": tables.link_text(2, fallback=True),
+        "Runner_up_Country": tables.cell_text(3),
+        "Runner-up": tables.link_text(4, fallback=True),
+        # Removes any bracketed references like '[14]' or '[b]'
+        "Score_in_final": tables.without_references(5),
+    },
+    'dtypes': {"Year": 'Int64'},
+}
+
+cleaned_headers = list(TABLE_SPEC['columns'])
+
+
+def parse_page(html_content, url=target_url):
+    """'Open era' finals table of the page as a DataFrame, None when the table is missing"""
+    finals_df = tables.extract_table(html_content, TABLE_SPEC, url)
+    if finals_df is None:
+        print("Error: Could not find the 'Open era' table on the Wikipedia page.")
+        print("Expected to find at least two tables with 'sortable wikitable' classes.")
+    return finals_df
+
+
+def save(frames, path=OUTPUT_CSV):
+    if frames:
+        stat_df = pd.concat(frames)
+        stat_df.to_csv(path, index=False)
+        print(f"Data successfully saved to {path}")
+    else:
+        print("No data was extracted.")
+
+
+def main():
+    ao_womens_finals_data = []
+
+    cache = HttpCache()
+
     try:
-        soup = BeautifulSoup(html_content, 'lxml')
+        # Conditional request through the on-disk cache, an unchanged page keeps the CSV written from it
+        html_content = fetch_page(target_url, cache)
+        if cache.unchanged([target_url], OUTPUT_CSV):
+            print(f"{target_url} is unchanged since the last run, keeping {OUTPUT_CSV}")
+            return
+
+        ao_womens_final_data_df = parse_page(html_content)
+        if ao_womens_final_data_df is not None:
+            ao_womens_finals_data.append(ao_womens_final_data_df)
+
+    except requests.exceptions.RequestException as e:
+            print(f"Error: An error occurred during the request to {target_url}: {e}")
     except Exception as e:
-        print(f"Error: lxml parser not found or an issue occurred with it. Please ensure it's installed by running: pip install lxml. Details: {e}")
-        sys.exit() 
-
-    all_championship_tables = soup.find_all('table', {'class': 'sortable wikitable'})
+            print(f"Error: An unexpected error occurred: {e}")
 
-    table = None
-    if len(all_championship_tables) > 0:
-        table = all_championship_tables[0] 
+    save(ao_womens_finals_data)
+    # The page only counts as seen once its CSV is written
+    if ao_womens_finals_data:
+        cache.commit([target_url], OUTPUT_CSV)
 
 
-    if table is None:
-        print("Error: Could not find the 'Open era' table on the Wikipedia page.")
-        print("Expected to find at least two tables with 'sortable wikitable' classes.")
-    else:
-        headers = [th.get_text(strip=True) for th in table.find('tr').find_all('th')]
-        
-        cleaned_headers = [
-            "Year", 
-            "Champion_Country", 
-            "Champion", 
-            "Runner_up_Country", 
-            "Runner-up", 
-            "Score_in_final"
-        ]
-
-        rows = []
-        for tr in table.find_all('tr')[1:]:
-            row_data = []
-            cells = tr.find_all('td')
-            
-            if len(cells) < 6:
-                continue
-
-            # Year (first td)
-            year = cells[0].get_text(strip=True)
-            row_data.append(year)
-
-            # Champion Country (second td)
-            champion_country = cells[1].get_text(strip=True)
-            row_data.append(champion_country)
-
-            # Champion Name (third td) - extracts text from the <a> tag
-            champion_name_tag = cells[2].find('a')
-            champion_name = champion_name_tag.get_text(strip=True) if champion_name_tag else cells[2].get_text(strip=True)
-            row_data.append(champion_name)
-
-            # Runner-up Country (fourth td)
-            runner_up_country = cells[3].get_text(strip=True)
-            row_data.append(runner_up_country)
-
-            # Runner-up Name (fifth td) - extract text from the <a> tag
-            runner_up_name_tag = cells[4].find('a')
-            runner_up_name = runner_up_name_tag.get_text(strip=True) if runner_up_name_tag else cells[4].get_text(strip=True)
-            row_data.append(runner_up_name)
-
-            # Score in the final (sixth td) - gets text and removes superscript references
-            score = cells[5].get_text(strip=True)
-            # Removes any bracketed references like '[14]' or '[b]'
-            score = re.sub(r'\[.*?\]', '', score).strip()
-            row_data.append(score)
-            
-            rows.append(row_data)
-        
-        ao_womens_final_data_df = pd.DataFrame(rows, columns=cleaned_headers)
-        ao_womens_finals_data.append(ao_womens_final_data_df)
-
-except requests.exceptions.RequestException as e:
-        print(f"Error: An error occurred during the request to {target_url}: {e}")
-except Exception as e:
-        print(f"Error: An unexpected error occurred: {e}")
-
-if ao_womens_finals_data:
-    stat_df = pd.concat(ao_womens_finals_data)
-    stat_df.to_csv("australian_open_women_singles_finals_data.csv", index=False)
-    print("Data successfully saved to australian_open_women_singles_finals_data.csv")
-else:
-    print("No data was extracted.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared fetching and running for the AO_*_Data_Scraping.py scripts."""
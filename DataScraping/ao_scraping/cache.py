@@ -0,0 +1,152 @@
+"""
+On-disk HTTP response cache with conditional revalidation.
+
+Every page body is stored next to a small JSON header holding its ETag,
+Last-Modified, SHA-256 and the CSVs written from it (absolute path -> SHA-256
+of the file). The next fetch sends If-None-Match / If-Modified-Since. A
+scraper skips parsing and leaves its CSV alone only when all of these hold:
+- every page came back 304, or hashes the same as the stored one;
+- its CSV is still at a path stored with the pages;
+- the CSV's bytes are still the ones written then.
+
+Fetched bodies are only held in memory (pending) until commit(), which the
+caller runs after the CSV has been written. A failed parse or save, or a
+page that yielded no rows, leaves the previous entry in place, and the next
+run parses again. Pages rendered by Selenium (the runner's --rankings
+selenium) have no validators; they go through fetched() and are compared by
+hash only.
+
+fetch_page() is the blocking fetch the scripts use; the runner's Fetcher uses
+the same HttpCache with its async client.
+
+    .http_cache/
+        <sha256 of url>.json   {"url", "etag", "last_modified", "sha256", "size", "stored_at", "outputs"}
+        <sha256 of url>.html
+"""
+import datetime
+import hashlib
+import json
+import os
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.http_cache')
+
+
+def body_sha256(body):
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def file_sha256(path):
+    """SHA-256 of the file's bytes, None when there is no file"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class HttpCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        self.pending = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url, suffix):
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest() + suffix)
+
+    def lookup(self, url):
+        """(header, body) of the stored response, (None, None) when url was never stored"""
+        try:
+            with open(self._path(url, '.json'), encoding='utf-8') as f:
+                header = json.load(f)
+            with open(self._path(url, '.html'), encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        if header.get('url') != url or header.get('sha256') != body_sha256(body):
+            return None, None
+        return header, body
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since for the stored response of url"""
+        header, _ = self.lookup(url)
+        if header is None:
+            return {}
+        headers = {}
+        if header.get('etag'):
+            headers['If-None-Match'] = header['etag']
+        if header.get('last_modified'):
+            headers['If-Modified-Since'] = header['last_modified']
+        return headers
+
+    def fetched(self, url, body, etag=None, last_modified=None):
+        """Hold a fetched body until commit(), returns it"""
+        self.pending[url] = {'body': body, 'etag': etag, 'last_modified': last_modified}
+        return body
+
+    def not_modified(self, url, etag=None, last_modified=None):
+        """Body of a 304 response: the stored one, unchanged"""
+        header, body = self.lookup(url)
+        if body is None:
+            raise ValueError(f"304 Not Modified for {url}, but nothing is cached")
+        return self.fetched(url, body, etag or header.get('etag'), last_modified or header.get('last_modified'))
+
+    def unchanged(self, urls, csv_path):
+        """True when every fetched body of urls is the stored one and csv_path is still the CSV written from them"""
+        csv_sha256 = file_sha256(csv_path)
+        if csv_sha256 is None:
+            return False
+        for url in urls:
+            page = self.pending.get(url)
+            header, _ = self.lookup(url)
+            if (page is None or header is None or header['sha256'] != body_sha256(page['body'])
+                    or header.get('outputs', {}).get(os.path.abspath(csv_path)) != csv_sha256):
+                return False
+        return True
+
+    def commit(self, urls, csv_path):
+        """Store the fetched bodies of urls, once csv_path has been written from them"""
+        csv_sha256 = file_sha256(csv_path)
+        if csv_sha256 is None:
+            raise FileNotFoundError(f"{csv_path} was not written, nothing to commit")
+        for url in urls:
+            page = self.pending.pop(url, None)
+            if page is None:
+                continue
+            previous, _ = self.lookup(url)
+            sha256 = body_sha256(page['body'])
+            # Other CSVs written from the same body stay valid as long as their bytes match
+            outputs = dict(previous.get('outputs', {})) if previous and previous['sha256'] == sha256 else {}
+            outputs[os.path.abspath(csv_path)] = csv_sha256
+            # Body first, a header never points at a body that isn't there
+            _write_atomic(self._path(url, '.html'), page['body'])
+            _write_atomic(self._path(url, '.json'), json.dumps({
+                'url': url,
+                'etag': page['etag'],
+                'last_modified': page['last_modified'],
+                'sha256': sha256,
+                'size': len(page['body']),
+                'stored_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                'outputs': outputs,
+            }, indent=2))
+
+
+def fetch_page(url, cache, session=None):
+    """
+    html_content of url through the cache (pending until cache.commit()), with requests.
+
+    Raises requests.exceptions.RequestException like requests.get().raise_for_status().
+    """
+    import requests
+
+    response = (session or requests).get(url, headers=cache.conditional_headers(url))
+    if response.status_code == 304:
+        return cache.not_modified(url, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    response.raise_for_status()
+    return cache.fetched(url, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
@@ -0,0 +1,116 @@
+"""
+Pool of long-lived headless Chrome drivers for the rankings pages.
+
+Each of the pool's worker threads starts one driver the first time it gets a
+page and keeps it for every later page, so a run pays Chrome's startup once
+per worker instead of once per script, and pages of both tours load in
+parallel. A driver that crashes or hangs (any WebDriverException, including
+the table wait timing out) is quit and replaced, and the page gets one more
+try on the fresh driver.
+
+The chromedriver path comes from the driver_path argument, else the
+CHROMEDRIVER_PATH environment variable, else Selenium Manager finds or
+downloads a matching driver.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DRIVER_PATH_ENV = 'CHROMEDRIVER_PATH'
+
+
+def default_driver_path():
+    return os.environ.get(DRIVER_PATH_ENV) or None
+
+
+class DriverPool:
+    def __init__(self, size, driver_path=None, options_factory=None):
+        if options_factory is None:
+            from ao_scraping.scrapers import load_scraper
+            # Both rankings scripts use the same headless options
+            options_factory = load_scraper('atp_rankings').make_chrome_options
+        self.size = size
+        self.driver_path = driver_path or default_driver_path()
+        self.options_factory = options_factory
+        self.pages = 0
+        self.restarts = 0
+        self._drivers = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='chromedriver')
+
+    def _start_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        driver = webdriver.Chrome(service=Service(self.driver_path), options=self.options_factory())
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def _driver(self):
+        """This worker thread's driver, started on first use"""
+        driver = getattr(self._local, 'driver', None)
+        if driver is None:
+            driver = self._local.driver = self._start_driver()
+        return driver
+
+    def _discard(self, driver):
+        self._local.driver = None
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self.restarts += 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _run(self, fn, args):
+        from selenium.common.exceptions import WebDriverException
+
+        driver = self._driver()
+        try:
+            result = fn(driver, *args)
+        except WebDriverException:
+            # A crashed or wedged browser is replaced, the page gets one more try
+            self._discard(driver)
+            result = fn(self._driver(), *args)
+        with self._lock:
+            self.pages += 1
+        return result
+
+    def submit(self, fn, *args):
+        """Future of fn(driver, *args) on the next free worker's driver"""
+        return self._executor.submit(self._run, fn, args)
+
+    def map(self, fn, items):
+        """[fn(driver, item) for item in items], spread over the workers"""
+        return [future.result() for future in [self.submit(fn, item) for item in items]]
+
+    def warm_up(self):
+        """Start every worker's driver now, in parallel, instead of on their first page"""
+        barrier = threading.Barrier(self.size)
+
+        def start():
+            self._driver()
+            # Keep this worker busy until every worker has started its driver
+            barrier.wait()
+        for future in [self._executor.submit(start) for _ in range(self.size)]:
+            future.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,220 @@
+"""
+HTML fixtures of the scraped pages, for running the scrapers against a local stub.
+
+Fixtures are named after the page URL (fixture_name). Pages saved from the live
+sites with `python -m ao_scraping.runner --record fixtures/` are the real
+thing; when the sites can't be reached, build_fixtures() reconstructs every
+page from the committed CSVs in the markup the scrapers parse: Wikipedia
+'sortable wikitable' tables with flagicon spans and reference superscripts,
+and the rendered tennisabstract 'tablesorter' table, 50 players per page.
+Scraping the reconstructed pages must reproduce the committed CSVs byte for
+byte. --max-rank builds rankings pages past the committed top 100; their
+players repeat the CSV rows under new ranks. --payload writes the rankings
+pages as a plain download would see them, the rows in a script literal for
+the fast path (ao_scraping.rankings) instead of the rendered table.
+
+Run from DataScraping/:
+    python -m ao_scraping.fixtures --out fixtures [--max-rank 1000] [--payload]
+"""
+import argparse
+import html
+import json
+import os
+import re
+import urllib.parse
+
+import pandas as pd
+
+from ao_scraping.rankings import PAGE_SIZE, RANKINGS_COLUMNS
+from ao_scraping.scrapers import SCRAPERS, is_rendered, load_scraper, page_urls
+
+RANKINGS_PAGE_SIZE = PAGE_SIZE
+
+
+def fixture_name(url):
+    """Fixture file of a page URL, e.g. en_wikipedia_org_wiki_List_of_..._champions.html"""
+    parts = urllib.parse.urlsplit(url)
+    key = parts.netloc + parts.path + (f"?{parts.query}" if parts.query else '')
+    return re.sub(r'[^A-Za-z0-9]+', '_', key).strip('_') + '.html'
+
+
+def _page(title, body):
+    return (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head>\n"
+            f"<body>\n{body}\n</body></html>\n")
+
+
+def _link(text):
+    return f'<a href="/wiki/{urllib.parse.quote(text.replace(" ", "_"))}">{html.escape(text)}</a>'
+
+
+def _score(score, reference):
+    # Every third final cites a source, the scrapers strip the [n] marker
+    cite = f'<sup class="reference"><a href="#cite_note-{reference}">[{reference}]</a></sup>' \
+        if reference % 3 == 0 else ''
+    return f"{html.escape(score)}{cite}"
+
+
+def _table(table_class, header, rows):
+    head = ''.join(f"<th>{html.escape(name)}</th>" for name in header)
+    return f'<table class="{table_class}">\n<tbody><tr>{head}</tr>\n' + '\n'.join(rows) + '\n</tbody></table>'
+
+
+def _no_competition_rows(years):
+    """'No competition' rows for the gaps in years, the scrapers skip them"""
+    numbers = sorted({int(year) for year in years if year.isdigit()})
+    return {after: f'<tr><td>{after + 1}</td><td colspan="5">No competition</td></tr>'
+            for after, following in zip(numbers, numbers[1:]) if following - after > 1}
+
+
+def singles_page(df, url):
+    rows = []
+    gaps = _no_competition_rows(df['Year'])
+    for i, row in enumerate(df.itertuples(index=False)):
+        year, champion_country, champion, runner_up_country, runner_up, score = row
+        rows.append(f"<tr><td>{year}</td><td>{html.escape(champion_country)}</td><td>{_link(champion)}</td>"
+                    f"<td>{html.escape(runner_up_country)}</td><td>{_link(runner_up)}</td>"
+                    f"<td>{_score(score, i + 1)}</td></tr>")
+        if year.isdigit() and int(year) in gaps:
+            rows.append(gaps.pop(int(year)))
+    table = _table('sortable wikitable', ['Year', 'Country', 'Champion', 'Country', 'Runner-up', 'Score in the final'],
+                   rows)
+    return _page(urllib.parse.unquote(url.rsplit('/', 1)[-1]), f"<h2>Open era</h2>\n{table}")
+
+
+def _country_alt(code, to_iso3):
+    """A flag alt text the doubles scrapers convert back to code"""
+    import pycountry
+
+    candidates = []
+    country = pycountry.countries.get(alpha_3=code)
+    if country is not None:
+        candidates += [getattr(country, 'common_name', None), country.name]
+    candidates.append(code)
+    for candidate in candidates:
+        if candidate and to_iso3(candidate) == code:
+            return candidate
+    raise ValueError(f"No flag alt text converts back to '{code}'")
+
+
+def _team(countries, names, to_iso3):
+    codes = [code.strip() for code in countries.split(',')] if countries else []
+    players = [name.strip() for name in names.split(',')] if names else []
+    if len(codes) != len(players):
+        raise ValueError(f"Can't pair countries '{countries}' with players '{names}'")
+    return '<br>'.join(f'<span class="flagicon"><img alt="{html.escape(_country_alt(code, to_iso3))}" '
+                       f'src="Flag.svg" width="23" height="15"></span> {_link(player)}'
+                       for code, player in zip(codes, players))
+
+
+def doubles_page(df, url, scraper):
+    table_class = 'wikitable sortable' if 'women' in url else 'sortable wikitable'
+    rows = []
+    for i, row in enumerate(df.itertuples(index=False)):
+        year, champions_countries, champions, runners_up_countries, runners_up, score = row
+        rows.append(f"<tr><td>{year}</td><td>{_team(champions_countries, champions, scraper.convert_country_to_iso3)}"
+                    f"</td><td>{_team(runners_up_countries, runners_up, scraper.convert_country_to_iso3)}</td>"
+                    f"<td>{_score(score, i + 1)}</td></tr>")
+    header = ['Year', 'Champions', 'Runners-up', 'Score in the final']
+    # The scrapers take the third table of the class, after the amateur era ones
+    decoys = [_table(table_class, header, [f"<tr><td>{1905 + era}</td><td>-</td><td>-</td><td>-</td></tr>"])
+              for era in range(2)]
+    body = '\n'.join(decoys + [_table(table_class, header, rows)])
+    return _page(urllib.parse.unquote(url.rsplit('/', 1)[-1]), body)
+
+
+def rankings_page(df, url):
+    rows = []
+    for row in df.to_dict('records'):
+        cells = []
+        for name, column in RANKINGS_COLUMNS:
+            if name == 'Player':
+                cells.append(f'<a href="/cgi-bin/player.cgi?p={urllib.parse.quote(row["Player_Name"])}">'
+                             f'{html.escape(row["Player_Name"])}</a> <span class="hand">R</span>'
+                             f'<span class="country">[{row["Country_Code"]}]</span>')
+            elif name == 'M':
+                cells.append(f'<a href="#">{row[column]}</a>')
+            else:
+                cells.append(html.escape(row[column]) if column else '-')
+        rows.append('<tr>' + ''.join(f"<td>{cell}</td>" for cell in cells) + '</tr>')
+    table = _table('tablesorter', [name for name, _ in RANKINGS_COLUMNS], rows)
+    return _page('Tennis Abstract: Leaders', f'<div id="leaders">\n{table}\n</div>')
+
+
+def payload_page(df, url):
+    """A leaders page before JavaScript ran: an empty table container and the rows in a script literal"""
+    rows = []
+    for row in df.to_dict('records'):
+        cells = []
+        for name, column in RANKINGS_COLUMNS:
+            if name == 'Player':
+                cells.append(f'<a href="/cgi-bin/player.cgi?p={urllib.parse.quote(row["Player_Name"])}">'
+                             f'{html.escape(row["Player_Name"])}</a> <span class="hand">R</span>'
+                             f'<span class="country">[{row["Country_Code"]}]</span>')
+            else:
+                cells.append(row[column] if column else '-')
+        rows.append(cells)
+    # The payload script sits between other literals, as on a page with more scripts than the table's
+    script = (f"var tourLevels = ['G', 'M', 'A', 'D'];\n"
+              f"var leadersRows = {json.dumps(rows)};\n"
+              f"var sortOptions = {{headers: {{1: {{sorter: false}}}}, widgets: ['zebra']}};\n"
+              f"renderLeaders(leadersRows, sortOptions);")
+    return _page('Tennis Abstract: Leaders', f'<div id="leaders"></div>\n<script>\n{script}\n</script>')
+
+
+def extend_rankings(df, max_rank):
+    """df down to rank max_rank, rows past the CSV repeat it with new ranks and numbered names"""
+    rows = df.to_dict('records')
+    extra = []
+    for rank in range(len(rows) + 1, max_rank + 1):
+        row = dict(rows[(rank - 1) % len(rows)])
+        row['Rank'] = str(rank)
+        row['Player_Name'] = f"{row['Player_Name']} {(rank - 1) // len(rows) + 1}"
+        extra.append(row)
+    return pd.concat([df, pd.DataFrame(extra, columns=df.columns)], ignore_index=True) if extra else df
+
+
+def build_fixtures(out_dir, csv_dir='.', scrapers=None, max_rank=None, payload=False):
+    """
+    Write the reconstructed page of every scraper URL to out_dir, returns the file paths.
+
+    payload writes rankings pages as downloaded (rows in a script), not as rendered.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name in scrapers or SCRAPERS:
+        scraper = load_scraper(name)
+        df = pd.read_csv(os.path.join(csv_dir, scraper.OUTPUT_CSV), dtype=str, keep_default_na=False)
+        urls = page_urls(scraper, max_rank)
+        if is_rendered(scraper):
+            if max_rank:
+                df = extend_rankings(df, max_rank)
+            make_page = payload_page if payload else rankings_page
+            pages = [make_page(df.iloc[i * RANKINGS_PAGE_SIZE:(i + 1) * RANKINGS_PAGE_SIZE], url)
+                     for i, url in enumerate(urls)]
+        elif 'Champions' in df.columns:
+            pages = [doubles_page(df, urls[0], scraper)]
+        else:
+            pages = [singles_page(df, urls[0])]
+        for url, page in zip(urls, pages):
+            path = os.path.join(out_dir, fixture_name(url))
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(page)
+            paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default='fixtures')
+    parser.add_argument('--csv-dir', default='.', help="directory of the committed CSVs")
+    parser.add_argument('--max-rank', type=int, help="rankings pages down to this rank, default the scripts' top 100")
+    parser.add_argument('--payload', action='store_true',
+                        help="rankings pages as downloaded, rows in a script, instead of rendered")
+    args = parser.parse_args()
+
+    for path in build_fixtures(args.out, args.csv_dir, max_rank=args.max_rank, payload=args.payload):
+        print(f"Wrote {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+
+
+if __name__ == '__main__':
+    main()
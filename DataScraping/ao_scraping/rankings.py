@@ -0,0 +1,250 @@
+"""
+tennisabstract leaders pages: which URLs cover a range of ranks, and the
+browser-free fast path for their tables.
+
+The leaders table lists PAGE_SIZE players per page; the first page has no
+query, later ones select their range with ?players=<first>-<last>.
+
+The table is rendered by JavaScript from data shipped in the page itself, so a
+plain HTTP download already holds it. fast_frame() looks for it without a
+browser: a 'tablesorter' table already in the HTML, else every array or object
+literal assigned in an inline <script> (or a whole JSON script) that holds rows
+of the RANKINGS_COLUMNS layout, either 19-cell arrays in column order or
+objects keyed by column name. Each candidate is rebuilt as the rendered table
+and parsed by the script's own parse_page, so both modes clean cells the same
+way, and the first frame that passes rankings_problems() against the 15
+cleaned_headers wins. When none does, the caller renders the page in Chrome.
+The payload format is inferred from the rendered table, not a documented API:
+the validation is what keeps a wrong guess out of the CSVs.
+"""
+import ast
+import html
+import itertools
+import json
+import re
+
+PAGE_SIZE = 50
+
+# Rendered tennisabstract columns; the scrapers skip the ones marked None
+RANKINGS_COLUMNS = [
+    ('Rank', 'Rank'), ('Player', None), ('M', 'Total_Matches'), ('W-L', 'Win-Loss'),
+    ('Win%', 'Win-Loss_Percentage'), ('SPW', 'Service_Points_Won_Percentage'), ('RPW', None), ('TPW', None),
+    ('A%', 'Ace_Rate_Percentage'), ('vA%', None), ('DF%', 'Double_Fault_Rate'), ('vDF%', None),
+    ('1stIn', 'First_Serves_In_Percentage'), ('1st%', 'First_Serve_Points_Won_Percentage'),
+    ('2nd%', 'Second_Serve_Points_Won_Percentage'), ('SvPt%', None), ('Hld%', 'Service_Games_Won_Percentage'),
+    ('Pts/SG', 'Points_Per_Service_Game'), ('PtsL/SG', 'Points_Lost_Per_Service_Game'),
+]
+
+_PERCENTAGE = r'\d+(?:\.\d+)?%'
+_DECIMAL = r'\d+(?:\.\d+)?'
+
+# Every cleaned_headers column and the values it may hold; the scripts skip rows
+# with an empty Rank, Player_Name, Country_Code or Total_Matches, the rest may be empty
+RANKINGS_PATTERNS = {
+    'Rank': r'\d+',
+    'Player_Name': r'\S.*',
+    'Country_Code': r'[A-Z]{3}',
+    'Total_Matches': r'\d+',
+    'Win-Loss': r'(?:\d+-\d+)?',
+    'Win-Loss_Percentage': f'(?:{_PERCENTAGE})?',
+    'Service_Points_Won_Percentage': f'(?:{_PERCENTAGE})?',
+    'Ace_Rate_Percentage': f'(?:{_PERCENTAGE})?',
+    'Double_Fault_Rate': f'(?:{_PERCENTAGE})?',
+    'First_Serves_In_Percentage': f'(?:{_PERCENTAGE})?',
+    'First_Serve_Points_Won_Percentage': f'(?:{_PERCENTAGE})?',
+    'Second_Serve_Points_Won_Percentage': f'(?:{_PERCENTAGE})?',
+    'Service_Games_Won_Percentage': f'(?:{_PERCENTAGE})?',
+    'Points_Per_Service_Game': f'(?:{_DECIMAL})?',
+    'Points_Lost_Per_Service_Game': f'(?:{_DECIMAL})?',
+}
+
+_SCRIPT = re.compile(r'<script\b[^>]*>(.*?)</script\s*>', re.S | re.I)
+_ASSIGNMENT = re.compile(r'[A-Za-z_$][\w$.]*\s*=\s*(?=[\[{])')
+_MARKUP = re.compile(r'<[A-Za-z/]')
+_PLAYER_WITH_COUNTRY = re.compile(r'^(.*?)\s*\[([A-Za-z]{3})\]\s*$')
+_BARE_KEY = re.compile(r'([{,]\s*)([A-Za-z_$][\w$]*)\s*:')
+_JS_CONSTANTS = {'true': 'True', 'false': 'False', 'null': 'None'}
+
+
+def ranking_urls(leaders_url, max_rank=100, page_size=PAGE_SIZE):
+    """Leaders pages covering ranks 1..max_rank"""
+    return [leaders_url] + [f"{leaders_url}?players={first}-{first + page_size - 1}"
+                            for first in range(page_size + 1, max_rank + 1, page_size)]
+
+
+def _normalize(name):
+    return re.sub(r'[^a-z0-9%]', '', name.lower())
+
+
+# Object keys of each rendered column: its header, its cleaned_headers name, and the usual spellings of the player's
+_COLUMN_KEYS = {}
+for _index, (_name, _column) in enumerate(RANKINGS_COLUMNS):
+    for _key in (_name, _column):
+        if _key:
+            _COLUMN_KEYS[_normalize(_key)] = _index
+for _key in ('Player_Name', 'name', 'playername'):
+    _COLUMN_KEYS[_normalize(_key)] = 1
+_COUNTRY_KEYS = {_normalize(key) for key in ('Country_Code', 'country', 'ioc', 'nation', 'cc')}
+
+
+def _literal_end(text, start):
+    """Index just past the bracketed literal opening at text[start], None when it never closes"""
+    depth = 0
+    quote = None
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in '"\'`':
+            quote = char
+        elif char in '[{':
+            depth += 1
+        elif char in ']}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return None
+
+
+def _load_literal(text):
+    """A JSON or JavaScript array/object literal as Python values, None when it is neither"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    # Single quotes and trailing commas are valid Python literals too, bare object keys need quoting
+    text = re.sub(r'\b(true|false|null)\b', lambda m: _JS_CONSTANTS[m.group(1)], text)
+    for attempt in (text, _BARE_KEY.sub(r'\1"\2":', text)):
+        try:
+            return ast.literal_eval(attempt)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            pass
+    return None
+
+
+def script_literals(html_content):
+    """Parsed array and object literals of the page's inline scripts, in page order"""
+    for script in _SCRIPT.findall(html_content):
+        stripped = script.strip()
+        if stripped[:1] in ('[', '{'):
+            value = _load_literal(stripped)
+            if value is not None:
+                yield value
+                continue
+        for match in _ASSIGNMENT.finditer(script):
+            end = _literal_end(script, match.end())
+            if end is not None:
+                value = _load_literal(script[match.end():end])
+                if value is not None:
+                    yield value
+
+
+def _row_tables(value):
+    """Lists in value (itself included) that look like table rows: 19+ cell arrays, or objects"""
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _row_tables(item)
+    elif isinstance(value, list) and value:
+        if all(isinstance(row, list) and len(row) >= len(RANKINGS_COLUMNS) for row in value):
+            yield value
+        elif all(isinstance(row, dict) for row in value):
+            yield value
+        else:
+            for item in value:
+                yield from _row_tables(item)
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    text = str(value)
+    return text if _MARKUP.search(text) else html.escape(text)
+
+
+def _player_cell(value, country=''):
+    if value is None:
+        return ''
+    text = str(value)
+    if _MARKUP.search(text):
+        return text
+    match = _PLAYER_WITH_COUNTRY.match(text)
+    if match:
+        text, country = match.groups()
+    return f'<a>{html.escape(text)}</a> <span></span><span>[{html.escape(str(country or ""))}]</span>'
+
+
+def _row_cells(row):
+    """The 19 rendered cells of one payload row"""
+    if isinstance(row, list):
+        cells = [_cell(value) for value in row[:len(RANKINGS_COLUMNS)]]
+        cells[1] = _player_cell(row[1])
+    else:
+        cells = [''] * len(RANKINGS_COLUMNS)
+        player = None
+        country = ''
+        for key, value in row.items():
+            index = _COLUMN_KEYS.get(_normalize(str(key)))
+            if _normalize(str(key)) in _COUNTRY_KEYS:
+                country = value
+            elif index == 1:
+                player = value
+            elif index is not None:
+                cells[index] = value
+        cells = [_cell(value) for value in cells]
+        cells[1] = _player_cell(player, country)
+    # parse_page reads the match count from a link
+    if cells[2] and '<a' not in cells[2]:
+        cells[2] = f'<a>{cells[2]}</a>'
+    return cells
+
+
+def payload_tables(html_content):
+    """Rendered-table HTML for every row table in the page's script payloads"""
+    header = ''.join(f"<th>{html.escape(name)}</th>" for name, _ in RANKINGS_COLUMNS)
+    for literal in script_literals(html_content):
+        for rows in _row_tables(literal):
+            body = ''.join('<tr>' + ''.join(f"<td>{cell}</td>" for cell in _row_cells(row)) + '</tr>'
+                           for row in rows)
+            yield f'<table class="tablesorter"><tr>{header}</tr>{body}</table>'
+
+
+def rankings_problems(df, headers):
+    """Why df doesn't fit the cleaned_headers schema, empty when it does"""
+    if df is None:
+        return ["no table"]
+    if list(df.columns) != list(headers):
+        return [f"columns {list(df.columns)} instead of {list(headers)}"]
+    if df.empty:
+        return ["no rows"]
+    problems = []
+    for column in headers:
+        values = df[column].astype(str)
+        bad = ~values.str.fullmatch(RANKINGS_PATTERNS[column])
+        if bad.any():
+            problems.append(f"{column}: {bad.sum()} values like {values[bad].iloc[0]!r}")
+    return problems
+
+
+def fast_frame(html_content, url, parse_page, headers):
+    """
+    The rankings of a plain HTTP download of url, without a browser.
+
+    parse_page and headers are the script's; returns the first valid frame of the
+    page's own table or its script payloads, None when there is none.
+    """
+    own_table = [html_content] if 'tablesorter' in html_content else []
+    problems = ["no rankings table or script payload"]
+    # Payload tables are only built when the page's own table is missing or invalid
+    for candidate in itertools.chain(own_table, payload_tables(html_content)):
+        frame = parse_page(candidate, url)
+        problems = rankings_problems(frame, headers)
+        if not problems:
+            return frame
+    print(f"Fast path found no valid rankings on {url}: {'; '.join(problems)}")
+    return None
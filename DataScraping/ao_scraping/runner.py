@@ -0,0 +1,277 @@
+"""
+Run all six scrapers concurrently and write their CSVs.
+
+Wikipedia pages are fetched with one pooled httpx.AsyncClient, under a global
+connection bound plus a per-host concurrency cap and request rate
+(HOST_LIMITS). Transport errors, 429 and 5xx responses are retried with
+exponential backoff and jitter, honouring Retry-After. The rankings pages are
+downloaded the same way and read by the browser-free fast path
+(ao_scraping.rankings.fast_frame); only pages whose payload fails validation
+are rendered, by one DriverPool (ao_scraping.driver_pool) of --drivers
+long-lived Chrome drivers shared by both tours. --rankings selenium renders
+every rankings page in the pool, so ranks 1-1000 of both tours (40 pages) take
+about 40 / --drivers page loads; --rankings http never starts Chrome, for
+runs without one. --max-rank sets how deep the rankings go, default the
+scripts' top 100. Pages are parsed by
+the scripts' own parse_page, so the CSVs are the ones the scripts write, and a
+run takes about as long as its slowest scraper.
+
+Responses go through the on-disk HttpCache (ao_scraping.cache): pages are
+revalidated with conditional requests. A scraper neither parses nor rewrites
+its CSV when both hold:
+- every page came back 304 or hashes the same as last time;
+- the CSV in --out-dir is byte for byte the one written from those pages.
+Pages are committed to the cache only after the CSV holding their rows has
+been written.
+
+--base-url points every request at a local stub (ao_scraping.stub) serving
+fixtures named by fixture_name(url); --record saves every fetched page under
+that name.
+
+Run from DataScraping/:
+    python -m ao_scraping.runner [--only mens_singles atp_rankings] [--out-dir .] [--driver-path chromedriver]
+    python -m ao_scraping.runner --only atp_rankings wta_rankings --max-rank 1000 --drivers 8
+    python -m ao_scraping.runner --base-url http://127.0.0.1:8765 --rankings http --out-dir /tmp/scraped
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import traceback
+import urllib.parse
+
+import httpx
+
+from ao_scraping.cache import DEFAULT_CACHE_DIR, HttpCache
+from ao_scraping.driver_pool import DriverPool
+from ao_scraping.fixtures import fixture_name
+from ao_scraping.rankings import fast_frame
+from ao_scraping.scrapers import SCRAPERS, is_rendered, load_scraper, page_urls
+
+USER_AGENT = "AOFever-DataScraping/1.0 (httpx)"
+
+# Per host: concurrent requests and request starts per second
+HOST_LIMITS = {
+    'en.wikipedia.org': {'concurrency': 4, 'per_second': 5.0},
+    'www.tennisabstract.com': {'concurrency': 2, 'per_second': 1.0},
+}
+DEFAULT_HOST_LIMIT = {'concurrency': 2, 'per_second': 2.0}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HostLimiter:
+    """Caps concurrent requests to one host and spaces their starts by 1 / per_second"""
+
+    def __init__(self, concurrency, per_second):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.semaphore.release()
+
+
+class Fetcher:
+    """Pooled client, one HostLimiter per host and the response cache, shared by every scraper of a run"""
+
+    def __init__(self, client, base_url=None, retries=3, backoff=0.5, host_limits=None, cache=None):
+        self.client = client
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self.retries = retries
+        self.backoff = backoff
+        self.host_limits = HOST_LIMITS if host_limits is None else host_limits
+        self.cache = cache
+        self.limiters = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes = 0
+
+    def limiter(self, host):
+        if host not in self.limiters:
+            self.limiters[host] = HostLimiter(**self.host_limits.get(host, DEFAULT_HOST_LIMIT))
+        return self.limiters[host]
+
+    def request_url(self, url):
+        """url itself, or its fixture on the stub at base_url"""
+        return f"{self.base_url}/{fixture_name(url)}" if self.base_url else url
+
+    def _retry_delay(self, attempt, response):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+
+    async def fetch(self, url):
+        """
+        Body of url, rate limited by its (original) host and retried on transient failures.
+
+        With a cache the body is pending there until the scraper commits it.
+        """
+        limiter = self.limiter(urllib.parse.urlsplit(url).netloc)
+        headers = self.cache.conditional_headers(url) if self.cache else {}
+        for attempt in range(self.retries + 1):
+            response = None
+            async with limiter:
+                try:
+                    response = await self.client.get(self.request_url(url), headers=headers)
+                    self.requests += 1
+                except httpx.TransportError as e:
+                    error = e
+                else:
+                    self.bytes += len(response.content)
+                    if response.status_code == 304 and self.cache:
+                        self.not_modified += 1
+                        return self.cache.not_modified(url, response.headers.get('ETag'),
+                                                       response.headers.get('Last-Modified'))
+                    if response.status_code not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        if not self.cache:
+                            return response.text
+                        return self.cache.fetched(url, response.text, response.headers.get('ETag'),
+                                                  response.headers.get('Last-Modified'))
+                    error = httpx.HTTPStatusError(f"{response.status_code} from {response.url}",
+                                                  request=response.request, response=response)
+            if attempt == self.retries:
+                raise error
+            delay = self._retry_delay(attempt, response)
+            print(f"Retrying {url} in {delay:.1f}s after: {error}")
+            await asyncio.sleep(delay)
+
+
+async def page_frame(scraper, url, html_content, args, pool=None):
+    """The DataFrame of one fetched page, None when it has no data"""
+    # Parsing is CPU work, a thread keeps the other downloads moving meanwhile
+    if not is_rendered(scraper) or args.rankings == 'selenium':
+        return await asyncio.to_thread(scraper.parse_page, html_content, url)
+    frame = await asyncio.to_thread(fast_frame, html_content, url, scraper.parse_page, scraper.cleaned_headers)
+    if frame is None and pool is not None:
+        print(f"Rendering {url} in Chrome instead")
+        try:
+            html_content = await asyncio.wrap_future(pool.submit(scraper.fetch_rendered, url))
+        except Exception as e:
+            print(f"Error rendering {url}: {type(e).__name__}: {e}")
+            return None
+        frame = await asyncio.to_thread(scraper.parse_page, html_content, url)
+    return frame
+
+
+async def run_scraper(name, fetcher, args, pool=None):
+    """Fetch, parse and save one scraper's pages, returns its summary row"""
+    scraper = load_scraper(name)
+    urls = page_urls(scraper, args.max_rank)
+    csv_path = os.path.join(args.out_dir, scraper.OUTPUT_CSV)
+    start = time.perf_counter()
+    summary = {'scraper': name, 'pages': len(urls), 'rows': 0, 'csv': None, 'error': None, 'unchanged': False}
+    try:
+        cache = fetcher.cache
+        if is_rendered(scraper) and args.rankings == 'selenium':
+            # Every page goes to the pool at once, the drivers take them as they come free
+            pages = await asyncio.gather(*(asyncio.wrap_future(pool.submit(scraper.fetch_rendered, url))
+                                           for url in urls))
+            if cache:
+                # Rendered pages have no validators, only their content hash tells them apart
+                for url, html_content in zip(urls, pages):
+                    cache.fetched(url, html_content)
+        else:
+            pages = await asyncio.gather(*(fetcher.fetch(url) for url in urls))
+
+        if args.record:
+            for url, html_content in zip(urls, pages):
+                with open(os.path.join(args.record, fixture_name(url)), 'w', encoding='utf-8') as f:
+                    f.write(html_content)
+
+        if cache and cache.unchanged(urls, csv_path):
+            summary['unchanged'] = True
+            summary['seconds'] = time.perf_counter() - start
+            return summary
+
+        frames = await asyncio.gather(*(page_frame(scraper, url, html_content, args, pool)
+                                        for url, html_content in zip(urls, pages)))
+        parsed = [(url, frame) for url, frame in zip(urls, frames) if frame is not None]
+
+        summary['rows'] = sum(len(frame) for _, frame in parsed)
+        scraper.save([frame for _, frame in parsed], csv_path)
+        if parsed:
+            summary['csv'] = csv_path
+            # Only pages whose rows made it into the written CSV are committed, the others are parsed again next run
+            if cache:
+                cache.commit([url for url, _ in parsed], csv_path)
+    except Exception as e:
+        summary['error'] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+async def run(args, host_limits=None):
+    """Every selected scraper at once, returns (summaries, fetcher) once all have finished"""
+    os.makedirs(args.out_dir, exist_ok=True)
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout, follow_redirects=True,
+                                 headers={'User-Agent': USER_AGENT}) as client:
+        cache = None if args.no_cache else HttpCache(args.cache_dir)
+        fetcher = Fetcher(client, args.base_url, args.retries, args.backoff, host_limits, cache)
+        pool = None
+        if args.rankings != 'http' and any(is_rendered(load_scraper(name)) for name in args.only):
+            # Drivers only start once a page needs one
+            pool = DriverPool(args.drivers, args.driver_path)
+        try:
+            summaries = await asyncio.gather(*(run_scraper(name, fetcher, args, pool) for name in args.only))
+        finally:
+            if pool is not None:
+                await asyncio.to_thread(pool.close)
+    return summaries, fetcher
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='+', choices=list(SCRAPERS), default=list(SCRAPERS))
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--base-url', help="fetch every page from this fixture stub instead")
+    parser.add_argument('--rankings', choices=['auto', 'selenium', 'http'], default='auto',
+                        help="fast path with Chrome fallback, Chrome for every page, or fast path only")
+    parser.add_argument('--driver-path', help="chromedriver, default $CHROMEDRIVER_PATH, else Selenium Manager's")
+    parser.add_argument('--drivers', type=int, default=4, help="Chrome drivers rendering rankings pages at once")
+    parser.add_argument('--max-rank', type=int, help="rankings pages down to this rank, default the scripts' top 100")
+    parser.add_argument('--concurrency', type=int, default=8, help="connections open at once, all hosts")
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--backoff', type=float, default=0.5, help="first retry delay in seconds, doubling")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--record', metavar='DIR', help="save every fetched page as a fixture")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true', help="always download, parse and write")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+    summaries, fetcher = asyncio.run(run(args))
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'scraper':<16}{'pages':>6}{'rows':>6}{'time (s)':>10}  result")
+    for summary in summaries:
+        result = summary['error'] or ("unchanged, CSV kept" if summary['unchanged'] else summary['csv'] or "no data")
+        print(f"{summary['scraper']:<16}{summary['pages']:>6}{summary['rows']:>6}{summary['seconds']:>10.2f}  {result}")
+    print(f"\n{fetcher.requests} HTTP requests ({fetcher.not_modified} not modified), "
+          f"{fetcher.bytes / 1024:.0f} KB in {elapsed:.2f}s")
+    return summaries
+
+
+if __name__ == '__main__':
+    main()
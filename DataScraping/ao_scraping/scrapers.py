@@ -0,0 +1,38 @@
+"""
+The six scraping scripts, importable by name.
+
+Every script defines its page URL(s) (`target_url` or `target_urls`),
+`OUTPUT_CSV`, `parse_page(html_content, url)` returning a DataFrame (None when
+the table is missing) and `save(frames, path)`. Rankings scripts also define
+`fetch_rendered(driver, url)`, their tables only exist once JavaScript ran,
+and `LEADERS_URL`, the first of their pages of 50 players.
+"""
+import importlib
+
+from ao_scraping.rankings import ranking_urls
+
+SCRAPERS = {
+    'mens_singles': 'AO_MensSingles_Final_Data_Scraping',
+    'womens_singles': 'AO_WomensSingles_Final_Data_Scraping',
+    'mens_doubles': 'AO_MensDoubles_Final_Data_Scraping',
+    'womens_doubles': 'AO_WomensDoubles_Final_Data_Scraping',
+    'atp_rankings': 'AO_ATP_Rankings_Data_Scraping',
+    'wta_rankings': 'AO_WTA_Rankings_Data_Scraping',
+}
+
+
+def load_scraper(name):
+    """The script module of a SCRAPERS name, importing it runs no scraping"""
+    return importlib.import_module(SCRAPERS[name])
+
+
+def page_urls(scraper, max_rank=None):
+    """The script's page URLs; for rankings scripts, the pages down to max_rank when given"""
+    if max_rank and hasattr(scraper, 'LEADERS_URL'):
+        return ranking_urls(scraper.LEADERS_URL, max_rank)
+    return list(getattr(scraper, 'target_urls', None) or [scraper.target_url])
+
+
+def is_rendered(scraper):
+    """True for scripts whose tables are rendered by JavaScript (Selenium pages)"""
+    return hasattr(scraper, 'fetch_rendered')
@@ -0,0 +1,128 @@
+"""
+Local HTTP stub serving saved HTML fixtures in place of the scraped sites.
+
+A request for /<fixture file> returns that file from the fixture directory; the
+runner's --base-url rewrites every page URL to its fixture_name() on the stub.
+Responses carry an ETag (content hash) and Last-Modified (file mtime) and
+conditional requests get 304s, like the real sites; --no-validators serves
+plain 200s instead. Optional latency per response and transient 503s on the
+first requests of every path make concurrency and retries observable.
+
+Run from DataScraping/:
+    python -m ao_scraping.stub --fixtures fixtures --port 8765 [--delay 1.0] [--fail-first 1] [--no-validators]
+"""
+import argparse
+import collections
+import email.utils
+import hashlib
+import http.server
+import os
+import threading
+import time
+
+
+class FixtureStub(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops concurrent connects, which then wait out a 1s SYN retry
+    request_queue_size = 128
+
+    def __init__(self, directory, port=0, delay=0.0, fail_first=0, validators=True):
+        super().__init__(('127.0.0.1', port), _FixtureHandler)
+        self.directory = directory
+        self.delay = delay
+        self.fail_first = fail_first
+        self.validators = validators
+        self.bytes_sent = 0
+        self.requests = collections.Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve from a daemon thread, returns self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def count(self, path):
+        with self._lock:
+            self.requests[path] += 1
+            return self.requests[path]
+
+
+class _FixtureHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        stub = self.server
+        attempt = stub.count(self.path)
+        if stub.delay:
+            time.sleep(stub.delay)
+        if attempt <= stub.fail_first:
+            self.send_error(503, "Transient stub failure")
+            return
+
+        path = os.path.join(stub.directory, os.path.basename(self.path.split('?', 1)[0]))
+        if not os.path.isfile(path):
+            self.send_error(404, "No such fixture")
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+
+        validators = {}
+        if stub.validators:
+            validators['ETag'] = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            validators['Last-Modified'] = email.utils.formatdate(os.path.getmtime(path), usegmt=True)
+            if self._not_modified(validators, os.path.getmtime(path)):
+                self.send_response(304)
+                for name, value in validators.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in validators.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with stub._lock:
+            stub.bytes_sent += len(body)
+
+    def _not_modified(self, validators, mtime):
+        # If-None-Match wins over If-Modified-Since, as in RFC 9110
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return validators['ETag'] in [tag.strip() for tag in if_none_match.split(',')]
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is not None:
+            try:
+                return int(mtime) <= email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default='fixtures')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help="seconds before every response")
+    parser.add_argument('--fail-first', type=int, default=0, help="503 responses before each path succeeds")
+    parser.add_argument('--no-validators', action='store_true', help="no ETag/Last-Modified, never 304")
+    args = parser.parse_args()
+
+    stub = FixtureStub(args.fixtures, args.port, args.delay, args.fail_first, not args.no_validators)
+    print(f"Serving {args.fixtures}/ on {stub.url}")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Table extraction with lxml, driven by a declarative spec per scraper.
+
+A spec is a plain dict:
+
+    {
+        'table_class': 'sortable wikitable',   # class attribute of the table
+        'table_index': 0,                      # which of the matching tables, in page order
+        'min_cells': 6,                        # rows with fewer <td>s are skipped
+        'required': [0, 1],                    # column positions that must not be empty (optional)
+        'columns': {                           # output column -> extractor(cells)
+            'Year': cell_text(0),
+            'Champion': link_text(2, fallback=True),
+        },
+        'dtypes': {'Year': 'Int64'},           # other columns are 'string' (optional)
+    }
+
+find_table() parses the page with lxml's incremental HTML parser and stops at
+the end of the target table, so nothing after it is parsed and no soup is
+built. iter_rows() then yields one list per data row, and extract_table()
+feeds that generator straight into a typed DataFrame.
+
+The semantics are BeautifulSoup's, so the CSVs stay byte for byte the same:
+- a class with spaces must equal the whole attribute, a single class may be
+  any of its classes;
+- the first <tr> is the header;
+- a row's cells are all its <td> descendants;
+- cell text is get_text(strip=True): every descendant text stripped and
+  joined, without comments, <script> or <style>.
+"""
+import io
+import itertools
+import re
+
+import pandas as pd
+from lxml import etree
+
+_TEXT = etree.XPath('.//text()[not(ancestor::script) and not(ancestor::style)]')
+_REFERENCE = re.compile(r'\[.*?\]')
+
+
+def text(element):
+    """BeautifulSoup's element.get_text(strip=True)"""
+    return ''.join(part.strip() for part in _TEXT(element))
+
+
+def _class_matches(element, table_class):
+    classes = element.get('class')
+    if classes is None:
+        return False
+    if ' ' in table_class:
+        return ' '.join(classes.split()) == table_class
+    return table_class in classes.split()
+
+
+def find_table(html_content, table_class, index=0):
+    """The index-th <table> of the given class, parsed up to its end tag; None when there are fewer"""
+    data = html_content.encode('utf-8') if isinstance(html_content, str) else html_content
+    matching = 0
+    target = None
+    for event, element in etree.iterparse(io.BytesIO(data), events=('start', 'end'), tag='table', html=True,
+                                          encoding='utf-8', recover=True):
+        if event == 'start':
+            # Tables count in order of their start tags, like find_all
+            if target is None and _class_matches(element, table_class):
+                if matching == index:
+                    target = element
+                matching += 1
+        elif element is target:
+            return target
+    return None
+
+
+def cell_text(index):
+    """Text of the cell"""
+    return lambda cells: text(cells[index])
+
+
+def link_text(index, fallback=False):
+    """Text of the cell's first link; without one, '' or with fallback the cell's text"""
+    def extract(cells):
+        link = next(cells[index].iterdescendants('a'), None)
+        if link is not None:
+            return text(link)
+        return text(cells[index]) if fallback else ''
+    return extract
+
+
+def span_text(index, position, strip_chars=None):
+    """Text of the cell's position-th <span>, stripped of strip_chars; '' when it has fewer"""
+    def extract(cells):
+        span = next(itertools.islice(cells[index].iterdescendants('span'), position, None), None)
+        return '' if span is None else text(span).strip(strip_chars)
+    return extract
+
+
+def without_references(index):
+    """Text of the cell without bracketed references such as [14] or [b]"""
+    return lambda cells: _REFERENCE.sub('', text(cells[index])).strip()
+
+
+def flag_countries(index, convert):
+    """Comma-joined convert(alt) of the cell's flagicon spans (direct children only)"""
+    def extract(cells):
+        countries = []
+        for child in cells[index]:
+            if child.tag == 'span' and 'flagicon' in child.get('class', '').split():
+                img = next(child.iterdescendants('img'), None)
+                if img is not None and 'alt' in img.attrib:
+                    countries.append(convert(img.get('alt').strip()))
+        return ", ".join(countries)
+    return extract
+
+
+def flag_names(index):
+    """Comma-joined texts of the cell's non-empty links (direct children only)"""
+    def extract(cells):
+        names = [text(child) for child in cells[index] if child.tag == 'a']
+        return ", ".join(name for name in names if name)
+    return extract
+
+
+def iter_rows(table, spec, url=None):
+    """One list of column values per data row of table"""
+    extractors = list(spec['columns'].values())
+    required = spec.get('required', [])
+    for tr in itertools.islice(table.iter('tr'), 1, None):
+        cells = tr.findall('.//td')
+        if len(cells) < spec['min_cells']:
+            continue
+        row_data = [extract(cells) for extract in extractors]
+        missing = next((index for index in required if not row_data[index]), None)
+        if missing is not None:
+            print(f"Skipping row data in {url} due to empty critical data at index {missing}: {row_data}")
+            continue
+        yield row_data
+
+
+def typed_frame(rows, spec):
+    """DataFrame of rows with the spec's dtypes, 'string' for the other columns"""
+    columns = list(spec['columns'])
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    dtypes = spec.get('dtypes', {})
+    for column in columns:
+        dtype = dtypes.get(column, 'string')
+        if dtype == 'Int64' and not df[column].str.fullmatch(r'\d+').all():
+            # A value the page never had before, keep the text rather than lose it
+            print(f"Warning: non-integer values in {column}, keeping it as text")
+            dtype = 'string'
+        df[column] = df[column].astype(dtype)
+    return df
+
+
+def extract_table(html_content, spec, url=None):
+    """The spec's table of the page as a typed DataFrame, None when the table is missing"""
+    table = find_table(html_content, spec['table_class'], spec.get('table_index', 0))
+    if table is None:
+        return None
+    return typed_frame(iter_rows(table, spec, url), spec)
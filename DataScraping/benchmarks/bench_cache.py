@@ -0,0 +1,78 @@
+"""
+Cold vs warm scraping runs through the on-disk HTTP cache, against the fixture stub.
+
+The runner scrapes all six pages into one output directory four times:
+
+    cold            empty cache, every page downloaded, parsed and written
+    warm            cache filled, the stub answers every conditional request with 304
+    one changed     one fixture edited, only its scraper parses and rewrites its CSV
+    no validators   stub without ETag/Last-Modified, full downloads but identical
+                    content hashes, nothing parsed or written
+
+Run from DataScraping/:
+    python -m benchmarks.bench_cache --delay 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from ao_scraping import runner
+from ao_scraping.fixtures import build_fixtures, fixture_name
+from ao_scraping.scrapers import load_scraper
+from ao_scraping.stub import FixtureStub
+
+NO_RATE_LIMIT = {host: {'concurrency': 8, 'per_second': 0} for host in runner.HOST_LIMITS}
+
+
+def scrape(stub, out_dir, cache_dir):
+    args = runner.build_parser().parse_args(['--base-url', stub.url, '--rankings', 'http', '--out-dir', out_dir,
+                                             '--cache-dir', cache_dir])
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        summaries, fetcher = asyncio.run(runner.run(args, NO_RATE_LIMIT))
+    elapsed = time.perf_counter() - start
+    parsed = [summary['scraper'] for summary in summaries if not summary['unchanged']]
+    return elapsed, fetcher, parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--delay', type=float, default=0.2, help="stub latency per page in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fixtures = os.path.join(tmp_dir, 'fixtures')
+        out_dir = os.path.join(tmp_dir, 'out')
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        build_fixtures(fixtures)
+        stub = FixtureStub(fixtures, delay=args.delay).start()
+        plain_stub = FixtureStub(fixtures, delay=args.delay, validators=False).start()
+
+        def edit_one_fixture():
+            path = os.path.join(fixtures, fixture_name(load_scraper('mens_singles').target_url))
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('<!-- edited -->\n')
+
+        runs = [
+            ('cold', stub, None),
+            ('warm', stub, None),
+            ('one changed', stub, edit_one_fixture),
+            ('no validators', plain_stub, None),
+        ]
+        print(f"{'run':<15}{'time (s)':>10}{'requests':>10}{'304s':>6}{'KB fetched':>12}  parsed and written")
+        for name, server, before in runs:
+            if before:
+                before()
+            elapsed, fetcher, parsed = scrape(server, out_dir, cache_dir)
+            print(f"{name:<15}{elapsed:>10.2f}{fetcher.requests:>10}{fetcher.not_modified:>6}"
+                  f"{fetcher.bytes / 1024:>12.1f}  {', '.join(parsed) or 'none'}")
+        stub.shutdown()
+        plain_stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
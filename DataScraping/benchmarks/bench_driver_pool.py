@@ -0,0 +1,80 @@
+"""
+Rankings pages rendered one tour and one driver at a time vs the DriverPool.
+
+Serves rankings fixtures down to --max-rank for both tours from the stub and
+renders every page in headless Chrome:
+
+    per script      what the scripts do: one driver per tour, started for it,
+                    pages loaded one after the other
+    pool of N       one DriverPool of N drivers for both tours, every page
+                    submitted at once
+
+Needs Chrome and a chromedriver (--driver-path, $CHROMEDRIVER_PATH or
+Selenium Manager).
+
+Run from DataScraping/:
+    python -m benchmarks.bench_driver_pool --max-rank 1000 --sizes 1 4 8 --delay 0.5
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from ao_scraping.driver_pool import DriverPool
+from ao_scraping.fixtures import build_fixtures, fixture_name
+from ao_scraping.scrapers import load_scraper, page_urls
+from ao_scraping.stub import FixtureStub
+
+TOURS = ['atp_rankings', 'wta_rankings']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-rank', type=int, default=1000)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 4, 8], help="pool sizes to time")
+    parser.add_argument('--delay', type=float, default=0.5, help="stub latency per page in seconds")
+    parser.add_argument('--driver-path')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fixtures = os.path.join(tmp_dir, 'fixtures')
+        build_fixtures(fixtures, scrapers=TOURS, max_rank=args.max_rank)
+        stub = FixtureStub(fixtures, delay=args.delay).start()
+
+        def render(scraper):
+            def fetch(driver, url):
+                return scraper.fetch_rendered(driver, f"{stub.url}/{fixture_name(url)}")
+            return fetch
+
+        tour_jobs = {name: [(render(load_scraper(name)), url) for url in page_urls(load_scraper(name), args.max_rank)]
+                     for name in TOURS}
+        jobs = [job for name in TOURS for job in tour_jobs[name]]
+        print(f"{len(jobs)} pages, ranks 1-{args.max_rank} of {len(TOURS)} tours, {args.delay}s stub latency\n")
+        print(f"{'mode':<14}{'time (s)':>10}{'pages/s':>9}{'drivers':>9}")
+
+        def report(mode, elapsed, drivers):
+            print(f"{mode:<14}{elapsed:>10.2f}{len(jobs) / elapsed:>9.1f}{drivers:>9}")
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name in TOURS:
+                with DriverPool(1, args.driver_path) as pool:
+                    for fetch, url in tour_jobs[name]:
+                        pool.submit(fetch, url).result()
+        report('per script', time.perf_counter() - start, len(TOURS))
+
+        for size in args.sizes:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                with DriverPool(size, args.driver_path) as pool:
+                    futures = [pool.submit(fetch, url) for fetch, url in jobs]
+                    for future in futures:
+                        future.result()
+            report(f"pool of {size}", time.perf_counter() - start, size + pool.restarts)
+        stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
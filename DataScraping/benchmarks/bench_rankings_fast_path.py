@@ -0,0 +1,147 @@
+"""
+Rankings pages through the browser-free fast path vs rendered in Chrome, per page.
+
+Both modes read the same players from saved fixtures served by the stub: the
+fast path downloads the payload fixtures (rows in a script literal, as a plain
+HTTP client sees the page) and runs fast_frame; Selenium loads the rendered
+fixtures in headless Chrome and runs parse_page on the page source. Reported
+per mode:
+
+    startup     seconds before the first page (Chrome and chromedriver launch)
+    per page    mean seconds per page, download and parse
+    py peak     peak Python allocations of one page (tracemalloc, separate pass)
+    rss         resident memory of this process plus its children (Chrome)
+                after the run
+
+The Selenium row is skipped when no Chrome/chromedriver can be started
+(--driver-path, $CHROMEDRIVER_PATH or Selenium Manager).
+
+Run from DataScraping/:
+    python -m benchmarks.bench_rankings_fast_path --max-rank 1000
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import requests
+
+from ao_scraping.driver_pool import default_driver_path
+from ao_scraping.fixtures import build_fixtures, fixture_name
+from ao_scraping.rankings import fast_frame, rankings_problems
+from ao_scraping.scrapers import load_scraper, page_urls
+from ao_scraping.stub import FixtureStub
+
+TOURS = ['atp_rankings', 'wta_rankings']
+
+
+def _rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _children(pid):
+    children = []
+    try:
+        for task in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                children += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    return children
+
+
+def tree_rss_mb(pid=None):
+    """Resident memory of pid (default this process) and all its descendants"""
+    pids = [pid or os.getpid()]
+    total = 0.0
+    while pids:
+        current = pids.pop()
+        total += _rss_mb(current)
+        pids += _children(current)
+    return total
+
+
+def run_pages(jobs, load):
+    """(seconds per page, peak Python MB of one page); load(scraper, url) returns its frame"""
+    start = time.perf_counter()
+    frames = [load(scraper, url) for scraper, url in jobs]
+    per_page = (time.perf_counter() - start) / len(jobs)
+    for (scraper, url), frame in zip(jobs, frames):
+        problems = rankings_problems(frame, scraper.cleaned_headers)
+        if problems:
+            raise SystemExit(f"{url}: {'; '.join(problems)}")
+
+    # tracemalloc slows allocations down, memory gets its own pass over one page
+    tracemalloc.start()
+    load(*jobs[0])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return per_page, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-rank', type=int, default=100, help="pages down to this rank, both tours")
+    parser.add_argument('--driver-path')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        payload_dir = os.path.join(tmp_dir, 'payload')
+        rendered_dir = os.path.join(tmp_dir, 'rendered')
+        build_fixtures(payload_dir, scrapers=TOURS, max_rank=args.max_rank, payload=True)
+        build_fixtures(rendered_dir, scrapers=TOURS, max_rank=args.max_rank)
+        payload_stub = FixtureStub(payload_dir).start()
+        rendered_stub = FixtureStub(rendered_dir).start()
+
+        jobs = [(load_scraper(name), url) for name in TOURS for url in page_urls(load_scraper(name), args.max_rank)]
+        print(f"{len(jobs)} pages, ranks 1-{args.max_rank} of {len(TOURS)} tours\n")
+        print(f"{'mode':<10}{'startup (s)':>12}{'per page (ms)':>15}{'py peak (MB)':>14}{'rss (MB)':>10}")
+
+        session = requests.Session()
+
+        def fast(scraper, url):
+            response = session.get(f"{payload_stub.url}/{fixture_name(url)}")
+            response.raise_for_status()
+            return fast_frame(response.text, url, scraper.parse_page, scraper.cleaned_headers)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            per_page, peak = run_pages(jobs, fast)
+        print(f"{'fast':<10}{0.0:>12.2f}{per_page * 1000:>15.1f}{peak:>14.1f}{tree_rss_mb():>10.0f}")
+
+        try:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.service import Service
+
+            start = time.perf_counter()
+            driver = webdriver.Chrome(service=Service(args.driver_path or default_driver_path()),
+                                      options=jobs[0][0].make_chrome_options())
+            startup = time.perf_counter() - start
+        except Exception as e:
+            print(f"{'selenium':<10}skipped, no Chrome: {type(e).__name__}")
+        else:
+            def rendered(scraper, url):
+                html_content = scraper.fetch_rendered(driver, f"{rendered_stub.url}/{fixture_name(url)}")
+                return scraper.parse_page(html_content, url)
+
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    per_page, peak = run_pages(jobs, rendered)
+                print(f"{'selenium':<10}{startup:>12.2f}{per_page * 1000:>15.1f}{peak:>14.1f}{tree_rss_mb():>10.0f}")
+            finally:
+                driver.quit()
+        payload_stub.shutdown()
+        rendered_stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Scraping runner vs the scripts one after another, against the fixture stub.
+
+The stub adds --delay seconds of latency to every page. Sequential runs each
+script's flow in turn (blocking requests.get per page, no session reuse, then
+parse and save); the runner fetches everything concurrently, once with the
+polite HOST_LIMITS and once without rate limits, where it should finish in
+about the time of the slowest page.
+
+Run from DataScraping/:
+    python -m benchmarks.bench_runner --delay 1.0
+"""
+import argparse
+import asyncio
+import contextlib
+import filecmp
+import io
+import os
+import tempfile
+import time
+
+import requests
+
+from ao_scraping import runner
+from ao_scraping.fixtures import build_fixtures
+from ao_scraping.scrapers import SCRAPERS, load_scraper, page_urls
+from ao_scraping.stub import FixtureStub
+
+
+def sequential(stub_url, out_dir):
+    fetcher = runner.Fetcher(None, stub_url)
+    for name in SCRAPERS:
+        scraper = load_scraper(name)
+        frames = [scraper.parse_page(requests.get(fetcher.request_url(url)).text, url) for url in page_urls(scraper)]
+        scraper.save([frame for frame in frames if frame is not None], os.path.join(out_dir, scraper.OUTPUT_CSV))
+
+
+def concurrent(stub_url, out_dir, host_limits):
+    args = runner.build_parser().parse_args(['--base-url', stub_url, '--rankings', 'http', '--out-dir', out_dir,
+                                        '--no-cache'])
+    asyncio.run(runner.run(args, host_limits))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--delay', type=float, default=1.0, help="stub latency per page in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fixtures = os.path.join(tmp_dir, 'fixtures')
+        build_fixtures(fixtures)
+        stub = FixtureStub(fixtures, delay=args.delay).start()
+
+        modes = [
+            ('sequential', lambda out_dir: sequential(stub.url, out_dir)),
+            ('runner (HOST_LIMITS)', lambda out_dir: concurrent(stub.url, out_dir, None)),
+            ('runner (no rate limit)', lambda out_dir: concurrent(stub.url, out_dir, {
+                host: {'concurrency': 8, 'per_second': 0} for host in runner.HOST_LIMITS})),
+        ]
+        print(f"{'mode':<24}{'time (s)':>10}  CSVs match the scripts'")
+        for i, (mode, run) in enumerate(modes):
+            out_dir = os.path.join(tmp_dir, f"out_{i}")
+            os.makedirs(out_dir)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                run(out_dir)
+            elapsed = time.perf_counter() - start
+            same = all(filecmp.cmp(os.path.join(out_dir, load_scraper(name).OUTPUT_CSV), load_scraper(name).OUTPUT_CSV,
+                                   shallow=False) for name in SCRAPERS)
+            print(f"{mode:<24}{elapsed:>10.2f}  {same}")
+        stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Per-page parse time and memory of the lxml table engine vs the BeautifulSoup parsers it replaced.
+
+The BeautifulSoup parse_page of every script is loaded from BASELINE_REV (the
+last revision that parsed with it) through git, the lxml one is the script's
+current parse_page. Both parse the same reconstructed fixture pages, and the
+CSV both produce for every scraper must be identical. Memory is the peak of
+Python allocations over a scraper's pages (tracemalloc): the soup's objects
+for BeautifulSoup; lxml's tree lives in libxml2's C heap in both modes and is
+not counted.
+
+Run from DataScraping/:
+    python -m benchmarks.bench_tables [--repeat 20] [--max-rank 1000]
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from ao_scraping.fixtures import build_fixtures, fixture_name
+from ao_scraping.scrapers import SCRAPERS, load_scraper, page_urls
+
+# Last revision whose scripts parse with BeautifulSoup
+BASELINE_REV = '5d6f48e'
+
+
+def load_baseline(name, tmp_dir, rev=BASELINE_REV):
+    """The script module of name as of rev"""
+    path = os.path.join(tmp_dir, f'baseline_{SCRAPERS[name]}.py')
+    source = subprocess.run(['git', 'show', f'{rev}:./{SCRAPERS[name]}.py'], check=True, capture_output=True,
+                            text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(source)
+    spec = importlib.util.spec_from_file_location(f'baseline_{name}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_all(scraper, pages):
+    """CSV text of every page parsed and concatenated the way the script saves them"""
+    import pandas as pd
+
+    frames = [frame for frame in (scraper.parse_page(html_content, url) for url, html_content in pages)
+              if frame is not None]
+    return pd.concat(frames, ignore_index=True).to_csv(index=False)
+
+
+def time_pages(scraper, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url, html_content in pages:
+            scraper.parse_page(html_content, url)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+
+def peak_mb(scraper, pages):
+    tracemalloc.start()
+    for url, html_content in pages:
+        scraper.parse_page(html_content, url)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--max-rank', type=int, help="rankings pages down to this rank, default the top 100")
+    parser.add_argument('--baseline-rev', default=BASELINE_REV)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fixtures = os.path.join(tmp_dir, 'fixtures')
+        build_fixtures(fixtures, max_rank=args.max_rank)
+
+        print(f"{'scraper':<16}{'pages':>6}{'rows':>6}{'bs4 (ms)':>10}{'lxml (ms)':>11}{'speedup':>9}"
+              f"{'bs4 py MB':>11}{'lxml py MB':>12}  identical CSV")
+        identical = True
+        for name in SCRAPERS:
+            scraper = load_scraper(name)
+            baseline = load_baseline(name, tmp_dir, args.baseline_rev)
+            pages = []
+            for url in page_urls(scraper, args.max_rank):
+                with open(os.path.join(fixtures, fixture_name(url)), encoding='utf-8') as f:
+                    pages.append((url, f.read()))
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                expected = parse_all(baseline, pages)
+                actual = parse_all(scraper, pages)
+                soup_seconds = time_pages(baseline, pages, args.repeat)
+                lxml_seconds = time_pages(scraper, pages, args.repeat)
+                soup_mb = peak_mb(baseline, pages)
+                lxml_mb = peak_mb(scraper, pages)
+            identical &= expected == actual
+            print(f"{name:<16}{len(pages):>6}{actual.count(chr(10)) - 1:>6}{soup_seconds * 1000:>10.2f}"
+                  f"{lxml_seconds * 1000:>11.2f}{soup_seconds / lxml_seconds:>8.1f}x"
+                  f"{soup_mb:>11.1f}{lxml_mb:>12.1f}  {'yes' if expected == actual else 'NO'}")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
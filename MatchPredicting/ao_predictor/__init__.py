@@ -0,0 +1 @@
+"""Reusable building blocks for the Australian Open head-to-head predictor."""
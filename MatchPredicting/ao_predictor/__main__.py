@@ -0,0 +1,3 @@
+from ao_predictor.cli import main
+
+main()
@@ -0,0 +1,149 @@
+"""
+Versioned, memory-mappable model artifact.
+
+An artifact is a directory holding a small metadata.json header and one .npy file
+per large array (forest node table, scaler tables). Arrays are opened with
+mmap_mode='r', so every worker process on a host shares one page-cache copy
+instead of unpickling a private forest.
+
+    ao_head_to_head_predictor/
+        metadata.json
+        forest_feature.npy  forest_threshold.npy  forest_children.npy
+        forest_value.npy    forest_roots.npy
+        encoder_means.npy   encoder_scales.npy
+
+A pickled pipeline gets the same header without the arrays as a sidecar,
+ao_head_to_head_predictor.pkl.json, so how a model was trained (antisymmetric
+or not) travels with it in both formats.
+"""
+import datetime
+import json
+import os
+import shutil
+
+import numpy as np
+
+from ao_predictor.fast_encoding import CompiledEncoder, FastPredictor
+from ao_predictor.flat_forest import ARRAY_NAMES, FlatForest
+
+FORMAT_VERSION = 1
+
+METADATA_FILE = 'metadata.json'
+
+
+def _array_file(name):
+    return f"{name}.npy"
+
+
+def pickle_metadata_path(model_path):
+    return f"{model_path}.json"
+
+
+def _training_metadata(antisymmetric, training_date_range, metrics):
+    return {
+        'format_version': FORMAT_VERSION,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        # Trained on one canonical row per match, predictions must score both orientations
+        'antisymmetric': bool(antisymmetric),
+        'training_date_range': list(training_date_range) if training_date_range else None,
+        'metrics': metrics or {},
+    }
+
+
+def save_pickle_metadata(model_path, antisymmetric=False, training_date_range=None, metrics=None):
+    """Write the sidecar header of a pickled pipeline saved at model_path"""
+    metadata = _training_metadata(antisymmetric, training_date_range, metrics)
+    sidecar = pickle_metadata_path(model_path)
+    tmp_path = f"{sidecar}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(tmp_path, sidecar)
+    return metadata
+
+
+def save_artifact(model, path, training_date_range=None, metrics=None, float32=False, antisymmetric=False):
+    """
+    Write a fitted Pipeline as an artifact directory at path.
+
+    The directory is built next to path and swapped in at the end, so readers
+    never see a half-written artifact. float32=True stores FlatForest.astype32()
+    thresholds and leaf values.
+    """
+    predictor = FastPredictor.from_pipeline(model, flatten=True)
+    encoder, forest = predictor.encoder, predictor.classifier
+    if not isinstance(forest, FlatForest):
+        raise ValueError(f"Artifacts hold random forests, got {type(forest).__name__}; pickle the pipeline instead")
+    if float32:
+        forest = forest.astype32()
+
+    arrays = {f"forest_{name}": getattr(forest, name) for name in ARRAY_NAMES}
+    arrays['encoder_means'] = encoder.means
+    arrays['encoder_scales'] = encoder.scales
+
+    metadata = _training_metadata(antisymmetric, training_date_range, metrics)
+    metadata.update({
+        'numeric_features': encoder.numeric_features,
+        'categorical_features': encoder.categorical_features,
+        'categories': [[str(value) for value in values] for values in encoder.categories],
+        'forest': {'n_trees': forest.n_trees, 'n_nodes': forest.n_nodes, 'max_depth': forest.max_depth},
+        'arrays': {name: {'file': _array_file(name), 'dtype': str(array.dtype), 'shape': list(array.shape)}
+                   for name, array in arrays.items()},
+    })
+
+    path = os.path.normpath(path)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, _array_file(name)), np.ascontiguousarray(array))
+    with open(os.path.join(tmp_path, METADATA_FILE), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    old_path = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return metadata
+
+
+def read_metadata(path):
+    with open(os.path.join(path, METADATA_FILE)) as f:
+        metadata = json.load(f)
+    if metadata.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {metadata.get('format_version')} in {path}, "
+                         f"expected {FORMAT_VERSION}")
+    return metadata
+
+
+def model_metadata(path):
+    """
+    Header of an artifact directory or a pickle's sidecar.
+
+    Pickles saved without a sidecar read as {}, i.e. not antisymmetric.
+    """
+    if os.path.isdir(path):
+        return read_metadata(path)
+    sidecar = pickle_metadata_path(path)
+    if not os.path.exists(sidecar):
+        return {}
+    with open(sidecar) as f:
+        return json.load(f)
+
+
+def load_artifact(path, mmap=True):
+    """
+    FastPredictor backed by the artifact's arrays, memory-mapped read-only by default.
+
+    The parsed header is available as predictor.metadata.
+    """
+    metadata = read_metadata(path)
+    mmap_mode = 'r' if mmap else None
+    arrays = {name: np.load(os.path.join(path, spec['file']), mmap_mode=mmap_mode)
+              for name, spec in metadata['arrays'].items()}
+
+    forest = FlatForest(*(arrays[f"forest_{name}"] for name in ARRAY_NAMES),
+                        max_depth=metadata['forest']['max_depth'])
+    encoder = CompiledEncoder(metadata['numeric_features'], arrays['encoder_means'], arrays['encoder_scales'],
+                              metadata['categorical_features'], metadata['categories'])
+    return FastPredictor(encoder, forest, metadata)
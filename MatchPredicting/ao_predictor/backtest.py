@@ -0,0 +1,305 @@
+"""
+Walk-forward backtest: retrain on every match before a window, score the window.
+
+Windows are seasons (calendar years) or months. The engineered features are built
+once, sorted by date and written as .npy files that every fold process opens
+memory-mapped, so a fold only slices a training prefix and a test window out of
+the shared matrix instead of rebuilding features. Folds run in a process pool,
+longest training prefix first.
+
+Every window reports accuracy, ROC AUC and log-loss per match, plus the ROI of a
+flat 1-unit stake on the predicted winner at Odd_1/Odd_2. Matches whose odds were
+missing in the source are scored but not bet on.
+
+Run from MatchPredicting/:
+    python -m ao_predictor.backtest --csv atp.csv --freq season --workers 4
+    python -m ao_predictor.backtest --csv atp.csv --freq month --start 2023-01-01 --out backtest.csv
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from ao_predictor.features import build_match_features
+from ao_predictor.symmetric import build_canonical_features, canonical_flip
+from ao_predictor.training import clean_matches, feature_frame
+
+FREQUENCIES = {'season': 'datetime64[Y]', 'month': 'datetime64[M]'}
+
+# Windows of training history required before the first scored window
+DEFAULT_WARMUP = {'season': 3, 'month': 36}
+
+COLUMNS_FILE = 'columns.json'
+
+# Per-row arrays next to the feature matrix, all aligned with its rows
+ROW_ARRAYS = ('numeric', 'codes', 'target', 'date', 'match', 'p_is_player_1')
+
+# Per-match arrays, indexed by the row array 'match'
+MATCH_ARRAYS = ('odd_1', 'odd_2', 'has_odds', 'player_1_won')
+
+
+class BacktestMatrix:
+    """
+    Date-sorted, model-ready features for every row plus the per-match betting data.
+
+    Numeric features are one float64 block, categoricals one block of codes into
+    per-column category lists, so a fold frame is rebuilt from row slices without
+    touching the source CSV.
+    """
+
+    def __init__(self, columns, numeric_features, categorical_features, categories, antisymmetric, arrays):
+        self.columns = list(columns)
+        self.numeric_features = list(numeric_features)
+        self.categorical_features = list(categorical_features)
+        self.categories = [list(values) for values in categories]
+        self.antisymmetric = bool(antisymmetric)
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+    @classmethod
+    def build(cls, df_atp, antisymmetric=False, seed=42):
+        """From cleaned matches with a 'Tourney Date' column and a boolean 'Has_Odds' column"""
+        df_atp = df_atp.sort_values('Tourney Date', kind='stable').reset_index(drop=True)
+        n_matches = len(df_atp)
+        if antisymmetric:
+            df_processed = build_canonical_features(df_atp, seed)
+            match = np.arange(n_matches)
+            p_is_player_1 = ~canonical_flip(n_matches, seed)
+        else:
+            # Rows 2*i and 2*i+1 are match i from Player_1 and from Player_2
+            df_processed = build_match_features(df_atp)
+            match = np.arange(n_matches).repeat(2)
+            p_is_player_1 = np.tile([True, False], n_matches)
+
+        X, y = feature_frame(df_processed)
+        numeric_features = X.select_dtypes(include=np.number).columns.tolist()
+        categorical_features = X.select_dtypes(include=['object', 'category']).columns.tolist()
+        categoricals = [pd.Categorical(X[column]) for column in categorical_features]
+
+        target = y.to_numpy(dtype=np.int8)
+        first_rows = np.flatnonzero(np.r_[True, match[1:] != match[:-1]])
+        arrays = {
+            'numeric': X[numeric_features].to_numpy(dtype=np.float64),
+            'codes': np.column_stack([values.codes for values in categoricals]).astype(np.int32),
+            'target': target,
+            'date': df_processed['Tourney Date'].to_numpy(dtype='datetime64[D]'),
+            'match': match.astype(np.int64),
+            'p_is_player_1': p_is_player_1,
+            'odd_1': df_atp['Odd_1'].to_numpy(dtype=np.float64),
+            'odd_2': df_atp['Odd_2'].to_numpy(dtype=np.float64),
+            'has_odds': df_atp['Has_Odds'].to_numpy(dtype=bool),
+            'player_1_won': np.where(p_is_player_1[first_rows], target[first_rows], 1 - target[first_rows]),
+        }
+        categories = [values.categories.tolist() for values in categoricals]
+        return cls(X.columns, numeric_features, categorical_features, categories, antisymmetric, arrays)
+
+    @property
+    def n_rows(self):
+        return len(self.target)
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in ROW_ARRAYS + MATCH_ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, COLUMNS_FILE), 'w') as f:
+            json.dump({'columns': self.columns, 'numeric_features': self.numeric_features,
+                       'categorical_features': self.categorical_features,
+                       'categories': [[str(value) for value in values] for values in self.categories],
+                       'antisymmetric': self.antisymmetric}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, COLUMNS_FILE)) as f:
+            columns = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None)
+                  for name in ROW_ARRAYS + MATCH_ARRAYS}
+        return cls(columns['columns'], columns['numeric_features'], columns['categorical_features'],
+                   columns['categories'], columns['antisymmetric'], arrays)
+
+    def frame(self, start, stop):
+        """Model input frame for rows [start, stop), columns in feature_frame's order"""
+        data = {name: self.numeric[start:stop, i] for i, name in enumerate(self.numeric_features)}
+        for i, name in enumerate(self.categorical_features):
+            data[name] = pd.Categorical.from_codes(self.codes[start:stop, i], self.categories[i])
+        return pd.DataFrame(data, columns=self.columns)
+
+    def windows(self, freq='season', warmup=None, start=None):
+        """[(label, start_row, stop_row)] for every window scored by the walk-forward"""
+        periods = self.date.astype(FREQUENCIES[freq])
+        boundaries = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+        stops = np.r_[boundaries[1:], self.n_rows]
+        labels = [str(period) for period in periods[boundaries]]
+
+        warmup = DEFAULT_WARMUP[freq] if warmup is None else warmup
+        first = warmup
+        if start is not None:
+            start_period = np.datetime64(start, 'D').astype(FREQUENCIES[freq])
+            first = max(first, int(np.searchsorted(periods[boundaries], start_period)))
+        return [(labels[i], int(boundaries[i]), int(stops[i])) for i in range(first, len(labels))]
+
+
+def window_metrics(p_player_1, player_1_won, odd_1, odd_2, has_odds):
+    """Per-match accuracy, AUC, log-loss and the flat-stake ROI of betting the predicted winner"""
+    from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+
+    backs_player_1 = p_player_1 > 0.5
+    won = np.where(backs_player_1, player_1_won == 1, player_1_won == 0)
+    odds = np.where(backs_player_1, odd_1, odd_2)
+    bets = has_odds & (odds > 1)
+    profit = np.where(won[bets], odds[bets] - 1.0, -1.0)
+    two_classes = len(np.unique(player_1_won)) == 2
+    return {
+        'matches': len(p_player_1),
+        'accuracy': accuracy_score(player_1_won, backs_player_1.astype(np.int8)),
+        'roc_auc': roc_auc_score(player_1_won, p_player_1) if two_classes else np.nan,
+        'log_loss': log_loss(player_1_won, np.clip(p_player_1, 1e-15, 1 - 1e-15), labels=[0, 1]),
+        'bets': int(bets.sum()),
+        'roi': profit.mean() if len(profit) else np.nan,
+    }
+
+
+def score_window(matrix, model, start, stop):
+    """p(Player_1 wins) for every match in rows [start, stop), both perspectives averaged"""
+    X_test = matrix.frame(start, stop)
+    if matrix.antisymmetric:
+        from ao_predictor.symmetric import predict_proba_symmetric
+        p_rows = predict_proba_symmetric(model, X_test)[:, 1]
+    else:
+        p_rows = model.predict_proba(X_test)[:, 1]
+    p_player_1 = np.where(matrix.p_is_player_1[start:stop], p_rows, 1.0 - p_rows)
+
+    match = matrix.match[start:stop]
+    first_match = match[0]
+    local = match - first_match
+    p_match = np.bincount(local, weights=p_player_1) / np.bincount(local)
+    matches = slice(first_match, match[-1] + 1)
+    return p_match, matches
+
+
+def run_fold(matrix, label, start, stop, n_estimators=200, n_jobs=1, seed=42):
+    """Fit on rows [0, start), score rows [start, stop). Returns (metrics row, per-match probabilities)"""
+    from ao_predictor.models import make_model
+
+    fit_start = time.perf_counter()
+    X_train = matrix.frame(0, start)
+    # The predictor's random forest backend, with the backtest's tree count
+    model = make_model('random_forest', X_train, seed=seed, n_jobs=n_jobs)
+    model.set_params(classifier__n_estimators=n_estimators)
+    model.fit(X_train, np.asarray(matrix.target[:start]))
+    p_match, matches = score_window(matrix, model, start, stop)
+    elapsed = time.perf_counter() - fit_start
+
+    metrics = window_metrics(p_match, matrix.player_1_won[matches], matrix.odd_1[matches],
+                             matrix.odd_2[matches], matrix.has_odds[matches])
+    return {'window': label, 'train_rows': start, **metrics, 'seconds': elapsed}, (matches, p_match)
+
+
+_worker_matrix = None
+
+
+def _init_worker(path):
+    global _worker_matrix
+    _worker_matrix = BacktestMatrix.load(path)
+
+
+def _fold_worker(args):
+    return run_fold(_worker_matrix, *args)
+
+
+def walk_forward(matrix_path, windows, n_workers=1, n_estimators=200, seed=42, n_jobs=None):
+    """
+    Run every window's fold, in a process pool when n_workers > 1.
+
+    Each fold fits with n_jobs threads, by default the cores split evenly between
+    the workers. Returns (per-window DataFrame, pooled metrics over all windows).
+    """
+    n_cores = os.cpu_count() or 1
+    n_jobs = n_jobs or max(1, n_cores // n_workers)
+    # Biggest training prefix first, so the slowest folds don't start last
+    ordered = sorted(windows, key=lambda window: -window[1])
+    tasks = [(label, start, stop, n_estimators, n_jobs, seed) for label, start, stop in ordered]
+
+    if n_workers == 1:
+        matrix = BacktestMatrix.load(matrix_path)
+        results = [run_fold(matrix, *task) for task in tasks]
+    else:
+        # spawn: forked children would inherit a parent mid-way through BLAS/loky thread pools
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=get_context('spawn'),
+                                 initializer=_init_worker, initargs=(matrix_path,)) as pool:
+            results = list(pool.map(_fold_worker, tasks))
+        matrix = BacktestMatrix.load(matrix_path)
+
+    rows = sorted((row for row, _ in results), key=lambda row: row['window'])
+    per_window = pd.DataFrame(rows).set_index('window')
+
+    matches = np.concatenate([np.arange(slc.start, slc.stop) for _, (slc, _) in results])
+    p_match = np.concatenate([p for _, (_, p) in results])
+    pooled = window_metrics(p_match, matrix.player_1_won[matches], matrix.odd_1[matches],
+                            matrix.odd_2[matches], matrix.has_odds[matches])
+    return per_window, pooled
+
+
+def prepare_matches(df_atp):
+    """clean_matches, remembering which matches had real odds before the neutral 1.9 was imputed"""
+    has_odds = df_atp['Odd_1'].notna() & df_atp['Odd_2'].notna()
+    df_atp = clean_matches(df_atp)
+    return df_atp.assign(Has_Odds=has_odds.loc[df_atp.index])
+
+
+def main():
+    from ao_predictor.loader import load_atp_csv
+    from ao_predictor.memory import format_peak_rss
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default='atp.csv')
+    parser.add_argument('--freq', choices=sorted(FREQUENCIES), default='season')
+    parser.add_argument('--warmup', type=int, help="windows of history before the first scored window "
+                                                   "(default 3 seasons or 36 months)")
+    parser.add_argument('--start', help="first scored window on or after this date, e.g. 2015-01-01")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--n-jobs', type=int, help="threads per fold, default cores // workers")
+    parser.add_argument('--trees', type=int, default=200)
+    parser.add_argument('--antisymmetric', action='store_true', help="one canonical row per match")
+    parser.add_argument('--elo', action='store_true', help="add pre-match Elo differences (ao_predictor.elo)")
+    parser.add_argument('--form', action='store_true', help="add form and head-to-head differences (ao_predictor.form)")
+    parser.add_argument('--out', help="write the per-window table to this CSV")
+    args = parser.parse_args()
+
+    df_atp = prepare_matches(load_atp_csv(args.csv, verbose=False))
+    if args.elo:
+        from ao_predictor.elo import add_rating_features
+        df_atp = add_rating_features(df_atp)
+    if args.form:
+        from ao_predictor.form import add_form_features
+        df_atp = add_form_features(df_atp)
+
+    with tempfile.TemporaryDirectory(prefix='ao-backtest-') as matrix_path:
+        start = time.perf_counter()
+        matrix = BacktestMatrix.build(df_atp, antisymmetric=args.antisymmetric)
+        matrix.save(matrix_path)
+        windows = matrix.windows(args.freq, args.warmup, args.start)
+        print(f"Feature matrix: {matrix.n_rows:,} rows built once in {time.perf_counter() - start:.2f}s, "
+              f"{len(windows)} {args.freq} windows")
+        del matrix
+
+        start = time.perf_counter()
+        per_window, pooled = walk_forward(matrix_path, windows, args.workers, args.trees, n_jobs=args.n_jobs)
+        elapsed = time.perf_counter() - start
+
+    print(per_window.to_string(float_format='{:.4f}'.format))
+    print("\nAll windows: " + ", ".join(f"{name} {value:.4f}" if isinstance(value, float) else f"{name} {value:,}"
+                                        for name, value in pooled.items()))
+    print(f"Walk-forward finished in {elapsed:.1f}s with {args.workers} worker(s), peak RSS {format_peak_rss()}")
+    if args.out:
+        per_window.to_csv(args.out)
+        print(f"Saved per-window results to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,480 @@
+"""
+Command line for the head-to-head predictor: train, evaluate and predict.
+
+pandas and sklearn are only imported by the subcommands that need them, so
+`predict` against an artifact directory loads NumPy, memory-maps the forest and
+answers without importing either.
+
+Run from MatchPredicting/:
+    python -m ao_predictor train --csv atp.csv [--model random_forest] [--antisymmetric] [--elo] [--form]
+                                 [--report run.json] [--prometheus ao_train.prom] [--profile-stage fit]
+    python -m ao_predictor evaluate --model-path ao_head_to_head_predictor.pkl --csv atp.csv
+    python -m ao_predictor predict --rank-a 1 --pts-a 12000 --odd-a 1.5 --rank-b 2 --pts-b 10500 --odd-b 2.2
+
+Models trained with --elo/--form also need the players' Elo and form, `train`
+saves the ratings and form index it built next to the model and `predict`
+reads them from there (--elo-state, --form-index).
+
+AO_ATP_Predictor.py runs `train` followed by the hypothetical final prediction.
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+
+DEFAULT_CSV = 'atp.csv'
+DEFAULT_MODEL_PATH = 'ao_head_to_head_predictor.pkl'
+DEFAULT_ARTIFACT_PATH = 'ao_head_to_head_predictor'
+# EloRatings state and FormIndex of models trained with --elo/--form
+DEFAULT_ELO_STATE = 'ao_head_to_head_elo'
+DEFAULT_FORM_INDEX = 'ao_head_to_head_form'
+
+# RunRecorder stages of `train`, in run order; --final adds 'final'
+TRAIN_STAGES = ('load', 'clean', 'elo', 'form', 'features', 'split', 'fit', 'evaluate', 'dump', 'final')
+
+# Hypothetical 2026 Australian Open men's final, the default matchup of `predict`.
+# Placeholder estimated stats: lower rank is better, odds are for each player to win
+HYPOTHETICAL_FINAL = {
+    'player_a': 'Novak Djokovic', 'rank_a': 1, 'pts_a': 12000, 'odd_a': 1.5,
+    'player_b': 'Carlos Alcaraz', 'rank_b': 2, 'pts_b': 10500, 'odd_b': 2.2,
+    # Men's Grand Slam finals are best of 5 on the Australian Open hard courts
+    'surface': 'Hard', 'round': 'Final', 'best_of': 5,
+}
+
+
+def prepare_matches(csv_path=DEFAULT_CSV, elo=False, form=False, verbose=True, recorder=None):
+    """
+    Load and clean atp.csv, optionally with pre-match Elo and form columns.
+
+    Returns (df_atp, elo_ratings); elo_ratings is None unless elo is set. With a
+    RunRecorder, each step is recorded as a stage.
+    """
+    from ao_predictor.instrumentation import RunRecorder
+    from ao_predictor.loader import load_atp_csv
+    from ao_predictor.training import clean_matches
+
+    recorder = recorder or RunRecorder()
+    # Typed load, reuses the Parquet snapshot next to atp.csv while the CSV is unchanged
+    with recorder.stage('load') as stage:
+        df_atp = load_atp_csv(csv_path, verbose=verbose)
+        stage['rows'] = len(df_atp)
+    if verbose:
+        # Display first few rows and columns to confirm correct loading and structure
+        print("\nFirst 5 rows of the dataset:")
+        print(df_atp.head())
+        print("\nColumns in the dataset:")
+        print(df_atp.columns.tolist())
+
+    # Missing ranks get a value worse than any real rank, missing points 0, missing
+    # odds a neutral 1.9; rows without a Winner or with odds of exactly -1 are dropped
+    with recorder.stage('clean') as stage:
+        df_atp = clean_matches(df_atp)
+        stage['rows'] = len(df_atp)
+
+    elo_ratings = None
+    if elo:
+        from ao_predictor.elo import EloRatings, add_rating_features
+
+        # One chronological pass, every match sees the ratings from before it was played
+        if verbose:
+            print("\nAdding pre-match Elo ratings")
+        with recorder.stage('elo') as stage:
+            elo_ratings = EloRatings()
+            df_atp = add_rating_features(df_atp, elo_ratings)
+            stage['rows'] = len(df_atp)
+    if form:
+        from ao_predictor.form import add_form_features
+
+        # Only matches from earlier tournaments count, via sorted as-of lookups
+        if verbose:
+            print("\nAdding pre-match form and head-to-head features")
+        with recorder.stage('form') as stage:
+            df_atp = add_form_features(df_atp)
+            stage['rows'] = len(df_atp)
+    return df_atp, elo_ratings
+
+
+def build_features(df_atp, antisymmetric=False, verbose=True):
+    from ao_predictor.features import build_match_features
+    from ao_predictor.symmetric import build_canonical_features
+
+    if antisymmetric:
+        # One canonical row per match, symmetry is enforced at prediction time instead
+        if verbose:
+            print("\nAntisymmetric training mode: one row per match")
+        return build_canonical_features(df_atp)
+    # Two rows per match (P vs OP and the flipped perspective) plus the difference features
+    return build_match_features(df_atp)
+
+
+def evaluate_predictions(y_test, y_proba, split_date=None):
+    """Print the evaluation report of test probabilities, returns the metrics saved with artifacts"""
+    from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score
+
+    y_pred = (y_proba > 0.5).astype(int)
+    since = f" (Matches from {split_date.year} onwards)" if split_date is not None else ""
+    print(f"\n--- Model Evaluation on Test Set{since} ---")
+    print(f"Accuracy: {accuracy_score(y_test, y_pred):.4f}")
+    print("\nClassification Report:")
+    print(classification_report(y_test, y_pred))
+    print("\nConfusion Matrix:")
+    print(confusion_matrix(y_test, y_pred))
+    print(f"\nROC AUC Score: {roc_auc_score(y_test, y_proba):.4f}")
+    return {
+        'test_rows': len(y_test),
+        'accuracy': float(accuracy_score(y_test, y_pred)),
+        'roc_auc': float(roc_auc_score(y_test, y_proba)),
+    }
+
+
+def split_for_evaluation(df_processed, split_date):
+    """chronological_split with the predictor's warnings, exits when nothing is left to train on"""
+    from ao_predictor.training import chronological_split
+
+    X_train, X_test, y_train, y_test, used_fallback = chronological_split(df_processed, split_date)
+    if X_train.empty or y_train.empty:
+        print("Error: Training data is empty. Cannot train the model. Check data loading and splitting.")
+        sys.exit(1)
+    if used_fallback:
+        print("Warning: Test set is empty after chronological split. Adjust `split_date` or ensure enough recent data.")
+        print("Falling back to an 80/20 chronological percentage split for evaluation.")
+    return X_train, X_test, y_train, y_test
+
+
+def train(args, recorder=None):
+    """
+    Fit a model backend on the chronological split, evaluate it and save pickle + artifact.
+
+    Returns the fitted pipeline and the Elo ratings / form index the final
+    preview needs (None without --elo / --form). Stages are recorded on
+    recorder when one is given.
+    """
+    import joblib
+    import pandas as pd
+
+    from ao_predictor.artifact import save_artifact, save_pickle_metadata
+    from ao_predictor.instrumentation import RunRecorder
+    from ao_predictor.models import make_model
+    from ao_predictor.symmetric import predict_proba_symmetric
+    from ao_predictor.training import DEFAULT_SPLIT_DATE
+
+    recorder = recorder or RunRecorder()
+    try:
+        df_atp, elo_ratings = prepare_matches(args.csv, args.elo, args.form, recorder=recorder)
+    except FileNotFoundError:
+        print(f"Error: '{args.csv}' not found.")
+        print("Please ensure the CSV file is uploaded and named correctly.")
+        sys.exit(1)
+    with recorder.stage('features') as stage:
+        df_processed = build_features(df_atp, args.antisymmetric)
+        stage['rows'] = len(df_processed)
+
+    # Train on old data, test on new
+    split_date = pd.to_datetime(args.split_date or DEFAULT_SPLIT_DATE)
+    with recorder.stage('split', rows=len(df_processed)):
+        X_train, X_test, y_train, y_test = split_for_evaluation(df_processed, split_date)
+    print(f"\nTraining data shape: {X_train.shape}")
+    print(f"Testing data shape: {X_test.shape}")
+
+    # Preprocessing (scaling, one-hot encoding that ignores unseen categories) plus
+    # the backend's classifier, a 200-tree random forest by default
+    model = make_model(args.model, X_train, seed=42, n_jobs=-1)
+    print(f"\nTraining the {type(model.named_steps['classifier']).__name__} model...")
+    with recorder.stage('fit', rows=len(X_train)):
+        model.fit(X_train, y_train)
+    print("Model training complete.")
+
+    # Antisymmetric models score both orientations so p(A beats B) + p(B beats A) = 1
+    if args.antisymmetric:
+        predict_proba = lambda X_new: predict_proba_symmetric(model, X_new)
+    else:
+        predict_proba = model.predict_proba
+
+    if not X_test.empty:
+        with recorder.stage('evaluate', rows=len(X_test)):
+            evaluation_metrics = evaluate_predictions(y_test, predict_proba(X_test)[:, 1], split_date)
+    else:
+        evaluation_metrics = {}
+        print("\nNo test data available for evaluation.")
+
+    with recorder.stage('dump'):
+        # Training rows are the earliest dates; the sidecar records --antisymmetric for predict and the service
+        train_dates = df_processed['Tourney Date'].sort_values(kind='stable').iloc[:len(X_train)]
+        training_date_range = (str(train_dates.iloc[0].date()), str(train_dates.iloc[-1].date()))
+        joblib.dump(model, args.out)
+        save_pickle_metadata(args.out, args.antisymmetric, training_date_range, evaluation_metrics)
+        print(f"\nModel saved as '{args.out}'")
+
+        # Memory-mappable artifact for the serving workers, artifacts hold forests so
+        # other backends are served from the pickle
+        if args.artifact and args.model == 'random_forest':
+            save_artifact(model, args.artifact, training_date_range=training_date_range,
+                          metrics=evaluation_metrics, antisymmetric=args.antisymmetric)
+            print(f"Model artifact saved to '{args.artifact}/'")
+
+        # Current ratings and form for `predict` and the service, which score single matchups
+        form_index = None
+        if elo_ratings is not None and args.elo_state:
+            elo_ratings.save(args.elo_state)
+            print(f"Elo ratings saved to '{args.elo_state}.npz'")
+        if args.form:
+            from ao_predictor.form import FormIndex
+
+            form_index = FormIndex.build(df_atp)
+            if args.form_index:
+                form_index.save(args.form_index)
+                print(f"Form index saved to '{args.form_index}.npz'")
+    return model, predict_proba, elo_ratings, form_index
+
+
+def evaluate(args):
+    """
+    Score a saved pickle or artifact on the test window of a CSV.
+
+    Antisymmetric models (as saved in their metadata, --[no-]antisymmetric overrides)
+    are scored on canonical rows with both orientations averaged.
+    """
+    import pandas as pd
+
+    from ao_predictor.artifact import model_metadata
+    from ao_predictor.symmetric import predict_proba_symmetric
+    from ao_predictor.training import DEFAULT_SPLIT_DATE
+
+    antisymmetric = args.antisymmetric
+    if antisymmetric is None:
+        antisymmetric = bool(model_metadata(args.model_path).get('antisymmetric'))
+    df_atp, _ = prepare_matches(args.csv, args.elo, args.form, verbose=False)
+    split_date = pd.to_datetime(args.split_date or DEFAULT_SPLIT_DATE)
+    _, X_test, _, y_test = split_for_evaluation(build_features(df_atp, antisymmetric, verbose=False),
+                                                split_date)
+    if X_test.empty:
+        print("\nNo test data available for evaluation.")
+        return {}
+
+    model = _load_model(args.model_path)
+    if antisymmetric:
+        y_proba = predict_proba_symmetric(model, X_test)[:, 1]
+    else:
+        y_proba = model.predict_proba(X_test)[:, 1]
+    return evaluate_predictions(y_test, y_proba, split_date)
+
+
+def _load_model(path):
+    """Artifact directory as a FastPredictor, anything else as a pickled pipeline"""
+    if os.path.isdir(path):
+        from ao_predictor.artifact import load_artifact
+        return load_artifact(path)
+    import joblib
+    return joblib.load(path)
+
+
+def matchup_probability(model, row, symmetric=False):
+    """p(player A wins) of one matchup_row for a FastPredictor or a pickled pipeline"""
+    from ao_predictor.fast_encoding import FastPredictor
+
+    if not isinstance(model, FastPredictor):
+        model = FastPredictor.from_pipeline(model, flatten=True)
+    return float(model.predict_proba_rows([row], symmetric=symmetric)[0, 1])
+
+
+def _parse_features(pairs):
+    features = {}
+    for pair in pairs:
+        name, _, value = pair.partition('=')
+        if not value:
+            raise SystemExit(f"--feature expects NAME=VALUE, got '{pair}'")
+        features[name] = float(value)
+    return features
+
+
+def _load_prematch_indexes(encoder, elo_state, form_index_path):
+    """(EloRatings, FormIndex) the model's inputs need, None for the ones it doesn't"""
+    from ao_predictor.features import ELO_DIFFERENCE_COLUMNS, FORM_DIFFERENCE_COLUMNS
+
+    inputs = set(encoder.numeric_features)
+    elo_ratings = form_index = None
+    if inputs.intersection(ELO_DIFFERENCE_COLUMNS) and os.path.exists(f"{elo_state}.json"):
+        from ao_predictor.elo import EloRatings
+        elo_ratings = EloRatings.load(elo_state)
+    if inputs.intersection(FORM_DIFFERENCE_COLUMNS) and os.path.exists(f"{form_index_path}.json"):
+        from ao_predictor.form import FormIndex
+        form_index = FormIndex.load(form_index_path)
+    return elo_ratings, form_index
+
+
+def predict(args):
+    """
+    Score one matchup against a saved model, prints the probabilities (or JSON).
+
+    Models saved as antisymmetric score both orientations so p(A beats B) + p(B beats A) = 1,
+    --[no-]symmetric overrides the saved setting.
+    """
+    from ao_predictor.artifact import model_metadata
+    from ao_predictor.fast_encoding import FastPredictor
+    from ao_predictor.features import MATCHUP_COLUMNS, matchup_row, prematch_columns, prematch_differences
+
+    model_path = args.model_path
+    if model_path is None:
+        model_path = DEFAULT_ARTIFACT_PATH if os.path.isdir(DEFAULT_ARTIFACT_PATH) else DEFAULT_MODEL_PATH
+    model = _load_model(model_path)
+    if not isinstance(model, FastPredictor):
+        model = FastPredictor.from_pipeline(model, flatten=True, metadata=model_metadata(model_path))
+
+    # Elo and form inputs come from the saved indexes, --feature values take precedence
+    features = _parse_features(args.feature)
+    elo_ratings, form_index = _load_prematch_indexes(model.encoder, args.elo_state, args.form_index)
+    missing = model.encoder.missing_features(MATCHUP_COLUMNS + prematch_columns(elo_ratings, form_index) +
+                                             list(features))
+    if missing:
+        raise SystemExit(f"{model_path} needs {', '.join(missing)}, which this matchup doesn't have: train with "
+                         f"--elo/--form writes them to --elo-state/--form-index, or pass --feature NAME=VALUE")
+
+    row = matchup_row(args.surface, args.round, args.best_of, args.rank_a, args.rank_b,
+                      args.pts_a, args.pts_b, args.odd_a, args.odd_b)
+    row.update(prematch_differences(args.player_a, args.player_b, args.surface,
+                                    args.date or datetime.date.today(), elo_ratings, form_index))
+    row.update(features)
+    symmetric = model.antisymmetric if args.symmetric is None else args.symmetric
+    p_a = matchup_probability(model, row, symmetric=symmetric)
+    if args.json:
+        print(json.dumps({'player_a': args.player_a, 'player_b': args.player_b, 'p_a_wins': p_a, 'p_b_wins': 1.0 - p_a}))
+    else:
+        report_matchup('Matchup', args.player_a, args.player_b, args.rank_a, args.rank_b, args.surface, args.round, p_a)
+    return p_a
+
+
+def report_matchup(title, player_a, player_b, rank_a, rank_b, surface, round_name, p_a):
+    print(f"\n{title}: {player_a} (Rank: {rank_a}) vs. {player_b} (Rank: {rank_b})")
+    print(f"Surface: {surface}, Round: {round_name}")
+    print(f"Predicted Probability of {player_a} winning: {p_a:.2%}")
+    print(f"Predicted Probability of {player_b} winning: {1.0 - p_a:.2%}")
+    winner = player_a if p_a > 1.0 - p_a else player_b
+    print(f"\n**Predicted Winner of this Hypothetical Match: {winner}**")
+
+
+def hypothetical_final(model, predict_proba, elo_ratings=None, form_index=None):
+    """Predict the hypothetical final with a freshly trained model, as the training script always has"""
+    from ao_predictor.features import build_matchup_frame, prematch_differences
+
+    final = HYPOTHETICAL_FINAL
+    print("\n--- Hypothetical 2026 Australian Open Men's Final Prediction ---")
+    # Player A as P, built exactly like the training features
+    final_data = build_matchup_frame(final['surface'], final['round'], final['best_of'],
+                                     final['rank_a'], final['rank_b'], final['pts_a'], final['pts_b'],
+                                     final['odd_a'], final['odd_b'])
+    # Ratings after the last match in atp.csv and form before the 2026 event, the
+    # initial rating and neutral form for unknown names
+    for column, value in prematch_differences(final['player_a'], final['player_b'], final['surface'], '2026-01-01',
+                                              elo_ratings, form_index).items():
+        final_data[column] = value
+
+    p_a = float(predict_proba(final_data)[0][1])
+    report_matchup('Hypothetical Final', final['player_a'], final['player_b'], final['rank_a'], final['rank_b'],
+                   final['surface'], final['round'], p_a)
+    return p_a
+
+
+def report_run(recorder, report_path=None, prometheus_path=None):
+    """Print the stage table and write the requested run reports"""
+    print("\n--- Training run stages ---")
+    print(recorder.summary())
+    if report_path:
+        recorder.write_json(report_path)
+        print(f"Run report written to '{report_path}'")
+    if prometheus_path:
+        recorder.write_prometheus(prometheus_path)
+        print(f"Prometheus metrics written to '{prometheus_path}'")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='ao_predictor', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    def data_options(subparser):
+        subparser.add_argument('--csv', default=DEFAULT_CSV)
+        subparser.add_argument('--split-date', help="test on matches from this date on, "
+                                                    "default training.DEFAULT_SPLIT_DATE")
+        subparser.add_argument('--elo', action='store_true', help="add pre-match Elo differences")
+        subparser.add_argument('--form', action='store_true', help="add form and head-to-head differences")
+
+    train_parser = subcommands.add_parser('train', help="fit, evaluate and save a model")
+    data_options(train_parser)
+    train_parser.add_argument('--antisymmetric', action='store_true',
+                              help="one canonical row per match, symmetric predictions (saved with the model)")
+    train_parser.add_argument('--model', default='random_forest',
+                              help="ao_predictor.models backend: random_forest, hist_gradient_boosting, "
+                                   "logistic_regression")
+    train_parser.add_argument('--out', default=DEFAULT_MODEL_PATH, help="pickled pipeline")
+    train_parser.add_argument('--artifact', default=DEFAULT_ARTIFACT_PATH,
+                              help="artifact directory, random forests only ('' to skip)")
+    train_parser.add_argument('--elo-state', default=DEFAULT_ELO_STATE,
+                              help="with --elo, where the current ratings are saved for predict ('' to skip)")
+    train_parser.add_argument('--form-index', default=DEFAULT_FORM_INDEX,
+                              help="with --form, where the form index is saved for predict ('' to skip)")
+    train_parser.add_argument('--final', action='store_true', help="predict the hypothetical final afterwards")
+    train_parser.add_argument('--report', metavar='PATH', help="write the stage timings as a JSON run report")
+    train_parser.add_argument('--prometheus', metavar='PATH',
+                              help="write the stage timings for the node_exporter textfile collector")
+    train_parser.add_argument('--profile-stage', choices=TRAIN_STAGES, metavar='STAGE',
+                              help=f"run one stage ({', '.join(TRAIN_STAGES)}) under cProfile")
+    train_parser.add_argument('--profile-dir', default='.', help="where --profile-stage writes STAGE.prof")
+
+    evaluate_parser = subcommands.add_parser('evaluate', help="score a saved model on the test window")
+    data_options(evaluate_parser)
+    evaluate_parser.add_argument('--antisymmetric', action=argparse.BooleanOptionalAction,
+                                 help="override how the model was trained, default as saved with it")
+    evaluate_parser.add_argument('--model-path', default=DEFAULT_MODEL_PATH, help="pickle or artifact directory")
+
+    predict_parser = subcommands.add_parser('predict', help="score one matchup with a saved model")
+    predict_parser.add_argument('--model-path', help=f"artifact directory or pickle, default "
+                                                     f"{DEFAULT_ARTIFACT_PATH}/ if present else {DEFAULT_MODEL_PATH}")
+    for side in ('a', 'b'):
+        predict_parser.add_argument(f"--player-{side}", default=HYPOTHETICAL_FINAL[f"player_{side}"])
+        predict_parser.add_argument(f"--rank-{side}", type=float, default=HYPOTHETICAL_FINAL[f"rank_{side}"])
+        predict_parser.add_argument(f"--pts-{side}", type=float, default=HYPOTHETICAL_FINAL[f"pts_{side}"])
+        predict_parser.add_argument(f"--odd-{side}", type=float, default=HYPOTHETICAL_FINAL[f"odd_{side}"])
+    predict_parser.add_argument('--surface', default=HYPOTHETICAL_FINAL['surface'])
+    predict_parser.add_argument('--round', default=HYPOTHETICAL_FINAL['round'])
+    predict_parser.add_argument('--best-of', type=int, default=HYPOTHETICAL_FINAL['best_of'])
+    predict_parser.add_argument('--date', type=datetime.date.fromisoformat,
+                                help="form and head-to-head as of this date (YYYY-MM-DD), default today")
+    predict_parser.add_argument('--elo-state', default=DEFAULT_ELO_STATE,
+                                help="ratings saved by train --elo, for models trained with --elo")
+    predict_parser.add_argument('--form-index', default=DEFAULT_FORM_INDEX,
+                                help="form index saved by train --form, for models trained with --form")
+    predict_parser.add_argument('--feature', action='append', default=[], metavar='NAME=VALUE',
+                                help="extra model input, overrides the saved ratings/form, e.g. Elo_Diff=120")
+    predict_parser.add_argument('--symmetric', action=argparse.BooleanOptionalAction,
+                                help="score both orientations, default on for models saved as antisymmetric")
+    predict_parser.add_argument('--json', action='store_true', help="print the probabilities as JSON")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'train':
+        from ao_predictor.instrumentation import RunRecorder
+        from ao_predictor.models import MODEL_BACKENDS
+
+        # Checked here rather than with choices=, the registry imports pandas and `predict` must not
+        if args.model not in MODEL_BACKENDS:
+            parser.error(f"argument --model: invalid choice: '{args.model}' "
+                         f"(choose from {', '.join(sorted(MODEL_BACKENDS))})")
+
+        recorder = RunRecorder('train', profile_stage=args.profile_stage, profile_dir=args.profile_dir)
+        model, predict_proba, elo_ratings, form_index = train(args, recorder)
+        if args.final:
+            with recorder.stage('final', rows=1):
+                hypothetical_final(model, predict_proba, elo_ratings, form_index)
+        report_run(recorder, args.report, args.prometheus)
+    elif args.command == 'evaluate':
+        evaluate(args)
+    else:
+        predict(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+"""
+Forest compaction: the smallest forest that scores within a tolerance of the trained one.
+
+The trained forest is pruned, not retrained. Trees are independent, so fewer trees
+are a prefix of estimators_. A depth cap turns every node at that depth into a
+leaf. A minimum leaf size collapses every split that leaves fewer than min_leaf
+training samples on one side; this is post-pruning, so splits are not re-chosen as
+they would be by min_samples_leaf. Pruned trees stay sklearn trees, so the result
+is an ordinary Pipeline pickle.
+
+For each (max_depth, min_leaf) the pruned forest's per-tree probabilities on the
+test window are computed once, and every tree count is then a running mean. The
+smallest candidate (in nodes) whose AUC and log-loss are within tolerance of the
+original wins; float32 thresholds and leaf values are kept for its artifact when
+they stay within tolerance too.
+
+Run from MatchPredicting/:
+    python -m ao_predictor.compaction --model ao_head_to_head_predictor.pkl --csv atp.csv \\
+        --out ao_head_to_head_predictor_compact.pkl --artifact ao_head_to_head_predictor_compact
+"""
+import argparse
+import copy
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from ao_predictor.flat_forest import FlatForest
+
+TREE_COUNTS = (200, 150, 100, 75, 50, 35, 25, 15, 10)
+MAX_DEPTHS = (None, 24, 20, 16, 14, 12, 10, 8, 6)
+MIN_LEAVES = (1, 2, 5, 10, 20, 50, 100)
+
+DEFAULT_AUC_TOLERANCE = 0.002
+DEFAULT_LOG_LOSS_TOLERANCE = 0.002
+
+# sklearn's markers for leaf children and leaf features/thresholds
+TREE_LEAF = -1
+TREE_UNDEFINED = -2
+
+
+def _node_depths(left, right):
+    """Depth of every node, one vectorised step per level"""
+    depth = np.zeros(len(left), dtype=np.int64)
+    frontier = np.array([0])
+    level = 0
+    while len(frontier):
+        internal = frontier[left[frontier] != TREE_LEAF]
+        frontier = np.concatenate([left[internal], right[internal]])
+        level += 1
+        depth[frontier] = level
+    return depth
+
+
+def prune_tree(tree, max_depth=None, min_leaf=1):
+    """
+    Copy of a fitted sklearn Tree with nodes at max_depth and splits leaving a side
+    with fewer than min_leaf samples turned into leaves.
+    """
+    from sklearn.tree._tree import Tree
+
+    state = tree.__getstate__()
+    nodes, values = state['nodes'], state['values']
+    left, right = nodes['left_child'], nodes['right_child']
+    internal = left != TREE_LEAF
+    depth = _node_depths(left, right)
+
+    cut = np.zeros(len(nodes), dtype=bool)
+    if max_depth is not None:
+        cut |= internal & (depth >= max_depth)
+    if min_leaf > 1:
+        samples = nodes['n_node_samples']
+        smaller_side = np.minimum(samples[np.where(internal, left, 0)], samples[np.where(internal, right, 0)])
+        cut |= internal & (smaller_side < min_leaf)
+
+    # Children only survive under a kept, uncut parent; parents precede children in sklearn's order
+    kept = np.zeros(len(nodes), dtype=bool)
+    kept[0] = True
+    splits = internal & ~cut
+    for level in range(1, depth.max() + 1 if len(depth) else 1):
+        parents = np.flatnonzero(kept & splits & (depth == level - 1))
+        kept[left[parents]] = True
+        kept[right[parents]] = True
+
+    new_ids = np.cumsum(kept) - 1
+    pruned = nodes[kept].copy()
+    leaf = ~splits[kept]
+    pruned['left_child'] = np.where(leaf, TREE_LEAF, new_ids[pruned['left_child']])
+    pruned['right_child'] = np.where(leaf, TREE_LEAF, new_ids[pruned['right_child']])
+    pruned['feature'] = np.where(leaf, TREE_UNDEFINED, pruned['feature'])
+    pruned['threshold'] = np.where(leaf, TREE_UNDEFINED, pruned['threshold'])
+
+    new_tree = Tree(tree.n_features, tree.n_classes, tree.n_outputs)
+    new_tree.__setstate__({
+        'max_depth': int(depth[kept & splits].max() + 1) if (kept & splits).any() else 0,
+        'node_count': int(kept.sum()),
+        'nodes': pruned,
+        'values': values[kept],
+    })
+    return new_tree
+
+
+def prune_forest(forest, n_trees=None, max_depth=None, min_leaf=1):
+    """Copy of a fitted random forest keeping its first n_trees trees, each pruned"""
+    pruned = copy.copy(forest)
+    pruned.estimators_ = []
+    for estimator in forest.estimators_[:n_trees]:
+        estimator = copy.copy(estimator)
+        estimator.tree_ = prune_tree(estimator.tree_, max_depth, min_leaf)
+        pruned.estimators_.append(estimator)
+    pruned.n_estimators = len(pruned.estimators_)
+    return pruned
+
+
+def compact_pipeline(model, n_trees=None, max_depth=None, min_leaf=1):
+    """The Pipeline with its forest pruned, the preprocessor is shared"""
+    from sklearn.pipeline import Pipeline
+
+    classifier = prune_forest(model.named_steps['classifier'], n_trees, max_depth, min_leaf)
+    return Pipeline(steps=[('preprocessor', model.named_steps['preprocessor']), ('classifier', classifier)])
+
+
+def _scores(y_test, p_win):
+    from sklearn.metrics import log_loss, roc_auc_score
+
+    return roc_auc_score(y_test, p_win), log_loss(y_test, np.clip(p_win, 1e-15, 1 - 1e-15))
+
+
+def search(model, X_test, y_test, auc_tolerance=DEFAULT_AUC_TOLERANCE, log_loss_tolerance=DEFAULT_LOG_LOSS_TOLERANCE,
+           tree_counts=TREE_COUNTS, max_depths=MAX_DEPTHS, min_leaves=MIN_LEAVES):
+    """
+    Score every (n_trees, max_depth, min_leaf) candidate on the test window.
+
+    Returns (baseline, candidates): baseline holds the original forest's roc_auc and
+    log_loss, candidates is a DataFrame with n_nodes, roc_auc, log_loss and within
+    (both tolerances met), smallest first.
+    """
+    from ao_predictor.fast_encoding import CompiledEncoder
+
+    forest = model.named_steps['classifier']
+    X_encoded = CompiledEncoder.from_preprocessor(model.named_steps['preprocessor']).encode_columns(X_test)
+    y_test = np.asarray(y_test)
+    n_estimators = len(forest.estimators_)
+    counts = sorted({min(count, n_estimators) for count in tree_counts} | {n_estimators})
+
+    rows = []
+    baseline = None
+    for max_depth in max_depths:
+        for min_leaf in min_leaves:
+            pruned = prune_forest(forest, n_estimators, max_depth, min_leaf)
+            tree_nodes = np.cumsum([estimator.tree_.node_count for estimator in pruned.estimators_])
+            running = np.cumsum(FlatForest.from_classifier(pruned).tree_probabilities(X_encoded), axis=0)
+            for n_trees in counts:
+                roc_auc, log_loss = _scores(y_test, running[n_trees - 1] / n_trees)
+                rows.append({'n_trees': n_trees, 'max_depth': max_depth, 'min_leaf': min_leaf,
+                             'n_nodes': int(tree_nodes[n_trees - 1]), 'roc_auc': roc_auc, 'log_loss': log_loss})
+                if n_trees == n_estimators and max_depth is None and min_leaf == 1:
+                    baseline = {'roc_auc': roc_auc, 'log_loss': log_loss}
+    if baseline is None:
+        pruned = FlatForest.from_classifier(forest)
+        roc_auc, log_loss = _scores(y_test, pruned.predict_proba(X_encoded)[:, 1])
+        baseline = {'roc_auc': roc_auc, 'log_loss': log_loss}
+
+    candidates = pd.DataFrame(rows)
+    candidates['within'] = ((candidates['roc_auc'] >= baseline['roc_auc'] - auc_tolerance) &
+                            (candidates['log_loss'] <= baseline['log_loss'] + log_loss_tolerance))
+    candidates = candidates.sort_values(['n_nodes', 'log_loss'], kind='stable').reset_index(drop=True)
+    return baseline, candidates
+
+
+def float32_within(model, X_test, y_test, baseline, auc_tolerance=DEFAULT_AUC_TOLERANCE,
+                   log_loss_tolerance=DEFAULT_LOG_LOSS_TOLERANCE):
+    """Whether the model's float32 FlatForest still meets both tolerances"""
+    from ao_predictor.fast_encoding import CompiledEncoder
+
+    X_encoded = CompiledEncoder.from_preprocessor(model.named_steps['preprocessor']).encode_columns(X_test)
+    forest = FlatForest.from_classifier(model.named_steps['classifier']).astype32()
+    roc_auc, log_loss = _scores(np.asarray(y_test), forest.predict_proba(X_encoded)[:, 1])
+    return (roc_auc >= baseline['roc_auc'] - auc_tolerance and
+            log_loss <= baseline['log_loss'] + log_loss_tolerance)
+
+
+def _directory_mb(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 1024 ** 2
+
+
+def measure(model, pickle_path, artifact_path, X_test, y_test, float32=False):
+    """Size, load time, serving latency and test scores of a model saved as pickle and artifact"""
+    import joblib
+
+    from ao_predictor.artifact import load_artifact, save_artifact
+    from ao_predictor.models import serving_latency_us
+
+    joblib.dump(model, pickle_path)
+    save_artifact(model, artifact_path, float32=float32)
+
+    start = time.perf_counter()
+    joblib.load(pickle_path)
+    pickle_load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    predictor = load_artifact(artifact_path)
+    artifact_load_s = time.perf_counter() - start
+
+    single_us, batch_us = serving_latency_us(predictor, X_test, X_test.iloc[:1000].to_dict('records'), 1000)
+    roc_auc, log_loss = _scores(np.asarray(y_test), predictor.predict_proba(X_test)[:, 1])
+    forest = predictor.classifier
+    return {
+        'trees': forest.n_trees,
+        'nodes': forest.n_nodes,
+        'max depth': forest.max_depth,
+        'pickle (MB)': os.path.getsize(pickle_path) / 1024 ** 2,
+        'pickle load (s)': pickle_load_s,
+        'artifact (MB)': _directory_mb(artifact_path),
+        'artifact load (ms)': artifact_load_s * 1000,
+        'single (us)': single_us,
+        'batch (us/row)': batch_us,
+        'AUC': roc_auc,
+        'log-loss': log_loss,
+    }
+
+
+def main():
+    import joblib
+
+    from ao_predictor.features import build_match_features
+    from ao_predictor.loader import load_atp_csv
+    from ao_predictor.training import DEFAULT_SPLIT_DATE, chronological_split, clean_matches
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='ao_head_to_head_predictor.pkl', help="pickled random forest pipeline")
+    parser.add_argument('--csv', default='atp.csv')
+    parser.add_argument('--split-date', default=DEFAULT_SPLIT_DATE, help="the test window starts here")
+    parser.add_argument('--auc-tolerance', type=float, default=DEFAULT_AUC_TOLERANCE)
+    parser.add_argument('--log-loss-tolerance', type=float, default=DEFAULT_LOG_LOSS_TOLERANCE)
+    parser.add_argument('--elo', action='store_true', help="the model was trained with --elo")
+    parser.add_argument('--form', action='store_true', help="the model was trained with --form")
+    parser.add_argument('--out', default='ao_head_to_head_predictor_compact.pkl')
+    parser.add_argument('--artifact', default='ao_head_to_head_predictor_compact')
+    args = parser.parse_args()
+
+    df_atp = clean_matches(load_atp_csv(args.csv, verbose=False))
+    if args.elo:
+        from ao_predictor.elo import add_rating_features
+        df_atp = add_rating_features(df_atp)
+    if args.form:
+        from ao_predictor.form import add_form_features
+        df_atp = add_form_features(df_atp)
+    _, X_test, _, y_test, _ = chronological_split(build_match_features(df_atp), args.split_date)
+    model = joblib.load(args.model)
+
+    start = time.perf_counter()
+    baseline, candidates = search(model, X_test, y_test, args.auc_tolerance, args.log_loss_tolerance)
+    print(f"Searched {len(candidates)} candidates on {len(X_test):,} test rows in "
+          f"{time.perf_counter() - start:.1f}s; original AUC {baseline['roc_auc']:.4f}, "
+          f"log-loss {baseline['log_loss']:.4f}")
+    best = candidates[candidates['within']].iloc[0]
+    max_depth = None if pd.isna(best['max_depth']) else int(best['max_depth'])
+    print(f"Smallest within tolerance: {int(best['n_trees'])} trees, max_depth {max_depth}, "
+          f"min_leaf {int(best['min_leaf'])}, {int(best['n_nodes']):,} nodes")
+
+    compacted = compact_pipeline(model, int(best['n_trees']), max_depth, int(best['min_leaf']))
+    float32 = float32_within(compacted, X_test, y_test, baseline, args.auc_tolerance, args.log_loss_tolerance)
+    print(f"float32 thresholds and leaf values: {'kept' if float32 else 'over tolerance, artifact stays float64'}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        before = measure(model, os.path.join(tmp_dir, 'model.pkl'), os.path.join(tmp_dir, 'artifact'), X_test, y_test)
+    after = measure(compacted, args.out, args.artifact, X_test, y_test, float32=float32)
+
+    report = pd.DataFrame({'before': before, 'after': after})
+    print("\n" + report.to_string(float_format='{:,.4f}'.format))
+    print(f"\nCompacted pipeline saved as {args.out}, artifact to {args.artifact}/")
+
+
+if __name__ == '__main__':
+    main()
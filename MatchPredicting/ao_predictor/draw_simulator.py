@@ -0,0 +1,174 @@
+"""
+Vectorised Monte Carlo simulator for an Australian Open draw.
+
+Pairwise win probabilities come from a precomputed table (ao_predictor.pairwise),
+one matrix per round. Simulations run as NumPy arrays: every simulation in a chunk
+advances one round at a time, so the cost is a handful of array operations per
+round rather than a Python loop per match.
+
+Run from MatchPredicting/:
+    python -m ao_predictor.draw_simulator --table atp_pairwise --sims 1000000
+    python -m ao_predictor.draw_simulator --model ao_head_to_head_predictor.pkl --csv atp.csv \\
+        --rankings ../DataScraping/ao_atp_rankings_data.csv --sims 1000000 --workers 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ao_predictor.pairwise import symmetrize
+
+ROUND_LABELS = {128: ['R128', 'R64', 'R32', 'R16', 'QF', 'SF', 'F', 'W']}
+
+# Simulations advanced together, bounds the per-round arrays to a few tens of MB
+CHUNK_SIMS = 65536
+
+
+def bracket_order(draw_size):
+    """Seed number placed on each draw line, so seeds 1 and 2 can only meet in the final"""
+    order = [1, 2]
+    while len(order) < draw_size:
+        size = 2 * len(order) + 1
+        order = [seed for line in order for seed in (line, size - line)]
+    return np.array(order)
+
+
+def make_draw(n_players, draw_size=128, n_seeds=32):
+    """
+    (seed_slots, open_slots, bye_slots) for players ranked 0..n_players-1.
+
+    The top n_seeds players take their seeded lines, byes (when the field is
+    smaller than the draw) go opposite the top seeds and everyone else is drawn
+    into the open lines.
+    """
+    if n_players > draw_size:
+        raise ValueError(f"{n_players} players do not fit a {draw_size} draw")
+    n_seeds = min(n_seeds, n_players)
+    order = bracket_order(draw_size)
+    line_of_seed = np.argsort(order)
+    seed_slots = line_of_seed[:n_seeds]
+    bye_slots = line_of_seed[draw_size - (draw_size - n_players):] if n_players < draw_size else np.array([], dtype=int)
+    taken = np.zeros(draw_size, dtype=bool)
+    taken[seed_slots] = True
+    taken[bye_slots] = True
+    return seed_slots, np.flatnonzero(~taken), bye_slots
+
+
+def _with_bye(matrix):
+    """Append a bye as the last player: everyone beats it"""
+    n_players = matrix.shape[0]
+    out = np.zeros((n_players + 1, n_players + 1), dtype=np.float32)
+    out[:n_players, :n_players] = matrix
+    out[:n_players, n_players] = 1.0
+    return out
+
+
+def simulate(round_matrices, n_players, n_sims, seed=None, draw_size=128, n_seeds=32, fixed_draw=None):
+    """
+    Count how often each player reaches each round.
+
+    round_matrices[r][a, b] is p(a beats b) in round r, averaged with 1 - [b, a] so a
+    match doesn't depend on which line a player is drawn on. Unless fixed_draw (a line ->
+    player array) is given, the unseeded players are redrawn for every simulation.
+    Returns an (n_players, n_rounds + 1) array of counts, the last column is titles.
+    """
+    n_rounds = int(np.log2(draw_size))
+    matrices = [_with_bye(symmetrize(matrix)).ravel() for matrix in round_matrices]
+    bye = n_players
+    width = n_players + 1
+
+    seed_slots, open_slots, bye_slots = make_draw(n_players, draw_size, n_seeds)
+    base = np.full(draw_size, bye, dtype=np.int32)
+    base[seed_slots] = np.arange(len(seed_slots))
+    unseeded = np.arange(len(seed_slots), n_players, dtype=np.int32)
+
+    rng = np.random.default_rng(seed)
+    counts = np.zeros((n_players + 1, n_rounds + 1), dtype=np.int64)
+    for start in range(0, n_sims, CHUNK_SIMS):
+        chunk = min(CHUNK_SIMS, n_sims - start)
+        if fixed_draw is not None:
+            alive = np.broadcast_to(np.asarray(fixed_draw, dtype=np.int32), (chunk, draw_size)).copy()
+        else:
+            alive = np.broadcast_to(base, (chunk, draw_size)).copy()
+            # Argsort of random keys shuffles every row at once, about twice as fast as rng.permuted
+            alive[:, open_slots] = unseeded[rng.random((chunk, len(unseeded)), dtype=np.float32).argsort(axis=1)]
+        counts[:, 0] += np.bincount(alive.ravel(), minlength=width)
+
+        for round_idx in range(n_rounds):
+            top, bottom = alive[:, 0::2], alive[:, 1::2]
+            p_top = matrices[min(round_idx, len(matrices) - 1)][top * width + bottom]
+            alive = np.where(rng.random(p_top.shape, dtype=np.float32) < p_top, top, bottom)
+            counts[:, round_idx + 1] += np.bincount(alive.ravel(), minlength=width)
+    return counts[:n_players]
+
+
+def _simulate_worker(args):
+    return simulate(*args[:-1], **args[-1])
+
+
+def simulate_parallel(round_matrices, n_players, n_sims, seed=None, n_workers=None, **kwargs):
+    """simulate() split across a process pool with independent random streams"""
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1:
+        return simulate(round_matrices, n_players, n_sims, seed, **kwargs)
+
+    streams = np.random.SeedSequence(seed).spawn(n_workers)
+    shares = [n_sims // n_workers + (i < n_sims % n_workers) for i in range(n_workers)]
+    tasks = [(round_matrices, n_players, share, stream, kwargs) for share, stream in zip(shares, streams)]
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        return sum(pool.map(_simulate_worker, tasks))
+
+
+def reach_probabilities(names, counts, n_sims, draw_size=128):
+    """Per-player probability of reaching each round, sorted by title odds"""
+    import pandas as pd
+
+    labels = ROUND_LABELS.get(draw_size) or [f"R{draw_size >> i}" for i in range(counts.shape[1] - 1)] + ['W']
+    result = pd.DataFrame(counts / n_sims, index=pd.Index(names, name='Player'), columns=labels)
+    return result.sort_values('W', ascending=False)
+
+
+def main():
+    from ao_predictor.pairwise import (AO_ROUNDS, PairwiseTable, build_pairwise_table, load_players,
+                                       load_predictor, make_contexts, player_points)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--table', help="precomputed pairwise table prefix")
+    parser.add_argument('--model', default='ao_head_to_head_predictor.pkl', help="used with --rankings when no --table")
+    parser.add_argument('--rankings', help="scraped rankings CSV, players in ranking order")
+    parser.add_argument('--csv', default='atp.csv', help="with --rankings, players' latest points")
+    parser.add_argument('--points', help="with --rankings, CSV of Player_Name, Points")
+    parser.add_argument('--best-of', type=int, default=5)
+    parser.add_argument('--sims', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--top', type=int, default=20, help="players printed")
+    args = parser.parse_args()
+
+    if args.table:
+        table = PairwiseTable.load(args.table, mmap=False)
+    elif args.rankings:
+        names, ranks, pts = load_players(args.rankings, player_points(args.csv, args.points))
+        contexts = make_contexts(best_of=args.best_of)
+        table, _ = build_pairwise_table(load_predictor(args.model), names, ranks, pts, contexts)
+    else:
+        parser.error("either --table or --rankings is required")
+
+    # One matrix per round when the table has the AO rounds, otherwise its first context throughout
+    rounds = [context[1] for context in table.contexts]
+    if rounds == AO_ROUNDS:
+        round_matrices = [table.matrix[i] for i in range(len(rounds))]
+    else:
+        round_matrices = [table.matrix[0]]
+
+    start = time.perf_counter()
+    counts = simulate_parallel(round_matrices, len(table.names), args.sims, seed=args.seed, n_workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{args.sims:,} draws simulated in {elapsed:.2f}s with {args.workers} worker(s)\n")
+    print(reach_probabilities(table.names, counts, args.sims).head(args.top).to_string(float_format='{:.2%}'.format))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+Incremental overall and per-surface Elo ratings over atp.csv.
+
+One chronological pass rates every match: each row gets both players' ratings
+as they stood before the match (leakage-free pre-match features), then the
+ratings are updated with the result. Player state lives in flat arrays indexed
+by a player id, so a saved state can be loaded and extended with newly appended
+matches without replaying the history.
+
+Run from MatchPredicting/:
+    python -m ao_predictor.elo --csv atp.csv --state atp_elo --top 20
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ao_predictor.features import same_player
+
+INITIAL_RATING = 1500.0
+
+# Pre-match rating columns added next to Player_1/Player_2
+RATING_COLUMNS = ['Elo_1', 'Elo_2', 'Surface_Elo_1', 'Surface_Elo_2']
+
+
+def k_factor(n_matches):
+    """FiveThirtyEight's decaying K: new players move fast, established ones slowly"""
+    return 250.0 / (n_matches + 5) ** 0.4
+
+
+# K for the first match counts, looked up instead of recomputed in the rating loop
+K_TABLE_SIZE = 4096
+K_TABLE = [k_factor(n) for n in range(K_TABLE_SIZE)]
+
+
+class EloRatings:
+    """
+    Overall and per-surface Elo for every player seen so far.
+
+    rating[player] and surface_rating[player, surface] hold the current ratings,
+    played / surface_played the match counts that drive the K-factor. Rows within
+    one Tourney Date are taken in file order, which is round order in atp.csv.
+    """
+
+    def __init__(self, names=(), surfaces=(), rating=None, played=None, surface_rating=None, surface_played=None,
+                 matches_seen=0, last_date=None):
+        self.names = list(names)
+        self.surfaces = list(surfaces)
+        self.player_index = {name: i for i, name in enumerate(self.names)}
+        self.surface_index = {surface: i for i, surface in enumerate(self.surfaces)}
+        n_players, n_surfaces = len(self.names), len(self.surfaces)
+        self.rating = np.full(n_players, INITIAL_RATING) if rating is None else np.asarray(rating, dtype=np.float64)
+        self.played = np.zeros(n_players, dtype=np.int64) if played is None else np.asarray(played, dtype=np.int64)
+        self.surface_rating = (np.full((n_players, n_surfaces), INITIAL_RATING) if surface_rating is None
+                               else np.asarray(surface_rating, dtype=np.float64))
+        self.surface_played = (np.zeros((n_players, n_surfaces), dtype=np.int64) if surface_played is None
+                               else np.asarray(surface_played, dtype=np.int64))
+        # Rows of the source CSV consumed so far, the next update starts after them
+        self.matches_seen = int(matches_seen)
+        self.last_date = None if last_date is None else pd.Timestamp(last_date)
+
+    def _ids(self, values, index, labels):
+        """Integer ids for a column of names, new names are appended to labels; -1 for missing"""
+        values = pd.Series(values)
+        codes, uniques = pd.factorize(values)
+        for value in uniques:
+            if value not in index:
+                index[value] = len(labels)
+                labels.append(value)
+        lookup = np.array([index[value] for value in uniques] + [-1], dtype=np.int64)
+        return lookup[codes]
+
+    def _grow(self):
+        """Extend the state arrays to the current number of players and surfaces"""
+        n_players, n_surfaces = len(self.names), len(self.surfaces)
+        old_players, old_surfaces = self.surface_rating.shape
+        if (n_players, n_surfaces) == (old_players, old_surfaces):
+            return
+        self.rating = np.r_[self.rating, np.full(n_players - old_players, INITIAL_RATING)]
+        self.played = np.r_[self.played, np.zeros(n_players - old_players, dtype=np.int64)]
+        surface_rating = np.full((n_players, n_surfaces), INITIAL_RATING)
+        surface_rating[:old_players, :old_surfaces] = self.surface_rating
+        surface_played = np.zeros((n_players, n_surfaces), dtype=np.int64)
+        surface_played[:old_players, :old_surfaces] = self.surface_played
+        self.surface_rating, self.surface_played = surface_rating, surface_played
+
+    def update(self, df_atp):
+        """
+        Rate the matches in df_atp (after everything seen so far) and update the state.
+
+        Returns df_atp's index with the pre-match RATING_COLUMNS. A match without a
+        winner or a player still gets pre-match ratings but doesn't move them.
+        """
+        order = np.argsort(df_atp['Tourney Date'].to_numpy(), kind='stable')
+        dates = df_atp['Tourney Date'].to_numpy()[order]
+        if len(dates) and self.last_date is not None and dates[0] < self.last_date.to_datetime64():
+            raise ValueError(f"Matches from {pd.Timestamp(dates[0]).date()} are older than the rated history, "
+                             f"which ends on {self.last_date.date()}")
+
+        player_1 = self._ids(df_atp['Player_1'].to_numpy(dtype=object)[order], self.player_index, self.names)
+        player_2 = self._ids(df_atp['Player_2'].to_numpy(dtype=object)[order], self.player_index, self.names)
+        surface = self._ids(df_atp['Surface'].to_numpy(dtype=object)[order], self.surface_index, self.surfaces)
+        player_1_won = same_player(df_atp['Winner'], df_atp['Player_1'])[order]
+        player_2_won = same_player(df_atp['Winner'], df_atp['Player_2'])[order]
+        self._grow()
+
+        # The pass is inherently sequential, plain lists keep the per-match cost low
+        rating, played = self.rating.tolist(), self.played.tolist()
+        surface_rating, surface_played = self.surface_rating.tolist(), self.surface_played.tolist()
+        n_matches = len(order)
+        pre = np.full((n_matches, 4), INITIAL_RATING)
+        out = pre.tolist()
+        for i, (a, b, s, a_won, b_won) in enumerate(zip(player_1.tolist(), player_2.tolist(), surface.tolist(),
+                                                        player_1_won.tolist(), player_2_won.tolist())):
+            row = out[i]
+            if a >= 0:
+                row[0] = rating[a]
+                row[2] = surface_rating[a][s] if s >= 0 else rating[a]
+            if b >= 0:
+                row[1] = rating[b]
+                row[3] = surface_rating[b][s] if s >= 0 else rating[b]
+            if a < 0 or b < 0 or a_won == b_won:
+                continue
+
+            score = 1.0 if a_won else 0.0
+            delta = score - 1.0 / (1.0 + 10.0 ** ((row[1] - row[0]) / 400.0))
+            n_a, n_b = played[a], played[b]
+            rating[a] += (K_TABLE[n_a] if n_a < K_TABLE_SIZE else k_factor(n_a)) * delta
+            rating[b] -= (K_TABLE[n_b] if n_b < K_TABLE_SIZE else k_factor(n_b)) * delta
+            played[a] = n_a + 1
+            played[b] = n_b + 1
+            if s >= 0:
+                delta = score - 1.0 / (1.0 + 10.0 ** ((row[3] - row[2]) / 400.0))
+                rating_a, rating_b = surface_rating[a], surface_rating[b]
+                played_a, played_b = surface_played[a], surface_played[b]
+                n_a, n_b = played_a[s], played_b[s]
+                rating_a[s] += (K_TABLE[n_a] if n_a < K_TABLE_SIZE else k_factor(n_a)) * delta
+                rating_b[s] -= (K_TABLE[n_b] if n_b < K_TABLE_SIZE else k_factor(n_b)) * delta
+                played_a[s] = n_a + 1
+                played_b[s] = n_b + 1
+
+        self.rating, self.played = np.array(rating), np.array(played, dtype=np.int64)
+        self.surface_rating = np.array(surface_rating).reshape(len(self.names), len(self.surfaces))
+        self.surface_played = np.array(surface_played, dtype=np.int64).reshape(self.surface_rating.shape)
+        self.matches_seen += n_matches
+        if n_matches:
+            self.last_date = pd.Timestamp(dates[-1])
+
+        pre = np.array(out).reshape(n_matches, 4)
+        features = np.empty_like(pre)
+        features[order] = pre
+        return pd.DataFrame(features, index=df_atp.index, columns=RATING_COLUMNS)
+
+    def current(self, name, surface=None):
+        """(overall, surface) rating of a player now, the initial rating for unknown players"""
+        player = self.player_index.get(name)
+        if player is None:
+            return INITIAL_RATING, INITIAL_RATING
+        surface_idx = self.surface_index.get(surface)
+        overall = float(self.rating[player])
+        return overall, overall if surface_idx is None else float(self.surface_rating[player, surface_idx])
+
+    def ratings(self):
+        """Current ratings as a DataFrame, one row per player, best first"""
+        table = pd.DataFrame(self.surface_rating, index=pd.Index(self.names, name='Player'),
+                             columns=[f"Elo_{surface}" for surface in self.surfaces])
+        table.insert(0, 'Elo', self.rating)
+        table.insert(1, 'Matches', self.played)
+        return table.sort_values('Elo', ascending=False)
+
+    def save(self, path):
+        """path.npz holds the rating arrays, path.json the player/surface names and progress"""
+        np.savez(f"{path}.npz", rating=self.rating, played=self.played,
+                 surface_rating=self.surface_rating, surface_played=self.surface_played)
+        with open(f"{path}.json", 'w') as f:
+            json.dump({'names': [str(name) for name in self.names], 'surfaces': [str(s) for s in self.surfaces],
+                       'matches_seen': self.matches_seen,
+                       'last_date': None if self.last_date is None else self.last_date.isoformat()}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(f"{path}.json") as f:
+            index = json.load(f)
+        with np.load(f"{path}.npz") as arrays:
+            return cls(index['names'], index['surfaces'], arrays['rating'], arrays['played'],
+                       arrays['surface_rating'], arrays['surface_played'],
+                       index['matches_seen'], index['last_date'])
+
+
+def add_rating_features(df_atp, ratings=None):
+    """df_atp with the pre-match RATING_COLUMNS from a fresh (or the given) EloRatings pass"""
+    ratings = EloRatings() if ratings is None else ratings
+    return df_atp.join(ratings.update(df_atp))
+
+
+def main():
+    from ao_predictor.loader import load_atp_csv
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default='atp.csv')
+    parser.add_argument('--state', default='atp_elo', help="state path prefix, <state>.npz and <state>.json")
+    parser.add_argument('--full', action='store_true', help="ignore a saved state and rate the whole history")
+    parser.add_argument('--top', type=int, default=20, help="players printed")
+    args = parser.parse_args()
+
+    df_atp = load_atp_csv(args.csv, verbose=False)
+    ratings = EloRatings()
+    if not args.full and os.path.exists(f"{args.state}.json"):
+        ratings = EloRatings.load(args.state)
+    # atp.csv only grows at the end, rows past matches_seen are the new ones
+    new_matches = df_atp.iloc[ratings.matches_seen:]
+
+    start = time.perf_counter()
+    ratings.update(new_matches)
+    elapsed = time.perf_counter() - start
+    ratings.save(args.state)
+    print(f"Rated {len(new_matches):,} new matches in {elapsed * 1000:.1f} ms "
+          f"({ratings.matches_seen:,} in total, {len(ratings.names):,} players)")
+    print(f"Saved {args.state}.npz and {args.state}.json\n")
+    print(ratings.ratings().head(args.top).to_string(float_format='{:.0f}'.format))
+
+
+if __name__ == '__main__':
+    main()
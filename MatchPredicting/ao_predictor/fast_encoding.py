@@ -0,0 +1,153 @@
+import numpy as np
+
+from ao_predictor.features import ALL_DIFFERENCE_COLUMNS
+from ao_predictor.flat_forest import FlatForest
+
+
+class CompiledEncoder:
+    """
+    Plain NumPy replacement for the fitted ColumnTransformer (StandardScaler + OneHotEncoder).
+
+    The scaler means/scales and one-hot category positions are copied out of the
+    fitted preprocessor once, after which rows are encoded without pandas or sklearn.
+    Output columns follow the ColumnTransformer: scaled numerics, then one-hots.
+    Categories unseen during fit encode as all zeros, like handle_unknown='ignore'.
+    """
+
+    def __init__(self, numeric_features, means, scales, categorical_features, categories):
+        self.numeric_features = list(numeric_features)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self.categorical_features = list(categorical_features)
+        self.categories = [list(values) for values in categories]
+
+        # Absolute output column of every known category value
+        self.category_columns = []
+        offset = len(self.numeric_features)
+        for values in self.categories:
+            self.category_columns.append({value: offset + i for i, value in enumerate(values)})
+            offset += len(values)
+        self.n_outputs = offset
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor):
+        numeric_features, means, scales = [], [], []
+        categorical_features, categories = [], []
+        for name, transformer, columns in preprocessor.transformers_:
+            if name == 'remainder' or len(columns) == 0:
+                continue
+            if name == 'num':
+                numeric_features = list(columns)
+                # with_mean/with_std=False leave mean_/scale_ unset, which is the identity
+                means = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+                scales = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+            elif name == 'cat':
+                categorical_features = list(columns)
+                categories = [values.tolist() for values in transformer.categories_]
+            else:
+                raise ValueError(f"Unsupported transformer '{name}' in preprocessor")
+        return cls(numeric_features, means, scales, categorical_features, categories)
+
+    def missing_features(self, columns):
+        """Model inputs not among columns, in model order"""
+        columns = set(columns)
+        return [name for name in self.numeric_features + self.categorical_features if name not in columns]
+
+    def _missing_error(self, columns):
+        return ValueError(f"Model inputs missing: {', '.join(self.missing_features(columns))} "
+                          f"(models trained with --elo/--form need their Elo and form differences)")
+
+    def encode_row(self, row, out=None):
+        """Encode one dict of feature values into a (1, n_outputs) float64 array"""
+        if out is None:
+            out = np.zeros((1, self.n_outputs))
+        try:
+            numeric = np.array([row[name] for name in self.numeric_features], dtype=np.float64)
+            out[0, :len(numeric)] = (numeric - self.means) / self.scales
+            for name, columns in zip(self.categorical_features, self.category_columns):
+                column = columns.get(row[name])
+                if column is not None:
+                    out[0, column] = 1.0
+        except KeyError:
+            raise self._missing_error(row) from None
+        return out
+
+    def encode_rows(self, rows):
+        """Encode a list of feature dicts into an (n, n_outputs) array"""
+        out = np.zeros((len(rows), self.n_outputs))
+        for i, row in enumerate(rows):
+            self.encode_row(row, out[i:i + 1])
+        return out
+
+    def encode_columns(self, X):
+        """Encode a DataFrame (or any mapping of column -> values) in bulk"""
+        missing = self.missing_features(X.keys())
+        if missing:
+            raise self._missing_error(X.keys())
+        n_rows = len(X[self.numeric_features[0] if self.numeric_features else self.categorical_features[0]])
+        out = np.zeros((n_rows, self.n_outputs))
+        if self.numeric_features:
+            numeric = np.column_stack([np.asarray(X[name], dtype=np.float64) for name in self.numeric_features])
+            out[:, :len(self.numeric_features)] = (numeric - self.means) / self.scales
+
+        rows = np.arange(n_rows)
+        for name, columns in zip(self.categorical_features, self.category_columns):
+            values = X[name]
+            if hasattr(values, 'cat'):
+                # Look up each category once and gather by code, -1 (missing) stays unknown
+                lookup = np.array([columns.get(value, -1) for value in values.cat.categories] + [-1])
+                column_idx = lookup[values.cat.codes.to_numpy()]
+            else:
+                column_idx = np.fromiter((columns.get(value, -1) for value in values), dtype=np.int64, count=n_rows)
+            known = column_idx >= 0
+            out[rows[known], column_idx[known]] = 1.0
+        return out
+
+
+class FastPredictor:
+    """Fitted Pipeline split into a CompiledEncoder and its final classifier"""
+
+    def __init__(self, encoder, classifier, metadata=None):
+        self.encoder = encoder
+        self.classifier = classifier
+        self.metadata = metadata
+
+    @classmethod
+    def from_pipeline(cls, model, flatten=False, metadata=None):
+        """
+        With flatten=True a random forest is swapped for its FlatForest export, other classifiers are kept.
+
+        metadata is the pickle's sidecar header (artifact.model_metadata).
+        """
+        from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+        classifier = model.named_steps['classifier']
+        if flatten and isinstance(classifier, (RandomForestClassifier, ExtraTreesClassifier)):
+            classifier = FlatForest.from_classifier(classifier)
+        return cls(CompiledEncoder.from_preprocessor(model.named_steps['preprocessor']), classifier, metadata)
+
+    @property
+    def antisymmetric(self):
+        """Whether the model was trained on one canonical row per match, as saved in its metadata"""
+        return bool((self.metadata or {}).get('antisymmetric'))
+
+    def predict_proba_rows(self, rows, symmetric=False):
+        """
+        predict_proba for a list of feature dicts.
+
+        With symmetric=True both orientations are scored in one classifier call and
+        averaged, as in symmetric.predict_proba_symmetric.
+        """
+        encoded = self.encoder.encode_rows(rows)
+        if not symmetric:
+            return self.classifier.predict_proba(encoded)
+
+        flipped = [dict(row, **{column: -row[column] for column in ALL_DIFFERENCE_COLUMNS if column in row})
+                   for row in rows]
+        proba = self.classifier.predict_proba(np.vstack([encoded, self.encoder.encode_rows(flipped)]))[:, 1]
+        p_wins = 0.5 * (proba[:len(rows)] + 1.0 - proba[len(rows):])
+        return np.column_stack([1.0 - p_wins, p_wins])
+
+    def predict_proba(self, X):
+        """predict_proba for a DataFrame, same result as the original Pipeline"""
+        return self.classifier.predict_proba(self.encoder.encode_columns(X))
@@ -0,0 +1,199 @@
+import re
+import unicodedata
+
+import numpy as np
+
+# pandas is imported by the functions building frames, so scoring a single
+# matchup (matchup_row, the artifact predict path) only needs NumPy
+
+# Columns shared by both player perspectives of a match
+COMMON_COLUMNS = ['Surface', 'Round', 'Best of', 'Tourney Date']
+
+# (P column, OP column, Player_1 source, Player_2 source)
+PERSPECTIVE_COLUMNS = [
+    ('P_Rank', 'OP_Rank', 'Rank_1', 'Rank_2'),
+    ('P_Pts', 'OP_Pts', 'Pts_1', 'Pts_2'),
+    ('P_Odd', 'OP_Odd', 'Odd_1', 'Odd_2'),
+]
+
+# Raw per-player columns dropped before training, only the differences are used
+RAW_PERSPECTIVE_COLUMNS = ['P_Rank', 'OP_Rank', 'P_Pts', 'OP_Pts', 'P_Odd', 'OP_Odd']
+
+# P-minus-OP features, they change sign when the perspective is flipped
+DIFFERENCE_COLUMNS = ['Rank_Diff', 'Pts_Diff', 'Odd_Ratio_Log']
+
+# Optional P-minus-OP pre-match features, built only when the source has the
+# per-player columns: (difference column, Player_1 source, Player_2 source)
+OPTIONAL_DIFFERENCE_COLUMNS = [
+    # Ratings from ao_predictor.elo
+    ('Elo_Diff', 'Elo_1', 'Elo_2'),
+    ('Surface_Elo_Diff', 'Surface_Elo_1', 'Surface_Elo_2'),
+    # Recent form and head-to-head from ao_predictor.form
+    ('Form_Diff', 'Form_1', 'Form_2'),
+    ('Form_52w_Diff', 'Form_52w_1', 'Form_52w_2'),
+    ('Surface_Form_52w_Diff', 'Surface_Form_52w_1', 'Surface_Form_52w_2'),
+    ('H2H_Diff', 'H2H_Wins_1', 'H2H_Wins_2'),
+]
+
+# Every column that changes sign when the perspective is flipped, optional ones included
+ALL_DIFFERENCE_COLUMNS = DIFFERENCE_COLUMNS + [column for column, _, _ in OPTIONAL_DIFFERENCE_COLUMNS]
+
+# Model inputs of a matchup_row
+MATCHUP_COLUMNS = ['Surface', 'Round', 'Best of'] + DIFFERENCE_COLUMNS
+
+# Optional difference columns a saved EloRatings / FormIndex provides for a single matchup
+ELO_DIFFERENCE_COLUMNS = ['Elo_Diff', 'Surface_Elo_Diff']
+FORM_DIFFERENCE_COLUMNS = ['Form_Diff', 'Form_52w_Diff', 'Surface_Form_52w_Diff', 'H2H_Diff']
+
+# Trailing initials of an atp.csv name, "Sinner J." or "Struff J.L."
+_INITIALS = re.compile(r'^(?:[A-Z]\.)+$')
+
+
+def player_key(name):
+    """
+    atp.csv's "Surname I." form of a player name, the key every source is matched on.
+
+    Full names as scraped ("Jannik Sinner", "Alex de Minaur") become "Sinner J." and
+    "De Minaur A.": the first word is the given name (initials of each hyphenated
+    part), the rest the surname. Accents are dropped. Names already ending in
+    initials, and names with non-letter words (synthetic "Player 00042"), are kept.
+    """
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode()
+    words = name.split()
+    if len(words) < 2 or _INITIALS.match(words[-1]):
+        return ' '.join(words)
+    if not all(word.replace('-', '').replace("'", '').isalpha() for word in words):
+        return ' '.join(words)
+    initials = ''.join(f"{part[0].upper()}." for part in words[0].split('-') if part)
+    surname = ' '.join(word[0].upper() + word[1:] for word in words[1:])
+    return f"{surname} {initials}"
+
+
+def _interleave(first, second):
+    """Stack two equal length arrays as [first[0], second[0], first[1], second[1], ...]"""
+    out = np.empty(2 * len(first), dtype=np.result_type(first, second))
+    out[0::2] = first
+    out[1::2] = second
+    return out
+
+
+def same_player(left, right):
+    """Element-wise name equality, cheap when both columns share a categorical dtype"""
+    import pandas as pd
+
+    if isinstance(left.dtype, pd.CategoricalDtype) and left.dtype == right.dtype:
+        left_codes = left.cat.codes.to_numpy()
+        return (left_codes == right.cat.codes.to_numpy()) & (left_codes != -1)
+    return left.to_numpy(dtype=object) == right.to_numpy(dtype=object)
+
+
+def odds_ratio_log(p_odd, op_odd):
+    """log(P_Odd / OP_Odd), 0 (neutral) wherever OP_Odd is not positive or the log is undefined"""
+    p_odd = np.asarray(p_odd, dtype=np.float64)
+    op_odd = np.asarray(op_odd, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_ratio = np.log(p_odd / op_odd)
+    log_ratio[~(op_odd > 0)] = np.nan
+    return np.where(np.isnan(log_ratio), 0.0, log_ratio)
+
+
+def build_match_features(df_atp):
+    """
+    Build the two-perspective feature frame from cleaned ATP matches.
+
+    Row 2*i is match i seen from Player_1 (P) against Player_2 (OP), row 2*i+1 is
+    the flipped perspective. The result matches the original iterrows loop.
+    """
+    import pandas as pd
+
+    data = {}
+    for column in COMMON_COLUMNS:
+        data[column] = df_atp[column].array.repeat(2)
+
+    for p_column, op_column, source_1, source_2 in PERSPECTIVE_COLUMNS:
+        values_1 = df_atp[source_1].to_numpy()
+        values_2 = df_atp[source_2].to_numpy()
+        data[p_column] = _interleave(values_1, values_2)
+        data[op_column] = _interleave(values_2, values_1)
+
+    data['Winner_Is_P'] = _interleave(
+        same_player(df_atp['Winner'], df_atp['Player_1']),
+        same_player(df_atp['Winner'], df_atp['Player_2']),
+    ).astype(np.int64)
+
+    df_processed = pd.DataFrame(data)
+
+    # Positive if P has a worse (numerically higher) rank
+    df_processed['Rank_Diff'] = df_processed['P_Rank'] - df_processed['OP_Rank']
+    # Positive if P has more points
+    df_processed['Pts_Diff'] = df_processed['P_Pts'] - df_processed['OP_Pts']
+    # Log odds ratio is more stable than the raw betting odds
+    df_processed['Odd_Ratio_Log'] = odds_ratio_log(df_processed['P_Odd'], df_processed['OP_Odd'])
+
+    # Positive if P is rated higher / in better form / ahead in the head-to-head
+    for diff_column, source_1, source_2 in OPTIONAL_DIFFERENCE_COLUMNS:
+        if source_1 in df_atp.columns:
+            diff = df_atp[source_1].to_numpy(dtype=np.float64) - df_atp[source_2].to_numpy(dtype=np.float64)
+            df_processed[diff_column] = _interleave(diff, -diff)
+
+    return df_processed
+
+
+def build_matchup_frame(surface, round_name, best_of, rank_a, rank_b, pts_a, pts_b, odd_a, odd_b):
+    """
+    Model input rows for hypothetical matchups, player A as P and player B as OP.
+
+    Every argument is a scalar or an array of equal length, one row per matchup.
+    """
+    import pandas as pd
+
+    rank_a, rank_b, pts_a, pts_b, odd_a, odd_b = (
+        np.atleast_1d(np.asarray(values, dtype=np.float64))
+        for values in (rank_a, rank_b, pts_a, pts_b, odd_a, odd_b)
+    )
+    n_rows = max(len(rank_a), len(rank_b))
+    return pd.DataFrame({
+        'Surface': np.broadcast_to(np.asarray(surface, dtype=object), n_rows),
+        'Round': np.broadcast_to(np.asarray(round_name, dtype=object), n_rows),
+        'Best of': np.broadcast_to(np.asarray(best_of, dtype=np.int64), n_rows),
+        'Rank_Diff': rank_a - rank_b,
+        'Pts_Diff': pts_a - pts_b,
+        'Odd_Ratio_Log': odds_ratio_log(odd_a, odd_b),
+    })
+
+
+def matchup_row(surface, round_name, best_of, rank_a, rank_b, pts_a, pts_b, odd_a, odd_b):
+    """Single matchup as a plain dict of model inputs, the DataFrame-free twin of build_matchup_frame"""
+    return {
+        'Surface': surface,
+        'Round': round_name,
+        'Best of': best_of,
+        'Rank_Diff': float(rank_a) - float(rank_b),
+        'Pts_Diff': float(pts_a) - float(pts_b),
+        'Odd_Ratio_Log': float(odds_ratio_log([odd_a], [odd_b])[0]),
+    }
+
+
+def prematch_columns(elo_ratings=None, form_index=None):
+    """Optional difference columns prematch_differences fills from the given indexes"""
+    return ((ELO_DIFFERENCE_COLUMNS if elo_ratings is not None else []) +
+            (FORM_DIFFERENCE_COLUMNS if form_index is not None else []))
+
+
+def prematch_differences(player_a, player_b, surface, date, elo_ratings=None, form_index=None):
+    """
+    Optional difference columns of one matchup, player A as P, from an EloRatings and/or FormIndex.
+
+    Elo is the players' current rating, form and head-to-head count the matches
+    before date, as the training features do for a match played on that date.
+    """
+    sources = {}
+    if elo_ratings is not None:
+        elo_a, surface_elo_a = elo_ratings.current(player_a, surface)
+        elo_b, surface_elo_b = elo_ratings.current(player_b, surface)
+        sources.update({'Elo_1': elo_a, 'Elo_2': elo_b,
+                        'Surface_Elo_1': surface_elo_a, 'Surface_Elo_2': surface_elo_b})
+    if form_index is not None:
+        sources.update(form_index.lookup(player_a, player_b, surface, date))
+    return {diff_column: float(sources[source_1]) - float(sources[source_2])
+            for diff_column, source_1, source_2 in OPTIONAL_DIFFERENCE_COLUMNS if source_1 in sources}
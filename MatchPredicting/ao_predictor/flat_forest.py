@@ -0,0 +1,128 @@
+import numpy as np
+
+# Rows traversed per chunk, bounds the (n_trees * rows) index arrays to a few tens of MB
+CHUNK_ROWS = 8192
+
+ARRAY_NAMES = ('feature', 'threshold', 'children', 'value', 'roots')
+
+
+class FlatForest:
+    """
+    Binary RandomForestClassifier flattened into contiguous node arrays.
+
+    All trees share one node table: split feature, threshold, (left, right)
+    children and the class-1 probability of every node. Leaves point at
+    themselves with an infinite threshold, so traversal is the same step for
+    every node and a batch moves through all trees at once.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_classifier(cls, forest):
+        if list(forest.classes_) != [0, 1]:
+            raise ValueError(f"Only binary 0/1 forests can be flattened, got classes {forest.classes_}")
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.int32) + offset
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            children.append(np.column_stack([
+                np.where(is_leaf, node_ids, tree.children_left + offset),
+                np.where(is_leaf, node_ids, tree.children_right + offset),
+            ]).astype(np.int32))
+            # Class weights per node normalised to a probability, as tree.predict_proba does
+            counts = tree.value[:, 0, :]
+            values.append(counts[:, 1] / counts.sum(axis=1))
+
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(np.concatenate(features), np.concatenate(thresholds), np.concatenate(children),
+                   np.concatenate(values), np.array(roots, dtype=np.int32), max_depth)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ARRAY_NAMES)
+
+    def astype32(self):
+        """
+        Copy with float32 thresholds and leaf values, half the node table's float bytes.
+
+        Thresholds are rounded down, so float32 features take exactly the same
+        branches: no float32 value lies between the rounded and the original threshold.
+        """
+        threshold = self.threshold.astype(np.float32)
+        rounded_up = threshold.astype(np.float64) > self.threshold
+        threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+        return FlatForest(self.feature, threshold, self.children, self.value.astype(np.float32), self.roots,
+                          self.max_depth)
+
+    def _leaf_probabilities(self, X):
+        """(n_trees, n_rows) class-1 probability of the leaf each row lands in"""
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        flat_children = self.children.ravel()
+        nodes = np.repeat(self.roots, n_rows)
+        row_offsets = np.tile(np.arange(n_rows) * n_features, self.n_trees)
+
+        # Only (tree, row) pairs that have not reached a leaf yet take the next step
+        active = np.arange(len(nodes))
+        for _ in range(self.max_depth):
+            current = nodes[active]
+            # NaN never goes left, matching sklearn's `x <= threshold` test
+            goes_right = ~(flat_X[row_offsets[active] + self.feature[current]] <= self.threshold[current])
+            following = flat_children[2 * current + goes_right]
+            nodes[active] = following
+            active = active[following != current]
+            if not len(active):
+                break
+        return self.value[nodes].reshape(self.n_trees, n_rows)
+
+    def tree_probabilities(self, X):
+        """(n_trees, n_rows) class-1 probability of every tree, the forest's is their mean"""
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        probabilities = np.empty((self.n_trees, len(X)))
+        for start in range(0, len(X), CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            probabilities[:, start:start + len(chunk)] = self._leaf_probabilities(chunk)
+        return probabilities
+
+    def predict_proba(self, X):
+        """Same contract as RandomForestClassifier.predict_proba for a dense feature matrix"""
+        # sklearn compares float32 features against float64 thresholds, round the same way
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        p_wins = np.empty(len(X))
+        for start in range(0, len(X), CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            p_wins[start:start + len(chunk)] = self._leaf_probabilities(chunk).mean(axis=0)
+        return np.column_stack([1.0 - p_wins, p_wins])
+
+    def save(self, path):
+        np.savez(path, max_depth=self.max_depth, **{name: getattr(self, name) for name in ARRAY_NAMES})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls(*(arrays[name] for name in ARRAY_NAMES), max_depth=arrays['max_depth'])
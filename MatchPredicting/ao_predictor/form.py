@@ -0,0 +1,340 @@
+"""
+As-of recent form and head-to-head features without quadratic scans.
+
+Every match is expanded into one history row per player. The rows are sorted by
+a (group, day) key: group is the player, the (player, surface) pair or the
+player pair, and a running sum of wins is kept alongside. The wins and matches
+of any group in any [start, end) date range then take two binary searches.
+Features only use matches with a Tourney Date strictly before the match's own,
+so no result from the same tournament leaks in.
+
+The head-to-head index can be saved and answers "A vs B as of date D" in
+O(log n) at serving time. The full FormIndex (form and head-to-head) can be
+saved too, it gives predict and the service the form features of a matchup.
+
+Run from MatchPredicting/:
+    python -m ao_predictor.form --csv atp.csv --h2h atp_h2h [--index atp_form]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from ao_predictor.features import same_player
+
+# Pre-match form columns added next to Player_1/Player_2
+FORM_COLUMNS = ['Form_1', 'Form_2', 'Form_52w_1', 'Form_52w_2', 'Surface_Form_52w_1', 'Surface_Form_52w_2',
+                'H2H_Wins_1', 'H2H_Wins_2']
+
+DEFAULT_LAST_N = 10
+DEFAULT_WEEKS = 52
+
+# Win rate of a player without a match in the window
+NEUTRAL_FORM = 0.5
+
+# Keys are (group << DAY_BITS) | days since EPOCH
+EPOCH = np.datetime64('1900-01-01', 'D')
+DAY_BITS = 20
+
+# Player ids per side of a pair key, (low * MAX_PLAYERS + high) << DAY_BITS still fits an int64
+MAX_PLAYERS = 1 << 17
+
+# Batch lookups at least this large are sorted before the binary searches
+SORTED_QUERY_MIN = 4096
+
+
+def _days(dates):
+    """Days since EPOCH for a datetime column"""
+    return (np.asarray(dates, dtype='datetime64[D]') - EPOCH).astype(np.int64)
+
+
+class AsOfIndex:
+    """
+    Wins and matches per group, queryable for any date range by binary search.
+
+    keys holds the sorted (group, day) keys of every history row and cum_wins the
+    number of wins among the rows before each position.
+    """
+
+    def __init__(self, keys, cum_wins):
+        self.keys = keys
+        self.cum_wins = cum_wins
+
+    @classmethod
+    def build(cls, groups, days, wins):
+        keys = (np.asarray(groups, dtype=np.int64) << DAY_BITS) | np.asarray(days, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        cum_wins = np.r_[0, np.cumsum(np.asarray(wins, dtype=np.int64)[order])]
+        return cls(keys[order], cum_wins)
+
+    def _position(self, groups, days):
+        """Index of the first row of groups on or after days"""
+        keys = (np.asarray(groups, dtype=np.int64) << DAY_BITS) | np.clip(days, 0, (1 << DAY_BITS) - 1)
+        if len(keys) < SORTED_QUERY_MIN:
+            return np.searchsorted(self.keys, keys, side='left')
+        # Sorted queries walk the index in order, about 5x faster than random probes at 1M rows
+        order = np.argsort(keys)
+        positions = np.empty(len(keys), dtype=np.int64)
+        positions[order] = np.searchsorted(self.keys, keys[order], side='left')
+        return positions
+
+    def between(self, groups, start_days, end_days):
+        """(wins, matches) of each group with start_days <= day < end_days"""
+        lo = self._position(groups, start_days)
+        hi = self._position(groups, end_days)
+        return self.cum_wins[hi] - self.cum_wins[lo], hi - lo
+
+    def last_n(self, groups, end_days, n):
+        """(wins, matches) over each group's last n rows before end_days"""
+        first = self._position(groups, 0)
+        hi = self._position(groups, end_days)
+        lo = np.maximum(first, hi - n)
+        return self.cum_wins[hi] - self.cum_wins[lo], hi - lo
+
+
+def _win_rate(wins, matches):
+    return np.where(matches > 0, wins / np.maximum(matches, 1), NEUTRAL_FORM)
+
+
+def _pair_groups(player_a, player_b):
+    """Order-independent pair group, plus whether player_a is the lower id"""
+    low, high = np.minimum(player_a, player_b), np.maximum(player_a, player_b)
+    return low * MAX_PLAYERS + high, player_a == low
+
+
+class H2HIndex:
+    """Head-to-head records by player name, as of any date"""
+
+    def __init__(self, names, index):
+        self.names = list(names)
+        self.player_index = {name: i for i, name in enumerate(self.names)}
+        self.index = index
+
+    @classmethod
+    def build(cls, df_atp):
+        return cls.from_arrays(*_match_arrays(df_atp))
+
+    @classmethod
+    def from_arrays(cls, names, player_1, player_2, days, player_1_won, decided):
+        groups, player_1_is_low = _pair_groups(player_1[decided], player_2[decided])
+        low_won = player_1_won[decided] == player_1_is_low
+        return cls(names, AsOfIndex.build(groups, days[decided], low_won))
+
+    def records(self, player_a, player_b, days):
+        """(wins of a, wins of b) for id arrays, over matches strictly before days"""
+        groups, a_is_low = _pair_groups(player_a, player_b)
+        low_wins, matches = self.index.between(groups, np.zeros_like(days), days)
+        wins_a = np.where(a_is_low, low_wins, matches - low_wins)
+        return wins_a, matches - wins_a
+
+    def lookup(self, player_a, player_b, date):
+        """(wins of player_a, wins of player_b) before date, (0, 0) when either is unknown"""
+        a = self.player_index.get(player_a)
+        b = self.player_index.get(player_b)
+        if a is None or b is None or a == b:
+            return 0, 0
+        # Scalar twin of records(): two binary searches on Python ints
+        low, high = min(a, b), max(a, b)
+        group = (low * MAX_PLAYERS + high) << DAY_BITS
+        day = int((np.datetime64(date, 'D') - EPOCH).astype(np.int64))
+        lo, hi = self.index.keys.searchsorted([group, group | day])
+        low_wins = int(self.index.cum_wins[hi] - self.index.cum_wins[lo])
+        matches = int(hi - lo)
+        wins_a = low_wins if a == low else matches - low_wins
+        return wins_a, matches - wins_a
+
+    def save(self, path):
+        """path.npz holds the sorted keys and win counts, path.json the player names"""
+        np.savez(f"{path}.npz", keys=self.index.keys, cum_wins=self.index.cum_wins)
+        with open(f"{path}.json", 'w') as f:
+            json.dump({'names': [str(name) for name in self.names]}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(f"{path}.json") as f:
+            names = json.load(f)['names']
+        with np.load(f"{path}.npz") as arrays:
+            return cls(names, AsOfIndex(arrays['keys'], arrays['cum_wins']))
+
+
+def _match_arrays(df_atp):
+    """(names, player_1 ids, player_2 ids, days, player_1_won, decided) with -1 for missing players"""
+    player_1 = df_atp['Player_1'].to_numpy(dtype=object)
+    player_2 = df_atp['Player_2'].to_numpy(dtype=object)
+    codes, names = pd.factorize(np.concatenate([player_1, player_2]))
+    if len(names) > MAX_PLAYERS:
+        raise ValueError(f"{len(names)} players exceed the head-to-head key limit of {MAX_PLAYERS}")
+    player_1, player_2 = codes[:len(df_atp)], codes[len(df_atp):]
+    player_1_won = same_player(df_atp['Winner'], df_atp['Player_1'])
+    player_2_won = same_player(df_atp['Winner'], df_atp['Player_2'])
+    decided = (player_1 >= 0) & (player_2 >= 0) & (player_1 != player_2) & (player_1_won != player_2_won)
+    return list(names), player_1, player_2, _days(df_atp['Tourney Date']), player_1_won, decided
+
+
+class FormIndex:
+    """
+    Form and head-to-head of every player, as of any date.
+
+    player_index holds one history row per player and decided match, surface_index
+    the same rows keyed by (player, surface). form_features() scores every match of
+    the history from it, lookup() one matchup by name at serving time.
+    """
+
+    def __init__(self, names, surfaces, player_index, surface_index, h2h_index,
+                 last_n=DEFAULT_LAST_N, weeks=DEFAULT_WEEKS):
+        self.names = list(names)
+        self.surfaces = list(surfaces)
+        self.player_ids = {name: i for i, name in enumerate(self.names)}
+        self.surface_ids = {surface: i for i, surface in enumerate(self.surfaces)}
+        self.player_index = player_index
+        self.surface_index = surface_index
+        self.h2h = H2HIndex(self.names, h2h_index)
+        self.last_n = int(last_n)
+        self.weeks = int(weeks)
+
+    @classmethod
+    def build(cls, df_atp, last_n=DEFAULT_LAST_N, weeks=DEFAULT_WEEKS):
+        return cls.from_arrays(*_match_arrays(df_atp), *_surface_codes(df_atp), last_n=last_n, weeks=weeks)
+
+    @classmethod
+    def from_arrays(cls, names, player_1, player_2, days, player_1_won, decided, surface, surfaces,
+                    last_n=DEFAULT_LAST_N, weeks=DEFAULT_WEEKS):
+        n_surfaces = max(len(surfaces), 1)
+
+        # One history row per player and decided match, interleaved so that matches
+        # on the same day stay in file order for the last-n cut
+        def history(values_1, values_2):
+            return np.column_stack([values_1[decided], values_2[decided]]).ravel()
+
+        players = history(player_1, player_2)
+        history_days = history(days, days)
+        won = history(player_1_won, ~player_1_won)
+        history_surface = history(surface, surface)
+        on_surface = history_surface >= 0
+        player_index = AsOfIndex.build(players, history_days, won)
+        surface_index = AsOfIndex.build((players * n_surfaces + history_surface)[on_surface],
+                                        history_days[on_surface], won[on_surface])
+        h2h = H2HIndex.from_arrays(names, player_1, player_2, days, player_1_won, decided)
+        return cls(names, surfaces, player_index, surface_index, h2h.index, last_n, weeks)
+
+    def player_form(self, player, surface, days):
+        """(Form, Form_52w, Surface_Form_52w) of id arrays before days, neutral for -1 players or surfaces"""
+        n_surfaces = max(len(self.surfaces), 1)
+        known = player >= 0
+        player = np.where(known, player, 0)
+        window_start = days - 7 * self.weeks
+        form = _win_rate(*self.player_index.last_n(player, days, self.last_n))
+        form_52w = _win_rate(*self.player_index.between(player, window_start, days))
+        surface_form = _win_rate(*self.surface_index.between(player * n_surfaces + np.maximum(surface, 0),
+                                                             window_start, days))
+        return (np.where(known, form, NEUTRAL_FORM), np.where(known, form_52w, NEUTRAL_FORM),
+                np.where(known & (surface >= 0), surface_form, NEUTRAL_FORM))
+
+    def lookup(self, player_a, player_b, surface, date):
+        """
+        FORM_COLUMNS of player_a (as Player_1) against player_b on surface, before date.
+
+        Unknown players and surfaces get the neutral form and no head-to-head, as
+        in form_features.
+        """
+        players = np.array([self.player_ids.get(player_a, -1), self.player_ids.get(player_b, -1)])
+        surface_idx = np.full(2, self.surface_ids.get(surface, -1))
+        days = np.full(2, int((np.datetime64(date, 'D') - EPOCH).astype(np.int64)))
+        form, form_52w, surface_form = self.player_form(players, surface_idx, days)
+        h2h_wins_a, h2h_wins_b = self.h2h.lookup(player_a, player_b, date)
+        return {
+            'Form_1': float(form[0]), 'Form_2': float(form[1]),
+            'Form_52w_1': float(form_52w[0]), 'Form_52w_2': float(form_52w[1]),
+            'Surface_Form_52w_1': float(surface_form[0]), 'Surface_Form_52w_2': float(surface_form[1]),
+            'H2H_Wins_1': h2h_wins_a, 'H2H_Wins_2': h2h_wins_b,
+        }
+
+    def save(self, path):
+        """path.npz holds the three sorted indexes, path.json the player and surface names and windows"""
+        np.savez(f"{path}.npz", player_keys=self.player_index.keys, player_cum_wins=self.player_index.cum_wins,
+                 surface_keys=self.surface_index.keys, surface_cum_wins=self.surface_index.cum_wins,
+                 h2h_keys=self.h2h.index.keys, h2h_cum_wins=self.h2h.index.cum_wins)
+        with open(f"{path}.json", 'w') as f:
+            json.dump({'names': [str(name) for name in self.names], 'surfaces': [str(s) for s in self.surfaces],
+                       'last_n': self.last_n, 'weeks': self.weeks}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(f"{path}.json") as f:
+            index = json.load(f)
+        with np.load(f"{path}.npz") as arrays:
+            return cls(index['names'], index['surfaces'],
+                       AsOfIndex(arrays['player_keys'], arrays['player_cum_wins']),
+                       AsOfIndex(arrays['surface_keys'], arrays['surface_cum_wins']),
+                       AsOfIndex(arrays['h2h_keys'], arrays['h2h_cum_wins']),
+                       index['last_n'], index['weeks'])
+
+
+def _surface_codes(df_atp):
+    """(surface ids with -1 for missing, surface names)"""
+    surface, surfaces = pd.factorize(df_atp['Surface'].to_numpy(dtype=object))
+    return surface, list(surfaces)
+
+
+def form_features(df_atp, last_n=DEFAULT_LAST_N, weeks=DEFAULT_WEEKS):
+    """
+    Pre-match FORM_COLUMNS for every match in df_atp, indexed like df_atp.
+
+    Form_* is the win rate over a player's last last_n matches, Form_52w_* over
+    the last `weeks` weeks and Surface_Form_52w_* over the same weeks on the
+    match surface. H2H_Wins_* count earlier wins against this opponent.
+    """
+    match_arrays = _match_arrays(df_atp)
+    _, player_1, player_2, days, _, _ = match_arrays
+    surface, surfaces = _surface_codes(df_atp)
+    index = FormIndex.from_arrays(*match_arrays, surface, surfaces, last_n=last_n, weeks=weeks)
+
+    features = {}
+    for side, player in (('1', player_1), ('2', player_2)):
+        form, form_52w, surface_form = index.player_form(player, surface, days)
+        features[f"Form_{side}"] = form
+        features[f"Form_52w_{side}"] = form_52w
+        features[f"Surface_Form_52w_{side}"] = surface_form
+
+    both_known = (player_1 >= 0) & (player_2 >= 0) & (player_1 != player_2)
+    wins_1, wins_2 = index.h2h.records(np.where(both_known, player_1, 0), np.where(both_known, player_2, 1), days)
+    features['H2H_Wins_1'] = np.where(both_known, wins_1, 0)
+    features['H2H_Wins_2'] = np.where(both_known, wins_2, 0)
+    return pd.DataFrame(features, index=df_atp.index, columns=FORM_COLUMNS)
+
+
+def add_form_features(df_atp, last_n=DEFAULT_LAST_N, weeks=DEFAULT_WEEKS):
+    """df_atp with the pre-match FORM_COLUMNS"""
+    return df_atp.join(form_features(df_atp, last_n, weeks))
+
+
+def main():
+    from ao_predictor.loader import load_atp_csv
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default='atp.csv')
+    parser.add_argument('--h2h', default='atp_h2h', help="index path prefix, writes <h2h>.npz and <h2h>.json")
+    parser.add_argument('--index', help="also write the full form index (predict --form-index, AO_FORM_INDEX)")
+    args = parser.parse_args()
+
+    df_atp = load_atp_csv(args.csv, verbose=False)
+    start = time.perf_counter()
+    index = H2HIndex.build(df_atp)
+    elapsed = time.perf_counter() - start
+    index.save(args.h2h)
+    print(f"Indexed {len(index.index.keys):,} head-to-head results for {len(index.names):,} players "
+          f"in {elapsed * 1000:.0f} ms")
+    print(f"Saved {args.h2h}.npz and {args.h2h}.json")
+    if args.index:
+        start = time.perf_counter()
+        form_index = FormIndex.build(df_atp)
+        elapsed = time.perf_counter() - start
+        form_index.save(args.index)
+        print(f"Indexed the form of {len(form_index.names):,} players in {elapsed * 1000:.0f} ms")
+        print(f"Saved {args.index}.npz and {args.index}.json")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from ao_predictor.memory import format_peak_rss
+
+# Bump whenever ATP_DTYPES or the post-processing changes so old snapshots are rebuilt
+SCHEMA_VERSION = 1
+
+# Ranks are float32 rather than int32 because missing ranks are imputed after loading
+ATP_DTYPES = {
+    'Tour Name Date': 'int32',
+    'Surface': 'category',
+    'Round': 'category',
+    'Best of': 'int8',
+    'Player_1': 'category',
+    'Player_2': 'category',
+    'Winner': 'category',
+    'Rank_1': 'float32',
+    'Rank_2': 'float32',
+    'Pts_1': 'float32',
+    'Pts_2': 'float32',
+    'Odd_1': 'float32',
+    'Odd_2': 'float32',
+}
+
+PLAYER_COLUMNS = ['Player_1', 'Player_2', 'Winner']
+
+FINGERPRINT_KEY = b'ao_predictor.fingerprint'
+
+
+def snapshot_path(csv_path):
+    """atp.csv -> atp.parquet, next to the CSV"""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def csv_fingerprint(csv_path, sha256=None):
+    stat = os.stat(csv_path)
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256 if sha256 is not None else file_sha256(csv_path),
+    }
+
+
+def _unify_player_categories(df_atp):
+    """Give all player columns one categorical dtype so Winner compares with Player_1/Player_2 by code"""
+    players = pd.api.types.union_categoricals([df_atp[column] for column in PLAYER_COLUMNS])
+    player_dtype = pd.CategoricalDtype(players.categories)
+    for column in PLAYER_COLUMNS:
+        df_atp[column] = df_atp[column].astype(player_dtype)
+    return df_atp
+
+
+def _csv_dtypes(csv_path):
+    header = pd.read_csv(csv_path, nrows=0).columns
+    return {column: dtype for column, dtype in ATP_DTYPES.items() if column in header}
+
+
+def _add_tourney_date(df_atp):
+    df_atp['Tourney Date'] = pd.to_datetime(df_atp['Tour Name Date'].astype(str), format='%Y%m%d')
+    return df_atp
+
+
+def _read_typed_csv(csv_path):
+    """Parse the CSV with the explicit schema"""
+    df_atp = pd.read_csv(csv_path, dtype=_csv_dtypes(csv_path), low_memory=False)
+
+    # Parse the tournament date once, it is stored in the snapshot
+    return _add_tourney_date(df_atp)
+
+
+def iter_atp_chunks(csv_path='atp.csv', chunksize=200_000, columns=None):
+    """
+    Typed atp.csv in chunks of at most chunksize rows, for passes that must not hold the file.
+
+    columns limits the parsed columns. Chunks carry 'Tourney Date' when the date
+    column is read and their own shared player dtype when all player columns are.
+    """
+    dtypes = _csv_dtypes(csv_path)
+    if columns is not None:
+        dtypes = {column: dtype for column, dtype in dtypes.items() if column in columns}
+    reader = pd.read_csv(csv_path, dtype=dtypes, usecols=columns, chunksize=chunksize, low_memory=False)
+    with reader:
+        for chunk in reader:
+            if 'Tour Name Date' in chunk.columns:
+                chunk = _add_tourney_date(chunk)
+            if all(column in chunk.columns for column in PLAYER_COLUMNS):
+                chunk = _unify_player_categories(chunk)
+            yield chunk
+
+
+def _snapshot_fingerprint(parquet_path):
+    import pyarrow.parquet as pq
+
+    metadata = pq.read_schema(parquet_path).metadata or {}
+    if FINGERPRINT_KEY not in metadata:
+        return None
+    return json.loads(metadata[FINGERPRINT_KEY])
+
+
+def _write_snapshot(df_atp, parquet_path, fingerprint):
+    import pyarrow as pa
+
+    _write_table(pa.Table.from_pandas(df_atp, preserve_index=False), parquet_path, fingerprint)
+
+
+def _write_table(table, parquet_path, fingerprint):
+    import pyarrow.parquet as pq
+
+    metadata = dict(table.schema.metadata or {})
+    metadata[FINGERPRINT_KEY] = json.dumps(fingerprint).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    # Write then rename so a crashed run never leaves a half-written snapshot behind
+    tmp_path = parquet_path + '.tmp'
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, parquet_path)
+
+
+def _refresh_fingerprint(parquet_path, fingerprint):
+    """Store a new fingerprint in the snapshot, its data is kept as is"""
+    import pyarrow.parquet as pq
+
+    _write_table(pq.read_table(parquet_path), parquet_path, fingerprint)
+
+
+def _snapshot_is_current(csv_path, parquet_path):
+    """
+    Cheap size/mtime check first, fall back to hashing the CSV if only mtime moved.
+
+    When the hash still matches, the snapshot's fingerprint is updated to the new
+    mtime, so later loads take the cheap path again.
+    """
+    if not os.path.exists(parquet_path):
+        return False
+    try:
+        cached = _snapshot_fingerprint(parquet_path)
+    except Exception:
+        return False
+    if not cached or cached.get('schema_version') != SCHEMA_VERSION:
+        return False
+
+    stat = os.stat(csv_path)
+    if cached['size'] != stat.st_size:
+        return False
+    if cached['mtime_ns'] == stat.st_mtime_ns:
+        return True
+    sha256 = file_sha256(csv_path)
+    if cached['sha256'] != sha256:
+        return False
+    try:
+        _refresh_fingerprint(parquet_path, csv_fingerprint(csv_path, sha256))
+    except OSError as e:
+        print(f"Warning: could not update the fingerprint of {parquet_path}: {e}")
+    return True
+
+
+def load_atp_csv(csv_path='atp.csv', use_snapshot=True, verbose=True):
+    """
+    Load atp.csv with an explicit schema and 'Tourney Date' already parsed.
+
+    A Parquet snapshot is written next to the CSV and reused for as long as the
+    CSV's size/mtime (or content hash) is unchanged. Without pyarrow installed the
+    typed CSV is parsed on every call.
+    """
+    start = time.perf_counter()
+    parquet_path = snapshot_path(csv_path)
+    source = 'CSV'
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        use_snapshot = False
+
+    if use_snapshot and _snapshot_is_current(csv_path, parquet_path):
+        df_atp = pd.read_parquet(parquet_path)
+        source = f"snapshot {parquet_path}"
+    else:
+        df_atp = _read_typed_csv(csv_path)
+        if use_snapshot:
+            try:
+                _write_snapshot(df_atp, parquet_path, csv_fingerprint(csv_path))
+            except OSError as e:
+                print(f"Warning: could not write snapshot {parquet_path}: {e}")
+
+    # Parquet keeps a dictionary per column, so the shared player dtype is rebuilt on every load
+    df_atp = _unify_player_categories(df_atp)
+
+    if verbose:
+        elapsed = time.perf_counter() - start
+        print(f"Loaded {len(df_atp)} rows from {source} in {elapsed:.2f}s (peak RSS {format_peak_rss()})")
+    return df_atp
@@ -0,0 +1,61 @@
+import sys
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, None where the platform can't tell"""
+    try:
+        import resource
+    except ImportError:
+        # Windows has no resource module, psutil exposes the peak working set instead
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 1024 ** 2
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    if sys.platform == 'darwin':
+        return peak / 1024 ** 2
+    return peak / 1024
+
+
+def format_peak_rss():
+    peak = peak_rss_mb()
+    return f"{peak:.1f} MB" if peak is not None else "n/a"
+
+
+def _proc_status_mb(field):
+    """A kB field of /proc/self/status in MB, None off Linux"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_mb():
+    return _proc_status_mb('VmRSS')
+
+
+def reset_peak_rss():
+    """
+    Restart the peak RSS high-water mark from the current RSS, so that
+    high_water_rss_mb() covers only what runs afterwards. Linux only, returns
+    whether the mark was reset.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def high_water_rss_mb():
+    """Peak RSS since the last reset_peak_rss(), the process peak where it can't be reset"""
+    peak = _proc_status_mb('VmHWM')
+    return peak if peak is not None else peak_rss_mb()
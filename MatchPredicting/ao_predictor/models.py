@@ -0,0 +1,193 @@
+"""
+Model backends the predictor's features can be trained with, and a leaderboard to pick one.
+
+Every backend builds an unfitted Pipeline with the usual 'preprocessor' and
+'classifier' steps, so pickles, FastPredictor and the service take any of them.
+The leaderboard trains each backend on the chronological split and reports fit
+time, pickled size, single-row and batch latency through FastPredictor (the
+serving path) and test AUC/log-loss, so the cheapest model meeting an accuracy
+bar can be chosen.
+
+Run from MatchPredicting/:
+    python -m ao_predictor.models --csv atp.csv --min-auc 0.80
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from ao_predictor.features import ALL_DIFFERENCE_COLUMNS
+from ao_predictor.training import make_preprocessor
+
+DEFAULT_BACKEND = 'random_forest'
+
+MODEL_BACKENDS = {}
+
+# Rows scored per batch latency measurement
+BATCH_ROWS = 10_000
+
+
+def register_backend(name):
+    """Register a factory (X_train, seed, n_jobs) -> unfitted Pipeline under name"""
+    def register(factory):
+        MODEL_BACKENDS[name] = factory
+        return factory
+    return register
+
+
+@register_backend('random_forest')
+def random_forest(X_train, seed=42, n_jobs=-1):
+    """The predictor's original model: 200 full-depth trees over all features"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+
+    return Pipeline(steps=[('preprocessor', make_preprocessor(X_train)),
+                           ('classifier', RandomForestClassifier(n_estimators=200, random_state=seed, n_jobs=n_jobs))])
+
+
+@register_backend('hist_gradient_boosting')
+def hist_gradient_boosting(X_train, seed=42, n_jobs=-1):
+    """Histogram gradient boosting over all features, early-stopped on a validation slice"""
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.pipeline import Pipeline
+
+    # The boosting trees need dense input whatever the one-hot density
+    preprocessor = make_preprocessor(X_train).set_params(sparse_threshold=0)
+    return Pipeline(steps=[('preprocessor', preprocessor),
+                           ('classifier', HistGradientBoostingClassifier(max_iter=300, early_stopping=True,
+                                                                         random_state=seed))])
+
+
+@register_backend('logistic_regression')
+def logistic_regression(X_train, seed=42, n_jobs=-1):
+    """Logistic regression over the scaled difference features only"""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    difference_columns = [column for column in ALL_DIFFERENCE_COLUMNS if column in X_train.columns]
+    preprocessor = ColumnTransformer(transformers=[('num', StandardScaler(), difference_columns)])
+    return Pipeline(steps=[('preprocessor', preprocessor),
+                           ('classifier', LogisticRegression(max_iter=1000, random_state=seed))])
+
+
+def make_model(backend, X_train, seed=42, n_jobs=-1):
+    """Unfitted Pipeline of a registered backend"""
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}', expected one of {sorted(MODEL_BACKENDS)}")
+    return MODEL_BACKENDS[backend](X_train, seed=seed, n_jobs=n_jobs)
+
+
+def pickled_size_mb(model):
+    """Size of the model saved with joblib, as AO_ATP_Predictor.py saves it"""
+    import joblib
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'model.pkl')
+        joblib.dump(model, path)
+        return os.path.getsize(path) / 1024 ** 2
+
+
+def serving_latency_us(predictor, X_test, rows, repeats):
+    """(single-row median, batch per-row) latency in microseconds through FastPredictor"""
+    single = []
+    for row in rows[:repeats]:
+        start = time.perf_counter()
+        predictor.predict_proba_rows([row])
+        single.append(time.perf_counter() - start)
+    batch = X_test.iloc[:BATCH_ROWS]
+    start = time.perf_counter()
+    predictor.predict_proba(batch)
+    batch_elapsed = time.perf_counter() - start
+    return float(np.median(single)) * 1e6, batch_elapsed / len(batch) * 1e6
+
+
+def leaderboard(X_train, X_test, y_train, y_test, backends=None, seed=42, n_jobs=-1, repeats=1000):
+    """
+    Train every backend and measure it, one row per backend sorted by test log-loss.
+
+    Columns: fit_s, size_mb (pickled pipeline), single_us, batch_us (per row),
+    accuracy, roc_auc and log_loss.
+    """
+    from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+
+    from ao_predictor.fast_encoding import FastPredictor
+
+    rows = X_test.iloc[:repeats].to_dict('records')
+    results = []
+    for backend in backends or list(MODEL_BACKENDS):
+        model = make_model(backend, X_train, seed=seed, n_jobs=n_jobs)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_s = time.perf_counter() - start
+
+        predictor = FastPredictor.from_pipeline(model, flatten=True)
+        single_us, batch_us = serving_latency_us(predictor, X_test, rows, repeats)
+        y_proba = predictor.predict_proba(X_test)[:, 1]
+        results.append({
+            'backend': backend,
+            'fit_s': fit_s,
+            'size_mb': pickled_size_mb(model),
+            'single_us': single_us,
+            'batch_us': batch_us,
+            'accuracy': accuracy_score(y_test, y_proba > 0.5),
+            'roc_auc': roc_auc_score(y_test, y_proba),
+            'log_loss': log_loss(y_test, y_proba),
+        })
+    return pd.DataFrame(results).sort_values('log_loss', kind='stable').reset_index(drop=True)
+
+
+def cheapest_meeting(board, min_auc):
+    """Name of the backend with the lowest single-row latency among those with roc_auc >= min_auc, else None"""
+    qualified = board[board['roc_auc'] >= min_auc]
+    if qualified.empty:
+        return None
+    return qualified.sort_values('single_us', kind='stable').iloc[0]['backend']
+
+
+def format_leaderboard(board):
+    lines = [f"{'backend':<24}{'fit (s)':>9}{'size (MB)':>11}{'single (us)':>13}{'batch (us/row)':>16}"
+             f"{'accuracy':>10}{'AUC':>8}{'log-loss':>10}"]
+    for row in board.itertuples():
+        lines.append(f"{row.backend:<24}{row.fit_s:>9.2f}{row.size_mb:>11.2f}{row.single_us:>13.1f}"
+                     f"{row.batch_us:>16.2f}{row.accuracy:>10.4f}{row.roc_auc:>8.4f}{row.log_loss:>10.4f}")
+    return '\n'.join(lines)
+
+
+def main():
+    from ao_predictor.features import build_match_features
+    from ao_predictor.loader import load_atp_csv
+    from ao_predictor.training import DEFAULT_SPLIT_DATE, chronological_split, clean_matches
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default='atp.csv')
+    parser.add_argument('--backends', nargs='+', choices=sorted(MODEL_BACKENDS), help="default all")
+    parser.add_argument('--split-date', default=DEFAULT_SPLIT_DATE)
+    parser.add_argument('--min-auc', type=float, help="report the cheapest backend reaching this test AUC")
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--out', help="also write the leaderboard to this CSV")
+    args = parser.parse_args()
+
+    df_processed = build_match_features(clean_matches(load_atp_csv(args.csv, verbose=False)))
+    X_train, X_test, y_train, y_test, _ = chronological_split(df_processed, args.split_date)
+    print(f"Training on {len(X_train):,} rows, testing on {len(X_test):,}\n")
+
+    board = leaderboard(X_train, X_test, y_train, y_test, args.backends, n_jobs=args.n_jobs)
+    print(format_leaderboard(board))
+    if args.min_auc is not None:
+        cheapest = cheapest_meeting(board, args.min_auc)
+        if cheapest is None:
+            print(f"\nNo backend reaches AUC {args.min_auc:.4f}")
+        else:
+            print(f"\nCheapest backend with AUC >= {args.min_auc:.4f}: {cheapest}")
+    if args.out:
+        board.to_csv(args.out, index=False)
+        print(f"Leaderboard saved to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+Precomputed win probabilities for every ordered pair of the scraped top-100 players.
+
+The matrix is scored once per match context (surface, round, best of) in a single
+vectorised pass and stored as float32 next to a JSON name index, so the serving
+path answers a matchup among these players with a lookup instead of the model.
+Odds are not known ahead of time, both players get the neutral odd. The scraped
+rankings carry no points, each player's latest points in atp.csv (or a --points
+CSV) are used, matched on ao_predictor.features.player_key. Both
+orientations of every pair are scored and averaged, so p(a beats b) + p(b beats a)
+is exactly 1 even for models trained on two perspectives per match; for models
+saved as antisymmetric (artifact metadata or pickle sidecar) that average is the
+symmetric prediction they require, so tables need no flag either way. The table
+records a fingerprint of the model that scored it; an incremental rebuild only
+reuses probabilities scored by the same model.
+
+Run from MatchPredicting/:
+    python -m ao_predictor.pairwise --model ao_head_to_head_predictor --csv atp.csv \\
+        --rankings ../DataScraping/ao_atp_rankings_data.csv --out atp_pairwise --best-of 5
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from ao_predictor.features import MATCHUP_COLUMNS, odds_ratio_log, player_key
+
+# Australian Open rounds as they are named in atp.csv
+AO_ROUNDS = ['1st Round', '2nd Round', '3rd Round', '4th Round', 'Quarterfinals', 'Semifinals', 'The Final']
+
+NEUTRAL_ODD = 1.9
+
+
+def make_contexts(surface='Hard', rounds=AO_ROUNDS, best_of=5):
+    return [(surface, round_name, int(best_of)) for round_name in rounds]
+
+
+def latest_points(df_atp):
+    """player_key -> ranking points at each player's latest match with known points, from atp.csv as loaded"""
+    import pandas as pd
+
+    sides = [pd.DataFrame({'name': df_atp[f"Player_{side}"].to_numpy(dtype=object),
+                           'day': df_atp['Tourney Date'].to_numpy(dtype='datetime64[D]'),
+                           'points': df_atp[f"Pts_{side}"].to_numpy(dtype=np.float64)})
+             for side in ('1', '2')]
+    observations = pd.concat(sides, ignore_index=True).dropna()
+    latest = observations.sort_values('day', kind='stable').drop_duplicates('name', keep='last')
+    return {player_key(name): float(points) for name, points in zip(latest['name'], latest['points'])}
+
+
+def read_points(points_csv):
+    """player_key -> points from a CSV with Player_Name and Points columns"""
+    import pandas as pd
+
+    table = pd.read_csv(points_csv)
+    return {player_key(name): float(points) for name, points in zip(table['Player_Name'], table['Points'])}
+
+
+def player_points(csv_path=None, points_csv=None):
+    """Points for load_players: a --points CSV over atp.csv's latest points, {} when neither exists"""
+    points = {}
+    if csv_path and os.path.exists(csv_path):
+        from ao_predictor.loader import load_atp_csv
+        points.update(latest_points(load_atp_csv(csv_path, verbose=False)))
+    if points_csv:
+        points.update(read_points(points_csv))
+    return points
+
+
+def load_players(rankings_csv, points=None):
+    """
+    (names, ranks, points) from a scraped rankings CSV.
+
+    The scraped tables carry no ranking points; points come from the player_key ->
+    points mapping (player_points) and default to 0, like missing points in training.
+    """
+    import pandas as pd
+
+    rankings = pd.read_csv(rankings_csv)
+    names = rankings['Player_Name'].astype(str).tolist()
+    ranks = rankings['Rank'].to_numpy(dtype=np.float64)
+    points = points or {}
+    pts = np.array([float(points.get(player_key(name), 0.0)) for name in names])
+    return names, ranks, pts
+
+
+def score_pairs(predictor, ranks, pts, contexts, player_a, player_b):
+    """(n_contexts, n_pairs) probability that player_a beats player_b, in one classifier call"""
+    n_pairs = len(player_a)
+    n_contexts = len(contexts)
+    surfaces, rounds, best_ofs = zip(*contexts)
+    neutral = np.full(n_pairs, NEUTRAL_ODD)
+    columns = {
+        'Surface': np.repeat(np.array(surfaces, dtype=object), n_pairs),
+        'Round': np.repeat(np.array(rounds, dtype=object), n_pairs),
+        'Best of': np.repeat(np.array(best_ofs, dtype=np.float64), n_pairs),
+        'Rank_Diff': np.tile(ranks[player_a] - ranks[player_b], n_contexts),
+        'Pts_Diff': np.tile(pts[player_a] - pts[player_b], n_contexts),
+        'Odd_Ratio_Log': np.tile(odds_ratio_log(neutral, neutral), n_contexts),
+    }
+    proba = predictor.classifier.predict_proba(predictor.encoder.encode_columns(columns))[:, 1]
+    return proba.reshape(n_contexts, n_pairs).astype(np.float32)
+
+
+def model_fingerprint(model_path):
+    """sha256 of an artifact's metadata.json (unique per save) or of a pickle file"""
+    if os.path.isdir(model_path):
+        from ao_predictor.artifact import METADATA_FILE
+        model_path = os.path.join(model_path, METADATA_FILE)
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def symmetrize(matrix):
+    """0.5 * (M[a, b] + 1 - M[b, a]) over the last two axes, p(a beats b) + p(b beats a) = 1"""
+    matrix = np.asarray(matrix)
+    return (0.5 * (matrix + 1.0 - np.swapaxes(matrix, -1, -2))).astype(np.float32)
+
+
+class PairwiseTable:
+    """Win-probability matrix[context, a, b] = p(a beats b) with O(1) name/context lookup"""
+
+    def __init__(self, names, ranks, pts, contexts, matrix, fingerprint=None):
+        self.names = list(names)
+        self.ranks = np.asarray(ranks, dtype=np.float64)
+        self.pts = np.asarray(pts, dtype=np.float64)
+        self.contexts = [tuple(context) for context in contexts]
+        self.matrix = matrix
+        self.fingerprint = fingerprint
+        self.player_index = {name: i for i, name in enumerate(self.names)}
+        self.context_index = {context: i for i, context in enumerate(self.contexts)}
+
+    def lookup(self, player_a, player_b, surface, round_name, best_of):
+        """p(player_a beats player_b), None when a player or the context is not in the table"""
+        a = self.player_index.get(player_a)
+        b = self.player_index.get(player_b)
+        context = self.context_index.get((surface, round_name, int(best_of)))
+        if a is None or b is None or context is None:
+            return None
+        return float(self.matrix[context, a, b])
+
+    def matrix_for(self, surface, round_name, best_of):
+        return self.matrix[self.context_index[(surface, round_name, int(best_of))]]
+
+    def save(self, path):
+        """path.npy holds the matrix, path.json the names, player stats, contexts and model fingerprint"""
+        np.save(f"{path}.npy", self.matrix)
+        with open(f"{path}.json", 'w') as f:
+            json.dump({'names': self.names, 'ranks': self.ranks.tolist(), 'pts': self.pts.tolist(),
+                       'contexts': [list(context) for context in self.contexts],
+                       'fingerprint': self.fingerprint}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(f"{path}.json") as f:
+            index = json.load(f)
+        matrix = np.load(f"{path}.npy", mmap_mode='r' if mmap else None)
+        return cls(index['names'], index['ranks'], index['pts'], index['contexts'], matrix,
+                   index.get('fingerprint'))
+
+
+def build_pairwise_table(predictor, names, ranks, pts, contexts, previous=None, fingerprint=None):
+    """
+    Score every ordered pair of players under every context.
+
+    fingerprint identifies the model (model_fingerprint) and is stored with the
+    table. With a previous table scored by the same model for the same contexts
+    only pairs involving new players or players whose rank/points changed are
+    rescored, the rest is copied over; without a matching fingerprint every pair is.
+    """
+    n_players = len(names)
+    contexts = [tuple(context) for context in contexts]
+    ranks = np.asarray(ranks, dtype=np.float64)
+    pts = np.asarray(pts, dtype=np.float64)
+    matrix = np.full((len(contexts), n_players, n_players), 0.5, dtype=np.float32)
+    changed = np.ones(n_players, dtype=bool)
+
+    reusable = (previous is not None and fingerprint is not None and previous.fingerprint == fingerprint
+                and previous.contexts == contexts)
+    if reusable:
+        old_idx = np.array([previous.player_index.get(name, -1) for name in names])
+        kept = np.flatnonzero(old_idx >= 0)
+        same_stats = ((previous.ranks[old_idx[kept]] == ranks[kept]) &
+                      (previous.pts[old_idx[kept]] == pts[kept]))
+        unchanged = kept[same_stats]
+        changed[unchanged] = False
+        matrix[np.ix_(np.arange(len(contexts)), unchanged, unchanged)] = \
+            previous.matrix[np.ix_(np.arange(len(contexts)), old_idx[unchanged], old_idx[unchanged])]
+
+    player_a, player_b = np.nonzero(changed[:, None] | changed[None, :])
+    off_diagonal = player_a != player_b
+    player_a, player_b = player_a[off_diagonal], player_b[off_diagonal]
+    if len(player_a):
+        matrix[:, player_a, player_b] = score_pairs(predictor, ranks, pts, contexts, player_a, player_b)
+        # Both orientations of every rescored pair were scored, copied cells are symmetric already
+        matrix = symmetrize(matrix)
+    return PairwiseTable(names, ranks, pts, contexts, matrix, fingerprint), len(player_a)
+
+
+def load_predictor(model_path):
+    """Artifact directories load memory-mapped, pickles keep sklearn's forest for bulk scoring"""
+    if os.path.isdir(model_path):
+        from ao_predictor.artifact import load_artifact
+        return load_artifact(model_path)
+
+    import joblib
+
+    from ao_predictor.artifact import model_metadata
+    from ao_predictor.fast_encoding import FastPredictor
+    return FastPredictor.from_pipeline(joblib.load(model_path), metadata=model_metadata(model_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='ao_head_to_head_predictor.pkl', help="pickled pipeline or artifact directory")
+    parser.add_argument('--rankings', required=True, help="scraped rankings CSV (Rank, Player_Name, ...)")
+    parser.add_argument('--csv', default='atp.csv', help="players' points are their latest in this atp.csv")
+    parser.add_argument('--points', help="CSV of Player_Name, Points, takes precedence over --csv")
+    parser.add_argument('--out', required=True, help="output path prefix, writes <out>.npy and <out>.json")
+    parser.add_argument('--surface', default='Hard')
+    parser.add_argument('--best-of', type=int, default=5)
+    parser.add_argument('--full', action='store_true', help="ignore an existing table and rescore every pair "
+                                                            "(implied when it was scored by another model)")
+    args = parser.parse_args()
+
+    predictor = load_predictor(args.model)
+    missing = predictor.encoder.missing_features(MATCHUP_COLUMNS)
+    if missing:
+        parser.error(f"{args.model} needs {', '.join(missing)}; tables hold rank/points models only")
+    fingerprint = model_fingerprint(args.model)
+    points = player_points(args.csv, args.points)
+    names, ranks, pts = load_players(args.rankings, points)
+    if not points:
+        print(f"Warning: no points from {args.csv} or --points, every player is scored with 0 points")
+    contexts = make_contexts(args.surface, best_of=args.best_of)
+
+    previous = None
+    if not args.full and os.path.exists(f"{args.out}.json"):
+        previous = PairwiseTable.load(args.out, mmap=False)
+        if previous.fingerprint != fingerprint:
+            print(f"{args.out} was scored by another model, rescoring every pair")
+
+    start = time.perf_counter()
+    table, n_scored = build_pairwise_table(predictor, names, ranks, pts, contexts, previous, fingerprint)
+    elapsed = time.perf_counter() - start
+    table.save(args.out)
+    print(f"Scored {n_scored:,} pairs x {len(contexts)} contexts for {len(names)} players in {elapsed:.2f}s")
+    print(f"Saved {args.out}.npy ({table.matrix.nbytes / 1024:.0f} KB) and {args.out}.json")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+Per-player feature store: every player's rank/points/Elo history, queryable as of a date.
+
+Observations come from atp.csv (both players of every match, with the Elo going
+into the match) and from scraped rankings CSVs stamped with the date they were
+scraped. They are stored player by player in sorted columnar arrays: offsets
+delimits each player's slice of days/rank/points/elo, so "player X as of D" is
+a name -> id lookup plus one binary search. Gaps (scraped rankings carry no
+points) are filled from the player's previous observation.
+
+Players are keyed by ao_predictor.features.player_key, atp.csv's "Sinner J."
+form: scraped rankings ("Jannik Sinner") and atp.csv rows of the same player
+share one id, and lookup accepts either spelling. player_key takes the first
+word of a full name as the given name, so a player whose surname starts
+earlier ("Tomas Martin Etcheverry") has to be queried as written in atp.csv.
+
+Matches are stored as loaded, before clean_matches imputes them, so only real
+ranks and points are observations. The training fills (a rank worse than any
+stored one, 0 points) are kept alongside and applied by lookup(fill=True).
+
+A snapshot is a directory of .npy arrays plus players.json, written next to its
+final path and swapped in, so a serving process can reload it at any time.
+
+Run from MatchPredicting/:
+    python -m ao_predictor.player_store --csv atp.csv \\
+        --rankings ../DataScraping/ao_atp_rankings_data.csv --rankings-date 2025-01-06 --out atp_players
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from ao_predictor.features import player_key
+
+INDEX_FILE = 'players.json'
+
+# Per-observation columns of the values table, float64 with NaN for unknown
+VALUE_COLUMNS = ['rank', 'points', 'elo']
+
+UNIX_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+# Missing ranks read as this much worse than the worst stored rank, as clean_matches imputes them
+RANK_FILL_MARGIN = 1000
+
+
+def _day_number(date=None):
+    """Days since 1970-01-01 of a date, ISO string or datetime (today when None)"""
+    if date is None:
+        date = datetime.date.today()
+    elif isinstance(date, str):
+        date = datetime.date.fromisoformat(date[:10])
+    return date.toordinal() - UNIX_EPOCH_ORDINAL
+
+
+class PlayerStore:
+    """
+    Sorted per-player time series with as-of lookup.
+
+    Player i owns rows offsets[i]:offsets[i + 1] of days (datetime64[D], sorted)
+    and of values, one column per VALUE_COLUMNS.
+    """
+
+    def __init__(self, names, offsets, days, values, built_at=None, fill_values=None):
+        self.names = list(names)
+        self.player_index = {name: i for i, name in enumerate(self.names)}
+        # Plain ndarray views, memmap indexing costs microseconds per call
+        self.offsets = np.asarray(offsets).view(np.ndarray)
+        self.days = np.asarray(days, dtype='datetime64[D]').view(np.ndarray)
+        self.day_numbers = self.days.view(np.int64)
+        self.values = np.asarray(values).view(np.ndarray)
+        self.built_at = built_at
+        # Column -> value lookup(fill=True) reads for a value never observed
+        self.fill_values = fill_values or {}
+
+    @classmethod
+    def build(cls, df_atp=None, rankings=()):
+        """
+        From matches as loaded (load_atp_csv, not imputed) and (rankings_csv, date) pairs.
+
+        Elo is the pre-match rating from ao_predictor.elo, rankings rows only set rank.
+        Missing ranks and points stay missing, fill_values records what training
+        would impute for them. Names from both sources are stored as their player_key.
+        """
+        frames = []
+        if df_atp is not None and len(df_atp):
+            from ao_predictor.elo import EloRatings
+
+            elo = EloRatings().update(df_atp)
+            for side in ('1', '2'):
+                frames.append(pd.DataFrame({
+                    'name': df_atp[f"Player_{side}"].to_numpy(dtype=object),
+                    'day': df_atp['Tourney Date'].to_numpy(dtype='datetime64[D]'),
+                    'rank': df_atp[f"Rank_{side}"].to_numpy(dtype=np.float64),
+                    'points': df_atp[f"Pts_{side}"].to_numpy(dtype=np.float64),
+                    'elo': elo[f"Elo_{side}"].to_numpy(dtype=np.float64),
+                }))
+        for rankings_csv, date in rankings:
+            scraped = pd.read_csv(rankings_csv)
+            frames.append(pd.DataFrame({
+                'name': scraped['Player_Name'].astype(str).to_numpy(dtype=object),
+                'day': np.full(len(scraped), np.datetime64(date, 'D')),
+                'rank': scraped['Rank'].to_numpy(dtype=np.float64),
+                'points': np.nan,
+                'elo': np.nan,
+            }))
+
+        if not frames:
+            raise ValueError("A player store needs matches or rankings to build from")
+        observations = pd.concat(frames, ignore_index=True)
+        observations = observations[observations['name'].notna()]
+        # One id per player whichever source spelled the name, atp.csv names map to themselves
+        spellings = observations['name'].unique()
+        keys = dict(zip(spellings, map(player_key, spellings)))
+        observations['name'] = observations['name'].map(keys)
+        ids, names = pd.factorize(observations['name'])
+        order = np.lexsort((observations['day'].to_numpy(), ids))
+        ids = ids[order]
+        observations = observations.iloc[order].reset_index(drop=True)
+        # Carry each player's last known value forward over gaps
+        values = observations[VALUE_COLUMNS].groupby(ids).ffill()
+
+        offsets = np.r_[0, np.cumsum(np.bincount(ids, minlength=len(names)))].astype(np.int64)
+        ranks = observations['rank'].dropna()
+        fill_values = {'rank': float(ranks.max()) + RANK_FILL_MARGIN if len(ranks) else None, 'points': 0.0}
+        built_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+        return cls(list(names), offsets, observations['day'].to_numpy(dtype='datetime64[D]'),
+                   values.to_numpy(dtype=np.float64), built_at=built_at, fill_values=fill_values)
+
+    @property
+    def n_observations(self):
+        return len(self.days)
+
+    def _row(self, player, day_number):
+        """Row of player's latest observation on or before day_number, -1 when there is none"""
+        lo, hi = self.offsets[player], self.offsets[player + 1]
+        row = lo + int(self.day_numbers[lo:hi].searchsorted(day_number, side='right')) - 1
+        return row if row >= lo else -1
+
+    def lookup(self, name, date=None, fill=False):
+        """
+        {'rank', 'points', 'elo', 'date'} of a player as of date (default today).
+
+        name is either spelling (atp.csv or a full name, see player_key). None when
+        the player is unknown or has no observation by then; values that were never
+        observed are None, or with fill=True the training fill_values.
+        """
+        player = self.player_index.get(name)
+        if player is None:
+            player = self.player_index.get(player_key(name))
+        if player is None:
+            return None
+        row = self._row(player, _day_number(date))
+        if row < 0:
+            return None
+        # NaN is the only value not equal to itself
+        stats = {column: None if value != value else value
+                 for column, value in zip(VALUE_COLUMNS, self.values[row].tolist())}
+        stats['date'] = str(self.days[row])
+        if fill:
+            for column, value in self.fill_values.items():
+                if stats[column] is None:
+                    stats[column] = value
+        return stats
+
+    def save(self, path):
+        """Write the snapshot directory next to path and swap it in"""
+        path = os.path.normpath(path)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, 'offsets.npy'), self.offsets)
+        np.save(os.path.join(tmp_path, 'days.npy'), self.days)
+        np.save(os.path.join(tmp_path, 'values.npy'), self.values)
+        with open(os.path.join(tmp_path, INDEX_FILE), 'w') as f:
+            json.dump({'names': [str(name) for name in self.names], 'columns': VALUE_COLUMNS,
+                       'built_at': self.built_at, 'fill_values': self.fill_values}, f)
+
+        old_path = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            index = json.load(f)
+        if index['columns'] != VALUE_COLUMNS:
+            raise ValueError(f"Player store {path} has columns {index['columns']}, expected {VALUE_COLUMNS}")
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in ('offsets', 'days', 'values')}
+        return cls(index['names'], arrays['offsets'], arrays['days'], arrays['values'], index.get('built_at'),
+                   index.get('fill_values'))
+
+
+class StoreSnapshot:
+    """
+    The current PlayerStore of a serving process.
+
+    Readers take .store without locking; refresh() loads the new snapshot first and
+    then replaces the reference in one assignment, so in-flight lookups finish on
+    the store they started with. Only concurrent refreshes wait for each other.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._refresh_lock = threading.Lock()
+        self.store = PlayerStore.load(path)
+
+    def refresh(self):
+        with self._refresh_lock:
+            store = PlayerStore.load(self.path)
+            self.store = store
+        return store
+
+
+def main():
+    from ao_predictor.loader import load_atp_csv
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default='atp.csv')
+    parser.add_argument('--rankings', nargs='*', default=[], help="scraped rankings CSVs")
+    parser.add_argument('--rankings-date', help="date the rankings were scraped, default their file date")
+    parser.add_argument('--out', default='atp_players', help="snapshot directory")
+    args = parser.parse_args()
+
+    # Raw matches: imputed ranks/points must not become observations
+    df_atp = load_atp_csv(args.csv, verbose=False)
+    rankings = [(path, args.rankings_date or datetime.date.fromtimestamp(os.path.getmtime(path)).isoformat())
+                for path in args.rankings]
+
+    start = time.perf_counter()
+    store = PlayerStore.build(df_atp, rankings)
+    elapsed = time.perf_counter() - start
+    store.save(args.out)
+    print(f"Stored {store.n_observations:,} observations for {len(store.names):,} players "
+          f"in {elapsed:.2f}s, snapshot saved to {args.out}/")
+
+
+if __name__ == '__main__':
+    main()
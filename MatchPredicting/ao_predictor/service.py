@@ -0,0 +1,261 @@
+"""
+FastAPI prediction service used by the Node backend (backend/node/src/models/predictWinnerModel.ts).
+
+The model is loaded once at startup, either a pickled pipeline or a memory-mapped
+artifact directory (ao_predictor.artifact). Run from MatchPredicting/:
+    uvicorn ao_predictor.service:app --port 8000
+
+Environment:
+    AO_MODEL_PATH   pickled pipeline or artifact directory (default ao_head_to_head_predictor.pkl)
+    AO_SYMMETRIC    1/0 to force or disable scoring both orientations, by default models saved as
+                    trained with --antisymmetric (artifact metadata / pickle sidecar) score both
+    AO_PAIRWISE     comma-separated ao_predictor.pairwise table prefixes, requests without
+                    player stats for players in a table are answered by lookup
+    AO_FLAT_FOREST  set to 0 to keep sklearn's forest of a pickled pipeline, faster for very large batches
+    AO_PLAYER_STORE ao_predictor.player_store snapshot directory, player stats missing from a request
+                    are resolved as of the request's date; POST /admin/reload-players swaps in a
+                    rebuilt snapshot without stopping the service
+    AO_TRUST_CLIENT_STATS  set to 0 to prefer the player store over client stats for players it knows
+    AO_ELO_STATE    EloRatings saved by `train --elo`, required by models trained with --elo
+    AO_FORM_INDEX   FormIndex saved by `train --form`, required by models trained with --form; form
+                    and head-to-head are taken as of the request's date
+
+A model whose inputs these can't provide is rejected at startup.
+"""
+import datetime
+import os
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import joblib
+import numpy as np
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from ao_predictor.artifact import load_artifact, model_metadata
+from ao_predictor.fast_encoding import FastPredictor
+from ao_predictor.features import MATCHUP_COLUMNS, matchup_row, prematch_columns, prematch_differences
+from ao_predictor.pairwise import PairwiseTable
+from ao_predictor.player_store import StoreSnapshot
+
+MODEL_PATH = os.environ.get('AO_MODEL_PATH', 'ao_head_to_head_predictor.pkl')
+# None: as saved with the model
+SYMMETRIC = {'1': True, '0': False}.get(os.environ.get('AO_SYMMETRIC'))
+FLAT_FOREST = os.environ.get('AO_FLAT_FOREST', '1') == '1'
+PAIRWISE_PATHS = [path for path in os.environ.get('AO_PAIRWISE', '').split(',') if path]
+PLAYER_STORE_PATH = os.environ.get('AO_PLAYER_STORE')
+TRUST_CLIENT_STATS = os.environ.get('AO_TRUST_CLIENT_STATS', '1') == '1'
+ELO_STATE = os.environ.get('AO_ELO_STATE')
+FORM_INDEX = os.environ.get('AO_FORM_INDEX')
+
+# Same neutral odd the training data uses for missing odds
+NEUTRAL_ODD = 1.9
+
+
+class PlayerStats(BaseModel):
+    rank: str
+    points: str
+    date: Optional[str] = None
+
+
+class MatchupRequest(BaseModel):
+    player1: str
+    player2: str
+    surface: str
+    round: str
+    best_of: str
+    player1Odds: Optional[str] = None
+    player2Odds: Optional[str] = None
+    player1Stats: Optional[PlayerStats] = None
+    player2Stats: Optional[PlayerStats] = None
+    # As-of date (YYYY-MM-DD) for stats resolved from the player store, default today
+    date: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    matches: List[MatchupRequest]
+
+
+class PredictionResult(BaseModel):
+    winner: str
+    confidence: float
+
+
+class BatchResult(BaseModel):
+    predictions: List[PredictionResult]
+
+
+def _to_float(value, field, default=None):
+    if value is None or str(value).strip() == '':
+        if default is None:
+            raise HTTPException(status_code=422, detail=f"{field} is required")
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"{field} must be numeric, got {value!r}")
+
+
+def _prematch_differences(match, elo_ratings, form_index):
+    date = match.date or datetime.date.today().isoformat()
+    try:
+        return prematch_differences(match.player1, match.player2, match.surface, date, elo_ratings, form_index)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"date must be YYYY-MM-DD, got {match.date!r}")
+
+
+def matchup_rows(matches, elo_ratings=None, form_index=None):
+    """One feature dict per matchup, player1 as P and player2 as OP, with Elo/form from the given indexes"""
+    rows = []
+    for match in matches:
+        row = matchup_row(
+            match.surface,
+            match.round,
+            int(_to_float(match.best_of, 'best_of')),
+            _to_float(match.player1Stats.rank, 'player1Stats.rank'),
+            _to_float(match.player2Stats.rank, 'player2Stats.rank'),
+            _to_float(match.player1Stats.points, 'player1Stats.points'),
+            _to_float(match.player2Stats.points, 'player2Stats.points'),
+            _to_float(match.player1Odds, 'player1Odds', NEUTRAL_ODD),
+            _to_float(match.player2Odds, 'player2Odds', NEUTRAL_ODD),
+        )
+        if elo_ratings is not None or form_index is not None:
+            row.update(_prematch_differences(match, elo_ratings, form_index))
+        rows.append(row)
+    return rows
+
+
+def _lookup_pairwise(tables, match):
+    """Precomputed p(player1 wins) for matchups sent without player stats"""
+    if match.player1Odds or match.player2Odds:
+        raise HTTPException(status_code=422, detail="player1Stats and player2Stats are required when odds are given")
+    for table in tables:
+        p_player1 = table.lookup(match.player1, match.player2, match.surface, match.round,
+                                 int(_to_float(match.best_of, 'best_of')))
+        if p_player1 is not None:
+            return p_player1
+    raise HTTPException(status_code=422, detail="player1Stats and player2Stats are required")
+
+
+def _store_stats(store, name, date):
+    """PlayerStats of a player as of date from the player store, None when it has no rank for them"""
+    try:
+        # Ranks and points never observed read as training imputes them
+        found = store.lookup(name, date, fill=True)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"date must be YYYY-MM-DD, got {date!r}")
+    if found is None or found['rank'] is None:
+        return None
+    return PlayerStats(rank=str(found['rank']), points=str(found['points']), date=found['date'])
+
+
+def resolve_stats(store, match):
+    """
+    The match with both players' stats filled in from the player store where needed.
+
+    Client stats are kept unless AO_TRUST_CLIENT_STATS=0 and the store knows the
+    player. Returns the match unchanged when there is no store.
+    """
+    if store is None:
+        return match
+    update = {}
+    for name, field in ((match.player1, 'player1Stats'), (match.player2, 'player2Stats')):
+        if getattr(match, field) is None or not TRUST_CLIENT_STATS:
+            stats = _store_stats(store, name, match.date)
+            if stats is not None:
+                update[field] = stats
+    return match.model_copy(update=update) if update else match
+
+
+def score_matchups(predictor, matches, tables=(), store=None, elo_ratings=None, form_index=None, symmetric=None):
+    """
+    Probability that player1 wins each matchup.
+
+    Missing player stats are resolved from the player store first. Matchups with
+    stats are scored in one classifier call, with Elo/form differences from the
+    given indexes, the others are looked up in the precomputed pairwise tables.
+    Both orientations are scored when symmetric is set, by default when the
+    predictor was saved as antisymmetric.
+    """
+    if symmetric is None:
+        symmetric = predictor.antisymmetric
+    p_player1 = np.empty(len(matches))
+    scored, scored_matches = [], []
+    for i, match in enumerate(matches):
+        match = resolve_stats(store, match)
+        if match.player1Stats is None or match.player2Stats is None:
+            p_player1[i] = _lookup_pairwise(tables, match)
+        else:
+            scored.append(i)
+            scored_matches.append(match)
+    if scored:
+        rows = matchup_rows(scored_matches, elo_ratings, form_index)
+        p_player1[scored] = predictor.predict_proba_rows(rows, symmetric=symmetric)[:, 1]
+    return p_player1
+
+
+def _result(match, p_player1):
+    if p_player1 >= 0.5:
+        return PredictionResult(winner=match.player1, confidence=float(p_player1))
+    return PredictionResult(winner=match.player2, confidence=float(1.0 - p_player1))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Encoding goes through the precompiled scaler/one-hot tables, not the DataFrame pipeline,
+    # and by default the forest is scored from its flattened node arrays
+    if os.path.isdir(MODEL_PATH):
+        app.state.predictor = load_artifact(MODEL_PATH)
+    else:
+        app.state.predictor = FastPredictor.from_pipeline(joblib.load(MODEL_PATH), flatten=FLAT_FOREST,
+                                                          metadata=model_metadata(MODEL_PATH))
+    app.state.elo = app.state.form = None
+    if ELO_STATE:
+        from ao_predictor.elo import EloRatings
+        app.state.elo = EloRatings.load(ELO_STATE)
+    if FORM_INDEX:
+        from ao_predictor.form import FormIndex
+        app.state.form = FormIndex.load(FORM_INDEX)
+    missing = app.state.predictor.encoder.missing_features(
+        MATCHUP_COLUMNS + prematch_columns(app.state.elo, app.state.form))
+    if missing:
+        raise RuntimeError(f"{MODEL_PATH} needs {', '.join(missing)}, which requests don't carry: "
+                           f"set AO_ELO_STATE / AO_FORM_INDEX to the ratings and form index saved by "
+                           f"`train --elo --form`")
+    app.state.pairwise = [PairwiseTable.load(path) for path in PAIRWISE_PATHS]
+    app.state.players = StoreSnapshot(PLAYER_STORE_PATH) if PLAYER_STORE_PATH else None
+    yield
+
+
+app = FastAPI(title="AO head-to-head predictor", lifespan=lifespan)
+
+
+def _player_store():
+    # One reference per request, a concurrent reload can't switch stores mid-batch
+    return app.state.players.store if app.state.players is not None else None
+
+
+# Plain def endpoints run in the threadpool so scoring never blocks the event loop
+@app.post('/predictmenswinner', response_model=PredictionResult)
+def predict_mens_winner(match: MatchupRequest):
+    p_player1 = score_matchups(app.state.predictor, [match], app.state.pairwise, _player_store(),
+                               app.state.elo, app.state.form, SYMMETRIC)[0]
+    return _result(match, p_player1)
+
+
+@app.post('/predictmenswinner/batch', response_model=BatchResult)
+def predict_mens_winner_batch(batch: BatchRequest):
+    if not batch.matches:
+        return BatchResult(predictions=[])
+    p_player1 = score_matchups(app.state.predictor, batch.matches, app.state.pairwise, _player_store(),
+                               app.state.elo, app.state.form, SYMMETRIC)
+    return BatchResult(predictions=[_result(match, p) for match, p in zip(batch.matches, p_player1)])
+
+
+@app.post('/admin/reload-players')
+def reload_players():
+    """Load the rebuilt player store snapshot, requests keep being served from the old one meanwhile"""
+    if app.state.players is None:
+        raise HTTPException(status_code=404, detail="No player store configured (AO_PLAYER_STORE)")
+    store = app.state.players.refresh()
+    return {'players': len(store.names), 'observations': store.n_observations, 'built_at': store.built_at}
@@ -0,0 +1,224 @@
+"""
+Out-of-core training for match histories larger than RAM.
+
+atp.csv is read in chunks and never held whole; features are built per chunk by
+the same cleaning and build_match_features as the in-memory predictor. Memory is
+bounded by the chunk size, whatever the length of the file:
+
+  1. cleaning statistics: the worst rank of each side over the whole file, so
+     missing ranks are imputed exactly like clean_matches does in memory
+  2. transform state: StandardScaler.partial_fit over the numeric features and
+     the category sets of the categorical ones
+  3. training: every chunk is encoded and fed to a logistic SGDClassifier's
+     partial_fit, once per epoch
+  4. evaluation: matches on or after the split date are held out and scored with
+     streaming accuracy, log-loss and (binned) ROC AUC
+
+The result is a regular Pipeline (ColumnTransformer + SGDClassifier) that loads
+wherever the random forest pickle does; ao_predictor.service keeps the SGD
+classifier as is.
+
+Run from MatchPredicting/:
+    python -m ao_predictor.streaming --csv atp.csv --chunksize 200000 --out ao_streaming_predictor.pkl
+"""
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from ao_predictor.features import build_match_features
+from ao_predictor.loader import iter_atp_chunks
+from ao_predictor.memory import format_peak_rss
+from ao_predictor.training import DEFAULT_SPLIT_DATE, clean_matches, feature_frame, make_preprocessor
+
+DEFAULT_CHUNKSIZE = 200_000
+
+# Probability bins of the streaming ROC AUC, ties within a bin count half
+AUC_BINS = 4096
+
+LOG_LOSS_EPS = 1e-15
+
+
+def cleaning_fill_values(csv_path, chunksize=DEFAULT_CHUNKSIZE):
+    """Rank fills of clean_matches computed over the whole file, reading only the rank columns"""
+    worst = {'Rank_1': np.nan, 'Rank_2': np.nan}
+    for chunk in iter_atp_chunks(csv_path, chunksize, columns=list(worst)):
+        for column in worst:
+            worst[column] = np.fmax(worst[column], chunk[column].max())
+    return {column: value + 1000 for column, value in worst.items()}
+
+
+def feature_chunks(csv_path, fill_values, chunksize=DEFAULT_CHUNKSIZE):
+    """Processed two-perspective feature frames, one per non-empty CSV chunk"""
+    for chunk in iter_atp_chunks(csv_path, chunksize):
+        df_processed = build_match_features(clean_matches(chunk, fill_values))
+        if len(df_processed):
+            yield df_processed
+
+
+def fit_transform_state(chunks):
+    """
+    make_preprocessor's ColumnTransformer fitted from a stream of feature frames.
+
+    Scaler statistics are accumulated with partial_fit and categories as sets; the
+    transformer is then fitted on a small frame holding every category, and its
+    scaler takes the streamed statistics.
+    """
+    scaler = StandardScaler()
+    categories = None
+    prototype = None
+    for df_processed in chunks:
+        X, _ = feature_frame(df_processed)
+        if prototype is None:
+            prototype = X.iloc[:0]
+            numeric_features = X.select_dtypes(include=np.number).columns.tolist()
+            categorical_features = X.select_dtypes(include=['object', 'category']).columns.tolist()
+            categories = {column: set() for column in categorical_features}
+        scaler.partial_fit(X[numeric_features].to_numpy(dtype=np.float64))
+        for column in categorical_features:
+            categories[column].update(X[column].dropna().unique().tolist())
+    if prototype is None:
+        raise ValueError("No usable matches to fit the transform state on")
+
+    # One row per category of the widest column, the others cycle through theirs
+    sorted_categories = {column: sorted(values) for column, values in categories.items()}
+    n_rows = max([len(values) for values in sorted_categories.values()] + [1])
+    frame = {column: np.zeros(n_rows) for column in numeric_features}
+    for column, values in sorted_categories.items():
+        frame[column] = [values[i % len(values)] for i in range(n_rows)] if values else [None] * n_rows
+    frame = pd.DataFrame(frame)[prototype.columns]
+    for column in categorical_features:
+        frame[column] = frame[column].astype(object)
+
+    preprocessor = make_preprocessor(prototype)
+    preprocessor.fit(frame)
+    fitted_scaler = preprocessor.named_transformers_['num']
+    for attribute in ('mean_', 'var_', 'scale_', 'n_samples_seen_'):
+        setattr(fitted_scaler, attribute, getattr(scaler, attribute))
+    return preprocessor
+
+
+class StreamingMetrics:
+    """Accuracy, log-loss and binned ROC AUC accumulated over batches of predictions"""
+
+    def __init__(self, bins=AUC_BINS):
+        self.bins = bins
+        self.n_rows = 0
+        self.n_correct = 0
+        self.log_loss_sum = 0.0
+        self.positives = np.zeros(bins, dtype=np.int64)
+        self.negatives = np.zeros(bins, dtype=np.int64)
+
+    def update(self, y_true, p_win):
+        y_true = np.asarray(y_true, dtype=bool)
+        p_win = np.asarray(p_win, dtype=np.float64)
+        clipped = np.clip(p_win, LOG_LOSS_EPS, 1 - LOG_LOSS_EPS)
+        self.n_rows += len(y_true)
+        self.n_correct += int(((p_win > 0.5) == y_true).sum())
+        self.log_loss_sum -= float(np.where(y_true, np.log(clipped), np.log1p(-clipped)).sum())
+        bins = np.minimum((p_win * self.bins).astype(np.int64), self.bins - 1)
+        self.positives += np.bincount(bins[y_true], minlength=self.bins)
+        self.negatives += np.bincount(bins[~y_true], minlength=self.bins)
+
+    def roc_auc(self):
+        n_positives, n_negatives = self.positives.sum(), self.negatives.sum()
+        if n_positives == 0 or n_negatives == 0:
+            return float('nan')
+        negatives_below = np.cumsum(self.negatives) - self.negatives
+        pairs = (self.positives * (negatives_below + 0.5 * self.negatives)).sum()
+        return float(pairs / (n_positives * n_negatives))
+
+    def result(self):
+        if not self.n_rows:
+            return {'test_rows': 0, 'accuracy': float('nan'), 'roc_auc': float('nan'), 'log_loss': float('nan')}
+        return {
+            'test_rows': self.n_rows,
+            'accuracy': self.n_correct / self.n_rows,
+            'roc_auc': self.roc_auc(),
+            'log_loss': self.log_loss_sum / self.n_rows,
+        }
+
+
+def train_streaming(csv_path='atp.csv', chunksize=DEFAULT_CHUNKSIZE, split_date=DEFAULT_SPLIT_DATE,
+                    epochs=1, seed=42, verbose=True):
+    """
+    Fit the streaming Pipeline on matches before split_date and score the rest.
+
+    Returns (model, metrics); metrics holds the held-out scores plus train_rows.
+    """
+    split_date = pd.to_datetime(split_date)
+    rng = np.random.default_rng(seed)
+
+    def log(message, start):
+        if verbose:
+            print(f"{message} in {time.perf_counter() - start:.1f}s (peak RSS {format_peak_rss()})")
+
+    start = time.perf_counter()
+    fill_values = cleaning_fill_values(csv_path, chunksize)
+    log("Pass 1: cleaning statistics", start)
+
+    def training_chunks():
+        for df_processed in feature_chunks(csv_path, fill_values, chunksize):
+            yield df_processed[df_processed['Tourney Date'] < split_date]
+
+    start = time.perf_counter()
+    preprocessor = fit_transform_state(chunk for chunk in training_chunks() if len(chunk))
+    log("Pass 2: transform state", start)
+
+    classifier = SGDClassifier(loss='log_loss', average=True, random_state=seed)
+    train_rows = 0
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        train_rows = 0
+        for df_processed in training_chunks():
+            if not len(df_processed):
+                continue
+            X, y = feature_frame(df_processed)
+            # Chunks are chronological, shuffle within each one so SGD steps see mixed eras
+            order = rng.permutation(len(X))
+            classifier.partial_fit(preprocessor.transform(X)[order], y.to_numpy()[order], classes=[0, 1])
+            train_rows += len(X)
+        log(f"Pass {3 + epoch}: training epoch {epoch + 1}/{epochs} on {train_rows:,} rows", start)
+    if not train_rows:
+        raise ValueError(f"No matches before {split_date.date()} to train on")
+
+    start = time.perf_counter()
+    metrics = StreamingMetrics()
+    for df_processed in feature_chunks(csv_path, fill_values, chunksize):
+        df_test = df_processed[df_processed['Tourney Date'] >= split_date]
+        if len(df_test):
+            X, y = feature_frame(df_test)
+            metrics.update(y.to_numpy(), classifier.predict_proba(preprocessor.transform(X))[:, 1])
+    log("Last pass: evaluation", start)
+
+    model = Pipeline(steps=[('preprocessor', preprocessor), ('classifier', classifier)])
+    return model, dict(metrics.result(), train_rows=train_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default='atp.csv')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="matches read per chunk")
+    parser.add_argument('--split-date', default=DEFAULT_SPLIT_DATE)
+    parser.add_argument('--epochs', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='ao_streaming_predictor.pkl')
+    args = parser.parse_args()
+
+    model, metrics = train_streaming(args.csv, args.chunksize, args.split_date, args.epochs, args.seed)
+    print(f"\nTrained on {metrics['train_rows']:,} rows, tested on {metrics['test_rows']:,}")
+    print(f"Accuracy: {metrics['accuracy']:.4f}")
+    print(f"ROC AUC:  {metrics['roc_auc']:.4f}")
+    print(f"Log-loss: {metrics['log_loss']:.4f}")
+    print(f"Peak RSS: {format_peak_rss()}")
+    joblib.dump(model, args.out)
+    print(f"Model saved as {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from ao_predictor.features import ALL_DIFFERENCE_COLUMNS, OPTIONAL_DIFFERENCE_COLUMNS, same_player, odds_ratio_log
+
+
+def canonical_flip(n_matches, seed=42):
+    """True where build_canonical_features takes Player_2 as P"""
+    return np.random.default_rng(seed).random(n_matches) < 0.5
+
+
+def build_canonical_features(df_atp, seed=42):
+    """
+    One row per match for antisymmetric training (half the rows of build_match_features).
+
+    Each match is seen from a single perspective. Whether P is Player_1 or Player_2
+    is a fixed pseudo-random choice, so the model sees both signs of every
+    difference feature and Player_1 ordering biases in the source can't leak in.
+    """
+    flip = canonical_flip(len(df_atp), seed)
+
+    def oriented(column_1, column_2):
+        values_1 = df_atp[column_1].to_numpy(dtype=np.float64)
+        values_2 = df_atp[column_2].to_numpy(dtype=np.float64)
+        return np.where(flip, values_2, values_1), np.where(flip, values_1, values_2)
+
+    p_rank, op_rank = oriented('Rank_1', 'Rank_2')
+    p_pts, op_pts = oriented('Pts_1', 'Pts_2')
+    p_odd, op_odd = oriented('Odd_1', 'Odd_2')
+    player_1_won = same_player(df_atp['Winner'], df_atp['Player_1'])
+    player_2_won = same_player(df_atp['Winner'], df_atp['Player_2'])
+
+    df_canonical = pd.DataFrame({
+        'Surface': df_atp['Surface'].array,
+        'Round': df_atp['Round'].array,
+        'Best of': df_atp['Best of'].array,
+        'Tourney Date': df_atp['Tourney Date'].array,
+        'Winner_Is_P': np.where(flip, player_2_won, player_1_won).astype(np.int64),
+        'Rank_Diff': p_rank - op_rank,
+        'Pts_Diff': p_pts - op_pts,
+        'Odd_Ratio_Log': odds_ratio_log(p_odd, op_odd),
+    })
+    for diff_column, source_1, source_2 in OPTIONAL_DIFFERENCE_COLUMNS:
+        if source_1 in df_atp.columns:
+            p_values, op_values = oriented(source_1, source_2)
+            df_canonical[diff_column] = p_values - op_values
+    return df_canonical
+
+
+def flip_perspective(X):
+    """Same matches seen from the other player, every difference feature changes sign"""
+    flipped = X.copy()
+    for column in ALL_DIFFERENCE_COLUMNS:
+        if column in flipped.columns:
+            flipped[column] = -flipped[column]
+    return flipped
+
+
+def predict_proba_symmetric(model, X):
+    """
+    predict_proba that guarantees p(A beats B) + p(B beats A) = 1.
+
+    Both orientations are scored in one batched call and averaged, so calling this
+    with the flipped frame returns exactly the complementary probabilities.
+    """
+    n_rows = len(X)
+    proba = model.predict_proba(pd.concat([X, flip_perspective(X)], ignore_index=True))[:, 1]
+    p_wins = 0.5 * (proba[:n_rows] + 1.0 - proba[n_rows:])
+    return np.column_stack([1.0 - p_wins, p_wins])
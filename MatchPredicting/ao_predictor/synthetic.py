@@ -0,0 +1,135 @@
+"""
+Synthetic match histories with the atp.csv columns, for benchmarks and scaling tests.
+
+Players have a latent skill that drives their ranks, ranking points, bookmaker
+odds and results, and a few percent of ranks, points and odds are missing or -1
+like in the scraped data. Large files are generated and written in blocks of
+one shared player pool, in chronological order, so memory stays flat whatever
+the size.
+
+Run from MatchPredicting/:
+    python -m ao_predictor.synthetic --matches 1000000 --out atp.csv [--players 2000] [--seed 42]
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+SURFACES = ['Hard', 'Clay', 'Grass', 'Carpet']
+SURFACE_WEIGHTS = [0.55, 0.3, 0.12, 0.03]
+
+ROUNDS = ['1st Round', '2nd Round', '3rd Round', '4th Round',
+          'Quarterfinals', 'Semifinals', 'The Final', 'Round Robin']
+ROUND_WEIGHTS = [0.42, 0.24, 0.12, 0.06, 0.08, 0.04, 0.02, 0.02]
+
+# Matches generated and written at a time by write_atp_csv
+WRITE_BLOCK = 1_000_000
+
+
+def make_matches(n_matches, n_players=2000, seed=42, start_year=2000, end_year=2025):
+    """Build a synthetic match history shaped like atp.csv"""
+    return next(iter_match_blocks(n_matches, n_players, seed, start_year, end_year, block_matches=n_matches))
+
+
+def iter_match_blocks(n_matches, n_players=2000, seed=42, start_year=2000, end_year=2025,
+                      block_matches=WRITE_BLOCK):
+    """
+    make_matches in consecutive blocks of at most block_matches matches.
+
+    All blocks share one player pool and each covers the next slice of the date
+    range, so concatenated they are one chronological history.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Latent skill drives ranks, points, odds and the match outcome
+    skill = rng.normal(0, 1, n_players)
+    player_names = np.array([f"Player {i:05d}" for i in range(n_players)], dtype=object)
+    players = pd.CategoricalDtype(player_names)
+    skill_rank = np.empty(n_players)
+    skill_rank[np.argsort(-skill)] = np.arange(1, n_players + 1)
+
+    n_days = (end_year - start_year + 1) * 365
+    for start in range(0, max(n_matches, 1), max(block_matches, 1)):
+        n_block = min(block_matches, n_matches - start)
+        days = (n_days * start // n_matches, n_days * (start + n_block) // n_matches) if n_matches else (0, n_days)
+        yield _match_block(rng, n_block, skill, skill_rank, players, start_year, days)
+
+
+def _match_block(rng, n_matches, skill, skill_rank, players, start_year, days):
+    n_players = len(skill)
+    p1 = rng.integers(0, n_players, n_matches)
+    # Offset guarantees the opponent is a different player
+    p2 = (p1 + rng.integers(1, n_players, n_matches)) % n_players
+
+    rank_1 = np.maximum(1, skill_rank[p1] + rng.normal(0, 15, n_matches)).round()
+    rank_2 = np.maximum(1, skill_rank[p2] + rng.normal(0, 15, n_matches)).round()
+    pts_1 = (12000 / rank_1 ** 0.8).round()
+    pts_2 = (12000 / rank_2 ** 0.8).round()
+
+    diff = skill[p1] - skill[p2]
+    p1_wins = rng.random(n_matches) < 1 / (1 + np.exp(-1.2 * diff))
+
+    # Bookmaker odds with a ~5% margin around the true probability
+    prob_1 = 1 / (1 + np.exp(-diff))
+    odd_1 = (1 / (prob_1 * 1.05)).round(2)
+    odd_2 = (1 / ((1 - prob_1) * 1.05)).round(2)
+
+    # Missing values the predictor has to clean up
+    for column in (rank_1, rank_2, pts_1, pts_2):
+        column[rng.random(n_matches) < 0.01] = np.nan
+    for column in (odd_1, odd_2):
+        column[rng.random(n_matches) < 0.02] = np.nan
+        column[rng.random(n_matches) < 0.005] = -1
+
+    day_offsets = rng.integers(days[0], max(days[1], days[0] + 1), n_matches)
+    dates = pd.Timestamp(f"{start_year}-01-01") + pd.to_timedelta(np.sort(day_offsets), unit='D')
+    tour_name_date = dates.year * 10000 + dates.month * 100 + dates.day
+
+    surface = rng.choice(SURFACES, n_matches, p=SURFACE_WEIGHTS)
+    round_name = rng.choice(ROUNDS, n_matches, p=ROUND_WEIGHTS)
+    best_of = np.where(rng.random(n_matches) < 0.1, 5, 3)
+
+    return pd.DataFrame({
+        'Tour Name Date': tour_name_date,
+        'Surface': surface,
+        'Round': round_name,
+        'Best of': best_of,
+        'Player_1': pd.Categorical.from_codes(p1, dtype=players),
+        'Player_2': pd.Categorical.from_codes(p2, dtype=players),
+        'Winner': pd.Categorical.from_codes(np.where(p1_wins, p1, p2), dtype=players),
+        'Rank_1': rank_1,
+        'Rank_2': rank_2,
+        'Pts_1': pts_1,
+        'Pts_2': pts_2,
+        'Odd_1': odd_1,
+        'Odd_2': odd_2,
+    })
+
+
+def write_atp_csv(csv_path, n_matches, n_players=2000, seed=42, start_year=2000, end_year=2025,
+                  block_matches=WRITE_BLOCK):
+    """Write n_matches synthetic matches to csv_path block by block, returns the file size in bytes"""
+    from ao_predictor.loader import ATP_DTYPES
+
+    for i, block in enumerate(iter_match_blocks(n_matches, n_players, seed, start_year, end_year, block_matches)):
+        block[list(ATP_DTYPES)].to_csv(csv_path, mode='a' if i else 'w', header=not i, index=False)
+    return os.path.getsize(csv_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, default=100_000)
+    parser.add_argument('--out', default='atp.csv')
+    parser.add_argument('--players', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start-year', type=int, default=2000)
+    parser.add_argument('--end-year', type=int, default=2025)
+    args = parser.parse_args(argv)
+
+    size = write_atp_csv(args.out, args.matches, args.players, args.seed, args.start_year, args.end_year)
+    print(f"Wrote {args.matches:,} synthetic matches to '{args.out}' ({size / 1024 ** 2:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
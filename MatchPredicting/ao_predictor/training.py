@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from ao_predictor.features import RAW_PERSPECTIVE_COLUMNS
+
+TARGET_COLUMN = 'Winner_Is_P'
+
+# Kept in the processed frame for splitting/inspection but never fed to the model
+NON_FEATURE_COLUMNS = [TARGET_COLUMN, 'Tourney Date'] + RAW_PERSPECTIVE_COLUMNS
+
+DEFAULT_SPLIT_DATE = '2024-01-01'
+
+
+def clean_matches(df_atp, fill_values=None):
+    """
+    Impute missing ranks/points/odds and drop unusable matches.
+
+    Missing ranks get a value worse than any real rank, missing points 0 and
+    missing odds a neutral 1.9. Matches without a winner or with -1 odds are dropped.
+    fill_values overrides imputed values, e.g. rank fills computed over a whole
+    file when cleaning it chunk by chunk.
+    """
+    fills = {
+        'Rank_1': df_atp['Rank_1'].max() + 1000,
+        'Rank_2': df_atp['Rank_2'].max() + 1000,
+        'Pts_1': 0,
+        'Pts_2': 0,
+        'Odd_1': 1.9,
+        'Odd_2': 1.9,
+    }
+    df_atp = df_atp.fillna({**fills, **(fill_values or {})})
+    df_atp = df_atp.dropna(subset=['Winner'])
+    return df_atp[(df_atp['Odd_1'] != -1) & (df_atp['Odd_2'] != -1)]
+
+
+def feature_frame(df_processed):
+    """Split a processed frame into model inputs X and the Winner_Is_P target y"""
+    X = df_processed.drop(columns=[c for c in NON_FEATURE_COLUMNS if c in df_processed.columns])
+    return X, df_processed[TARGET_COLUMN]
+
+
+def make_preprocessor(X):
+    """Scale numeric features, one-hot encode categoricals (unknown categories are ignored)"""
+    numerical_features = X.select_dtypes(include=np.number).columns.tolist()
+    categorical_features = X.select_dtypes(include=['object', 'category']).columns.tolist()
+    return ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), numerical_features),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
+        ])
+
+
+def chronological_split(df_processed, split_date=DEFAULT_SPLIT_DATE):
+    """
+    Train on matches before split_date and test on the rest.
+
+    Falls back to an 80/20 split of the date-sorted rows when nothing is left for
+    testing. Returns (X_train, X_test, y_train, y_test, used_fallback).
+    """
+    split_date = pd.to_datetime(split_date)
+    df_sorted = df_processed.sort_values(by='Tourney Date', kind='stable').reset_index(drop=True)
+    X_sorted, y_sorted = feature_frame(df_sorted)
+
+    is_train = (df_sorted['Tourney Date'] < split_date).to_numpy()
+    if is_train.all():
+        split_idx = int(len(X_sorted) * 0.8)
+        return (X_sorted.iloc[:split_idx], X_sorted.iloc[split_idx:],
+                y_sorted.iloc[:split_idx], y_sorted.iloc[split_idx:], True)
+    return X_sorted[is_train], X_sorted[~is_train], y_sorted[is_train], y_sorted[~is_train], False
@@ -0,0 +1,313 @@
+"""
+Hyperparameter search: time-ordered cross-validation with successive halving in a process pool.
+
+The date-sorted feature matrix of ao_predictor.backtest is built once and saved as
+.npy files; every worker opens it memory-mapped, so folds slice it instead of
+receiving pickled copies. Folds are expanding windows: fold i trains on every row
+before its validation block, blocks split the later part of the history evenly
+and never cut through a date. Folds only cover matches before the split date:
+the window from it on (the test set of `train`) plays no part in the selection
+and scores the chosen configuration once, trained on everything before it.
+
+Successive halving gives every sampled configuration a small budget (the most
+recent fraction of each fold's training rows), keeps the best 1/eta by mean
+validation log-loss and repeats with eta times the budget until the last rung
+trains on full prefixes. Cores are split between the pool and each model: by
+default one worker per core and cores // workers threads per model, and the
+BLAS/OpenMP pools of the workers are capped to the same n_jobs threads.
+
+Every (trial, rung) lands in a results table with its parameters, scores and
+timings, saved as CSV and reloaded with load_results().
+
+Run from MatchPredicting/:
+    python -m ao_predictor.tuning --csv atp.csv --trials 27 --folds 4 --workers 4 --out tuning.csv \
+        [--split-date 2024-01-01]
+"""
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from ao_predictor.backtest import BacktestMatrix, score_window, window_metrics
+
+# Candidate values per backend, trials are drawn from their product
+SEARCH_SPACES = {
+    'random_forest': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [None, 8, 12, 16, 24],
+        'min_samples_leaf': [1, 5, 20, 50],
+        'max_features': ['sqrt', 0.5, None],
+    },
+    'hist_gradient_boosting': {
+        'learning_rate': [0.03, 0.1, 0.3],
+        'max_leaf_nodes': [15, 31, 63],
+        'min_samples_leaf': [20, 100, 500],
+        'l2_regularization': [0.0, 1.0, 10.0],
+    },
+    'logistic_regression': {
+        'C': [0.001, 0.01, 0.1, 1.0, 10.0, 100.0],
+    },
+}
+
+DEFAULT_ETA = 3
+
+# Share of the history before the first validation block
+DEFAULT_INITIAL_FRACTION = 0.5
+
+# Environment variables sizing BLAS/OpenMP thread pools in the workers
+THREAD_LIMIT_VARIABLES = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+def sample_configs(space, n_trials, seed=42):
+    """n_trials distinct parameter dicts drawn from the product of space, all of them when it is smaller"""
+    names = list(space)
+    sizes = [len(space[name]) for name in names]
+    n_total = math.prod(sizes)
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(n_total, size=min(n_trials, n_total), replace=False)
+    configs = []
+    for pick in sorted(picks.tolist()):
+        indices = np.unravel_index(pick, sizes)
+        configs.append({name: space[name][i] for name, i in zip(names, indices)})
+    return configs
+
+
+def holdout_start(matrix, split_date):
+    """First row of the date-sorted matrix on or after split_date"""
+    return int(np.searchsorted(matrix.date, np.datetime64(pd.Timestamp(split_date).date(), 'D'), side='left'))
+
+
+def time_series_folds(matrix, n_folds=4, initial_fraction=DEFAULT_INITIAL_FRACTION, end=None):
+    """
+    [(label, start_row, stop_row)] validation blocks over rows [0, end); fold i trains on rows [0, start).
+
+    end defaults to every row, pass holdout_start() to keep the test window out.
+    """
+    n_rows = matrix.n_rows if end is None else end
+    targets = np.linspace(initial_fraction * n_rows, n_rows, n_folds + 1).astype(np.int64)
+    # Move each boundary back to the first row of its date, so one day is never split
+    boundaries = [int(np.searchsorted(matrix.date, matrix.date[min(target, n_rows - 1)], side='left'))
+                  for target in targets[:-1]] + [n_rows]
+    return [(f"fold {i + 1}", start, stop) for i, (start, stop) in enumerate(zip(boundaries[:-1], boundaries[1:]))
+            if start < stop and start > 0]
+
+
+def split_cores(n_tasks, n_workers=None, n_cores=None):
+    """
+    (workers, n_jobs per model): one worker per core by default, and as many threads
+    per model as the cores left per worker, so workers * n_jobs stays within n_cores
+    """
+    n_cores = n_cores or os.cpu_count() or 1
+    n_workers = min(n_workers or n_cores, max(n_tasks, 1))
+    return n_workers, max(1, n_cores // n_workers)
+
+
+@contextmanager
+def _thread_limits(n_threads):
+    """Cap the native thread pools of processes started inside the block"""
+    saved = {name: os.environ.get(name) for name in THREAD_LIMIT_VARIABLES}
+    os.environ.update({name: str(n_threads) for name in THREAD_LIMIT_VARIABLES})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def run_trial_fold(matrix, backend, params, start, stop, fraction=1.0, n_jobs=1, seed=42):
+    """Fit on the most recent `fraction` of rows [0, start), score rows [start, stop)"""
+    from ao_predictor.models import make_model
+
+    fit_start = time.perf_counter()
+    train_start = start - max(1, int(start * fraction))
+    X_train = matrix.frame(train_start, start)
+    model = make_model(backend, X_train, seed=seed, n_jobs=n_jobs)
+    model.set_params(**{f"classifier__{name}": value for name, value in params.items()})
+    model.fit(X_train, np.asarray(matrix.target[train_start:start]))
+    fit_seconds = time.perf_counter() - fit_start
+
+    p_match, matches = score_window(matrix, model, start, stop)
+    metrics = window_metrics(p_match, matrix.player_1_won[matches], matrix.odd_1[matches],
+                             matrix.odd_2[matches], matrix.has_odds[matches])
+    return {'train_rows': start - train_start, 'fit_seconds': fit_seconds,
+            'seconds': time.perf_counter() - fit_start, **metrics}
+
+
+_worker_matrix = None
+
+
+def _init_worker(path):
+    global _worker_matrix
+    _worker_matrix = BacktestMatrix.load(path)
+
+
+def _trial_fold_worker(args):
+    return run_trial_fold(_worker_matrix, *args)
+
+
+def successive_halving(matrix_path, backend, configs, folds, eta=DEFAULT_ETA, n_rungs=None, n_workers=None,
+                       n_jobs=None, seed=42, verbose=True):
+    """
+    Run the search and return the results table, one row per (trial, rung).
+
+    n_rungs defaults to as many as needed to narrow the configs down to about one;
+    the first rung trains on 1/eta**(n_rungs - 1) of every training prefix.
+    """
+    if n_rungs is None:
+        n_rungs = max(1, int(math.ceil(math.log(max(len(configs), 1), eta))))
+    workers, jobs = split_cores(len(configs) * len(folds), n_workers)
+    n_jobs = n_jobs or jobs
+
+    rows = []
+    alive = list(range(len(configs)))
+    with _thread_limits(n_jobs):
+        pool = None
+        if workers > 1:
+            # spawn: forked children would inherit a parent mid-way through BLAS/loky thread pools
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                                       initializer=_init_worker, initargs=(matrix_path,))
+        else:
+            matrix = BacktestMatrix.load(matrix_path)
+        try:
+            for rung in range(n_rungs):
+                fraction = float(eta) ** (rung - n_rungs + 1)
+                # Longest training prefix first, so the slowest fits don't start last
+                tasks = sorted(((trial, label, (backend, configs[trial], start, stop, fraction, n_jobs, seed))
+                                for trial in alive for label, start, stop in folds), key=lambda task: -task[2][2])
+                rung_start = time.perf_counter()
+                if pool is not None:
+                    results = list(pool.map(_trial_fold_worker, [task for _, _, task in tasks]))
+                else:
+                    results = [run_trial_fold(matrix, *task) for _, _, task in tasks]
+
+                by_trial = {}
+                for (trial, label, _), result in zip(tasks, results):
+                    by_trial.setdefault(trial, []).append(result)
+                rung_rows = []
+                for trial, fold_results in by_trial.items():
+                    fold_table = pd.DataFrame(fold_results)
+                    rung_rows.append({
+                        'trial': trial, 'rung': rung, 'fraction': fraction,
+                        'params': json.dumps(configs[trial]), **configs[trial],
+                        'folds': len(fold_results),
+                        'train_rows': int(fold_table['train_rows'].mean()),
+                        'log_loss': fold_table['log_loss'].mean(),
+                        'log_loss_std': fold_table['log_loss'].std(ddof=0),
+                        'roc_auc': fold_table['roc_auc'].mean(),
+                        'accuracy': fold_table['accuracy'].mean(),
+                        'roi': fold_table['roi'].mean(),
+                        'fit_seconds': fold_table['fit_seconds'].sum(),
+                        'seconds': fold_table['seconds'].sum(),
+                    })
+                rung_rows.sort(key=lambda row: row['log_loss'])
+                rows.extend(rung_rows)
+                if verbose:
+                    print(f"rung {rung}: {len(alive)} configs x {len(folds)} folds on {fraction:.0%} of each "
+                          f"training prefix in {time.perf_counter() - rung_start:.1f}s "
+                          f"({workers} workers x {n_jobs} threads), best log-loss {rung_rows[0]['log_loss']:.4f}")
+                alive = [row['trial'] for row in rung_rows[:max(1, int(math.ceil(len(rung_rows) / eta)))]]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    results = pd.DataFrame(rows)
+    results.insert(0, 'backend', backend)
+    return results
+
+
+def save_results(results, path):
+    results.to_csv(path, index=False)
+
+
+def load_results(path):
+    """Results table saved by save_results, with the 'params' column parsed back into dicts"""
+    results = pd.read_csv(path)
+    results['params'] = results['params'].map(json.loads)
+    return results
+
+
+def best_config(results):
+    """Parameters of the lowest log-loss configuration on the last rung"""
+    last_rung = results[results['rung'] == results['rung'].max()]
+    params = last_rung.sort_values('log_loss', kind='stable').iloc[0]['params']
+    return json.loads(params) if isinstance(params, str) else params
+
+
+def main():
+    from ao_predictor.backtest import prepare_matches
+    from ao_predictor.loader import load_atp_csv
+    from ao_predictor.memory import format_peak_rss
+    from ao_predictor.training import DEFAULT_SPLIT_DATE
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default='atp.csv')
+    parser.add_argument('--backend', choices=sorted(SEARCH_SPACES), default='random_forest')
+    parser.add_argument('--trials', type=int, default=27, help="configurations sampled from the search space")
+    parser.add_argument('--folds', type=int, default=4)
+    parser.add_argument('--eta', type=int, default=DEFAULT_ETA, help="keep 1/eta of the configs per rung")
+    parser.add_argument('--rungs', type=int, help="default enough to narrow the trials down to one")
+    parser.add_argument('--workers', type=int, help="search processes, default one per core")
+    parser.add_argument('--n-jobs', type=int, help="threads per model, default cores // workers")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--antisymmetric', action='store_true', help="one canonical row per match")
+    parser.add_argument('--split-date', default=DEFAULT_SPLIT_DATE,
+                        help="folds use matches before it, the best configuration is scored once on the rest")
+    parser.add_argument('--out', default='tuning.csv')
+    args = parser.parse_args()
+
+    df_atp = prepare_matches(load_atp_csv(args.csv, verbose=False))
+    configs = sample_configs(SEARCH_SPACES[args.backend], args.trials, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix='ao-tuning-') as matrix_path:
+        start = time.perf_counter()
+        matrix = BacktestMatrix.build(df_atp, antisymmetric=args.antisymmetric, seed=args.seed)
+        matrix.save(matrix_path)
+        test_start = holdout_start(matrix, args.split_date)
+        folds = time_series_folds(matrix, args.folds, end=test_start)
+        if not folds:
+            raise SystemExit(f"No matches before {args.split_date} to cross-validate on")
+        print(f"Feature matrix: {matrix.n_rows:,} rows built once in {time.perf_counter() - start:.2f}s, "
+              f"{len(folds)} folds over the {test_start:,} rows before {args.split_date}, "
+              f"{len(configs)} configurations")
+        del df_atp
+
+        start = time.perf_counter()
+        results = successive_halving(matrix_path, args.backend, configs, folds, args.eta, args.rungs,
+                                     args.workers, args.n_jobs, args.seed)
+        elapsed = time.perf_counter() - start
+
+        # The held-out window is scored once, with the configuration chosen without it
+        holdout = None
+        if test_start < matrix.n_rows:
+            holdout = run_trial_fold(matrix, args.backend, best_config(results), test_start, matrix.n_rows,
+                                     n_jobs=args.n_jobs or -1, seed=args.seed)
+        del matrix
+
+    save_results(results, args.out)
+    last_rung = results[results['rung'] == results['rung'].max()]
+    columns = ['trial', *SEARCH_SPACES[args.backend], 'train_rows', 'log_loss', 'roc_auc', 'accuracy', 'seconds']
+    print("\n" + last_rung[columns].to_string(index=False, float_format='{:.4f}'.format))
+    print(f"\nBest {args.backend}: {best_config(results)}")
+    if holdout is None:
+        print(f"No matches from {args.split_date} on, the best configuration was not scored on held-out data")
+    else:
+        print(f"Held out from {args.split_date}: log-loss {holdout['log_loss']:.4f}, "
+              f"ROC AUC {holdout['roc_auc']:.4f}, accuracy {holdout['accuracy']:.4f} "
+              f"({holdout['train_rows']:,} training rows)")
+    print(f"Search finished in {elapsed:.1f}s ({results['seconds'].sum():.1f}s of fold work), "
+          f"peak RSS {format_peak_rss()}; results saved to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Cold start and per-worker memory: joblib pickle vs memory-mapped artifact.
+
+N worker processes load the model at the same time, score a batch, and report
+their load time and memory while all of them are still alive. RSS counts shared
+pages in every worker. PSS splits them between the workers that share them,
+which is where the memory-mapped artifact pays off (Linux only, read from
+/proc/self/smaps_rollup).
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_artifact --model ao_head_to_head_predictor.pkl --workers 1 4 16
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from ao_predictor.artifact import save_artifact
+from benchmarks.common import train_synthetic_model
+
+
+def _memory_mb():
+    """(RSS, PSS) of this process in MB, None for values the platform doesn't expose"""
+    values = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in ('Rss', 'Pss'):
+                    values[key] = int(rest.split()[0]) / 1024
+    except OSError:
+        pass
+    return values.get('Rss'), values.get('Pss')
+
+
+def _worker(kind, path, n_features, barrier, results):
+    start = time.perf_counter()
+    if kind == 'joblib':
+        from ao_predictor.fast_encoding import FastPredictor
+        classifier = FastPredictor.from_pipeline(joblib.load(path), flatten=True).classifier
+    else:
+        from ao_predictor.artifact import load_artifact
+        classifier = load_artifact(path).classifier
+    # Score a batch so the pages a real request touches are resident
+    X = np.random.default_rng(os.getpid()).normal(0, 1.5, (2048, n_features))
+    classifier.predict_proba(X)
+    elapsed = time.perf_counter() - start
+
+    # Measure only once every worker holds its model
+    barrier.wait()
+    rss, pss = _memory_mb()
+    results.put((elapsed, rss, pss))
+    barrier.wait()
+
+
+def _run(kind, path, n_features, n_workers):
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(n_workers)
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_worker, args=(kind, path, n_features, barrier, results)) for _ in range(n_workers)]
+    for worker in workers:
+        worker.start()
+    measurements = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return measurements
+
+
+def _mean(values):
+    values = [value for value in values if value is not None]
+    return f"{np.mean(values):.1f}" if values else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help="pickled pipeline, a synthetic one is trained when omitted")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = args.model
+        if model_path is None:
+            model_path = os.path.join(tmp_dir, 'model.pkl')
+            joblib.dump(train_synthetic_model()[0], model_path)
+        model = joblib.load(model_path)
+        n_features = model.named_steps['classifier'].n_features_in_
+        artifact_path = os.path.join(tmp_dir, 'artifact')
+        save_artifact(model, artifact_path)
+        del model
+
+        print(f"{'format':<10}{'workers':>8}{'cold start (s)':>16}{'RSS/worker (MB)':>17}{'PSS/worker (MB)':>17}")
+        for n_workers in args.workers:
+            for kind, path in (('joblib', model_path), ('artifact', artifact_path)):
+                measurements = _run(kind, path, n_features, n_workers)
+                elapsed, rss, pss = zip(*measurements)
+                print(f"{kind:<10}{n_workers:>8}{np.mean(elapsed):>16.2f}{_mean(rss):>17}{_mean(pss):>17}")
+
+
+if __name__ == '__main__':
+    main()
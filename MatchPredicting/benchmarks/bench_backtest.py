@@ -0,0 +1,56 @@
+"""
+Walk-forward scaling: the same season folds on 1..N worker processes.
+
+Builds a 30-season synthetic dataset, writes the shared feature matrix once and
+times ao_predictor.backtest.walk_forward for each worker count. Every fold fits
+single-threaded so the speedup comes from the process pool alone, and the
+pooled metrics are checked to be identical across worker counts.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_backtest --matches 150000 --trees 50 --workers 1 2 4 8
+"""
+import argparse
+import tempfile
+import time
+
+import pandas as pd
+
+from ao_predictor.backtest import BacktestMatrix, prepare_matches, walk_forward
+from ao_predictor.synthetic import make_matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, default=150_000)
+    parser.add_argument('--trees', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=10, help="seasons before the first scored one")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    df_atp = make_matches(args.matches, start_year=1995, end_year=2024)
+    df_atp['Tourney Date'] = pd.to_datetime(df_atp['Tour Name Date'].astype(str), format='%Y%m%d')
+
+    with tempfile.TemporaryDirectory() as matrix_path:
+        start = time.perf_counter()
+        matrix = BacktestMatrix.build(prepare_matches(df_atp))
+        matrix.save(matrix_path)
+        windows = matrix.windows('season', args.warmup)
+        print(f"{matrix.n_rows:,} rows, {len(windows)} season folds, "
+              f"feature matrix built once in {time.perf_counter() - start:.2f}s\n")
+
+        print(f"{'workers':>8}{'seconds':>10}{'speedup':>10}{'AUC':>9}{'ROI':>9}")
+        baseline = None
+        reference = None
+        for n_workers in args.workers:
+            start = time.perf_counter()
+            _, pooled = walk_forward(matrix_path, windows, n_workers, args.trees, n_jobs=1)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            reference = reference or pooled
+            assert pooled == reference, "pooled metrics differ between worker counts"
+            print(f"{n_workers:>8}{elapsed:>10.1f}{baseline / elapsed:>9.2f}x"
+                  f"{pooled['roc_auc']:>9.4f}{pooled['roi']:>9.4f}")
+
+
+if __name__ == '__main__':
+    main()
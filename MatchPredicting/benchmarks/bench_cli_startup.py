@@ -0,0 +1,87 @@
+"""
+CLI cold start: import time of the package and `predict` wall time per model format.
+
+Every measurement is a fresh interpreter. Import costs come from `python -X importtime`
+(self + cumulative microseconds per module); predict is timed end to end, including
+interpreter startup, against an artifact directory and a pickled pipeline.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_cli_startup --runs 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from ao_predictor.artifact import save_artifact
+from benchmarks.common import train_synthetic_model
+
+# Modules whose presence in a predict run means the lazy imports regressed
+HEAVY_MODULES = ('pandas', 'sklearn', 'scipy')
+
+
+def import_times(args, cwd):
+    """
+    ({module: cumulative microseconds}, total microseconds) of one `python -X importtime` run.
+
+    The total sums the top-level imports only, nested ones are in their cumulative time.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=cwd, capture_output=True, text=True,
+                            check=True)
+    times = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative)
+        # One space after the separator marks a top-level import, nesting adds two per level
+        if not module.startswith('  '):
+            total += int(cumulative)
+    return times, total
+
+
+def wall_seconds(args, cwd, runs):
+    elapsed = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True, check=True)
+        elapsed.append(time.perf_counter() - start)
+    return float(np.median(elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--matches', type=int, default=20_000, help="synthetic matches the timed model is trained on")
+    args = parser.parse_args()
+
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    imports, _ = import_times(['-c', 'import ao_predictor.cli'], package_dir)
+    print(f"import ao_predictor.cli: {imports['ao_predictor.cli'] / 1000:.1f} ms cumulative")
+
+    model, _, _ = train_synthetic_model(args.matches, n_estimators=200)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pickle_path = os.path.join(tmp_dir, 'model.pkl')
+        artifact_path = os.path.join(tmp_dir, 'artifact')
+        joblib.dump(model, pickle_path)
+        save_artifact(model, artifact_path)
+
+        print(f"\n{'predict against':<18}{'wall (s)':>10}{'imports (ms)':>14}  heavy modules imported")
+        baseline = wall_seconds(['-c', 'pass'], package_dir, args.runs)
+        for name, path in (('artifact', artifact_path), ('pickle', pickle_path)):
+            predict_args = ['-m', 'ao_predictor', 'predict', '--model-path', path, '--json']
+            elapsed = wall_seconds(predict_args, package_dir, args.runs)
+            imports, total = import_times(predict_args, package_dir)
+            heavy = sorted({module.split('.')[0] for module in imports} & set(HEAVY_MODULES))
+            print(f"{name:<18}{elapsed:>10.3f}{total / 1000:>14.1f}  {', '.join(heavy) or 'none'}")
+        print(f"{'(bare python)':<18}{baseline:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
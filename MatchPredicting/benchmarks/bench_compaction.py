@@ -0,0 +1,47 @@
+"""
+Forest compaction on a synthetic model: search time and the before/after report.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_compaction --matches 50000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from ao_predictor.compaction import compact_pipeline, float32_within, measure, search
+from benchmarks.common import train_synthetic_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, default=50_000)
+    parser.add_argument('--auc-tolerance', type=float, default=0.002)
+    parser.add_argument('--log-loss-tolerance', type=float, default=0.002)
+    args = parser.parse_args()
+
+    model, X_test, y_test = train_synthetic_model(args.matches)
+
+    start = time.perf_counter()
+    baseline, candidates = search(model, X_test, y_test, args.auc_tolerance, args.log_loss_tolerance)
+    search_elapsed = time.perf_counter() - start
+    within = candidates[candidates['within']]
+    print(f"{len(candidates)} candidates scored in {search_elapsed:.1f}s, {len(within)} within tolerance")
+    print(within.head(5).to_string(index=False, float_format='{:.4f}'.format))
+
+    best = within.iloc[0]
+    max_depth = None if pd.isna(best['max_depth']) else int(best['max_depth'])
+    compacted = compact_pipeline(model, int(best['n_trees']), max_depth, int(best['min_leaf']))
+    float32 = float32_within(compacted, X_test, y_test, baseline, args.auc_tolerance, args.log_loss_tolerance)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        before = measure(model, os.path.join(tmp_dir, 'before.pkl'), os.path.join(tmp_dir, 'before'), X_test, y_test)
+        after = measure(compacted, os.path.join(tmp_dir, 'after.pkl'), os.path.join(tmp_dir, 'after'),
+                        X_test, y_test, float32=float32)
+    print("\n" + pd.DataFrame({'before': before, 'after': after}).to_string(float_format='{:,.4f}'.format))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Elo ratings: full chronological pass vs incremental update with the latest week.
+
+The incremental run loads the state saved after everything but the last week
+and rates only the new matches; its features must equal the full pass.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_elo --matches 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from ao_predictor.elo import EloRatings
+from ao_predictor.synthetic import make_matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df_atp = make_matches(args.matches)
+    df_atp['Tourney Date'] = pd.to_datetime(df_atp['Tour Name Date'].astype(str), format='%Y%m%d')
+    last_week = df_atp['Tourney Date'] > df_atp['Tourney Date'].max() - pd.Timedelta(days=7)
+    history, week = df_atp[~last_week], df_atp[last_week]
+
+    start = time.perf_counter()
+    full_features = EloRatings().update(df_atp)
+    full_elapsed = time.perf_counter() - start
+    print(f"full pass:   {len(df_atp):>10,} matches in {full_elapsed:8.2f} s "
+          f"({len(df_atp) / full_elapsed:,.0f} matches/s)")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state_path = os.path.join(tmp_dir, 'elo')
+        ratings = EloRatings()
+        history_features = ratings.update(history)
+        ratings.save(state_path)
+
+        start = time.perf_counter()
+        ratings = EloRatings.load(state_path)
+        week_features = ratings.update(week)
+        ratings.save(state_path)
+        week_elapsed = time.perf_counter() - start
+    print(f"incremental: {len(week):>10,} matches in {week_elapsed * 1000:8.2f} ms (load, update and save)")
+
+    incremental = pd.concat([history_features, week_features]).loc[df_atp.index]
+    assert np.allclose(incremental.to_numpy(), full_features.to_numpy()), "incremental features differ"
+
+
+if __name__ == '__main__':
+    main()
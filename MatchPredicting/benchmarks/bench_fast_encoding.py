@@ -0,0 +1,65 @@
+"""
+Single-prediction encoding: DataFrame + ColumnTransformer vs the CompiledEncoder fast path.
+
+Checks that the compiled encoding reproduces preprocessor.transform and
+model.predict_proba on the whole test set, then times per-request encoding.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_fast_encoding --model ao_head_to_head_predictor.pkl --csv atp.csv
+"""
+import argparse
+import time
+
+import joblib
+import numpy as np
+
+from ao_predictor.fast_encoding import FastPredictor
+from ao_predictor.features import build_match_features, build_matchup_frame, matchup_row
+from ao_predictor.loader import load_atp_csv
+from ao_predictor.training import chronological_split, clean_matches
+from benchmarks.common import train_synthetic_model
+
+
+def _median_us(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help="pickled pipeline, a synthetic one is trained when omitted")
+    parser.add_argument('--csv', help="atp.csv providing the test set for --model")
+    parser.add_argument('--repeats', type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.model:
+        model = joblib.load(args.model)
+        _, X_test, _, _, _ = chronological_split(build_match_features(clean_matches(load_atp_csv(args.csv))))
+    else:
+        model, X_test, _ = train_synthetic_model()
+
+    predictor = FastPredictor.from_pipeline(model)
+    preprocessor = model.named_steps['preprocessor']
+
+    expected = preprocessor.transform(X_test)
+    expected = expected.toarray() if hasattr(expected, 'toarray') else expected
+    np.testing.assert_allclose(predictor.encoder.encode_columns(X_test), expected, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(predictor.predict_proba(X_test), model.predict_proba(X_test))
+    rows = X_test.head(1000).to_dict('records')
+    np.testing.assert_allclose(predictor.encoder.encode_rows(rows), expected[:1000], rtol=0, atol=1e-12)
+    print(f"Parity OK on {len(X_test):,} test rows ({predictor.encoder.n_outputs} encoded columns)")
+
+    stats = ('Hard', 'The Final', 5, 1, 2, 12000, 10500, 1.5, 2.2)
+    frame_us = _median_us(lambda: preprocessor.transform(build_matchup_frame(*stats)), args.repeats)
+    compiled_us = _median_us(lambda: predictor.encoder.encode_row(matchup_row(*stats)), args.repeats)
+    print(f"\nPer-request encoding (median of {args.repeats})")
+    print(f"  DataFrame + ColumnTransformer  {frame_us:10.1f} us")
+    print(f"  dict + CompiledEncoder         {compiled_us:10.1f} us")
+
+
+if __name__ == '__main__':
+    main()
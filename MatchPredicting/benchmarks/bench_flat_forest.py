@@ -0,0 +1,75 @@
+"""
+RandomForestClassifier vs its FlatForest export: parity, load time and latency.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_flat_forest --model ao_head_to_head_predictor.pkl
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from ao_predictor.flat_forest import FlatForest
+from benchmarks.common import train_synthetic_model
+
+
+def _best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help="pickled pipeline, a synthetic one is trained when omitted")
+    parser.add_argument('--batch-rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = args.model
+        if model_path is None:
+            model_path = os.path.join(tmp_dir, 'model.pkl')
+            joblib.dump(train_synthetic_model()[0], model_path)
+
+        model = joblib.load(model_path)
+        forest = model.named_steps['classifier']
+        flat = FlatForest.from_classifier(forest)
+        flat_path = os.path.join(tmp_dir, 'forest.npz')
+        flat.save(flat_path)
+        print(f"{flat.n_trees} trees, {flat.n_nodes:,} nodes, max depth {flat.max_depth}")
+        print(f"pickle {os.path.getsize(model_path) / 1024 ** 2:.1f} MB, flat arrays {os.path.getsize(flat_path) / 1024 ** 2:.1f} MB")
+
+        # Random rows in the encoded feature space, spread around every split threshold
+        rng = np.random.default_rng(0)
+        n_features = forest.n_features_in_
+        X = rng.normal(0, 1.5, (args.batch_rows, n_features))
+        X[:, 3:] = rng.random((args.batch_rows, n_features - 3)) < 0.3
+
+        sklearn_proba = forest.predict_proba(X)
+        flat_proba = FlatForest.load(flat_path).predict_proba(X)
+        np.testing.assert_allclose(flat_proba, sklearn_proba, rtol=0, atol=1e-9)
+        print(f"Parity OK on {len(X):,} rows (max abs diff {np.abs(flat_proba - sklearn_proba).max():.2e})")
+
+        print(f"\n{'':<22}{'sklearn':>12}{'flat':>12}")
+        load_sklearn = _best_of(lambda: joblib.load(model_path), 3)
+        load_flat = _best_of(lambda: FlatForest.load(flat_path), 3)
+        print(f"{'load (ms)':<22}{load_sklearn * 1e3:>12.1f}{load_flat * 1e3:>12.1f}")
+
+        row = X[:1]
+        single_sklearn = _best_of(lambda: forest.predict_proba(row), 50)
+        single_flat = _best_of(lambda: flat.predict_proba(row), 50)
+        print(f"{'single row (ms)':<22}{single_sklearn * 1e3:>12.2f}{single_flat * 1e3:>12.2f}")
+
+        batch_sklearn = _best_of(lambda: forest.predict_proba(X), 3)
+        batch_flat = _best_of(lambda: flat.predict_proba(X), 3)
+        print(f"{f'{len(X):,} rows (s)':<22}{batch_sklearn:>12.2f}{batch_flat:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
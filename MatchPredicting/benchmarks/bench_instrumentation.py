@@ -0,0 +1,77 @@
+"""
+Cost of RunRecorder stage records against the training stages they wrap.
+
+Times empty stages to get the fixed cost of one record (clock reads, peak RSS
+reset, /proc reads), then runs a recorded synthetic training run and reports
+that cost as a share of each stage's wall time.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_instrumentation --matches 50000
+"""
+import argparse
+import time
+
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from ao_predictor.features import build_match_features
+from ao_predictor.instrumentation import RunRecorder
+from ao_predictor.synthetic import make_matches
+from ao_predictor.training import chronological_split, clean_matches, make_preprocessor
+
+
+def empty_stage_us(n_stages):
+    recorder = RunRecorder()
+    start = time.perf_counter()
+    for _ in range(n_stages):
+        with recorder.stage('empty'):
+            pass
+    return (time.perf_counter() - start) / n_stages * 1e6
+
+
+def recorded_run(n_matches, n_estimators, seed=42):
+    recorder = RunRecorder('bench')
+    with recorder.stage('load') as stage:
+        df_atp = make_matches(n_matches, seed=seed)
+        df_atp['Tourney Date'] = pd.to_datetime(df_atp['Tour Name Date'].astype(str), format='%Y%m%d')
+        stage['rows'] = len(df_atp)
+    with recorder.stage('clean') as stage:
+        df_atp = clean_matches(df_atp)
+        stage['rows'] = len(df_atp)
+    with recorder.stage('features') as stage:
+        df_processed = build_match_features(df_atp)
+        stage['rows'] = len(df_processed)
+    with recorder.stage('split', rows=len(df_processed)):
+        X_train, X_test, y_train, y_test, _ = chronological_split(df_processed)
+    model = Pipeline(steps=[('preprocessor', make_preprocessor(X_train)),
+                            ('classifier', RandomForestClassifier(n_estimators=n_estimators, random_state=seed,
+                                                                  n_jobs=-1))])
+    with recorder.stage('fit', rows=len(X_train)):
+        model.fit(X_train, y_train)
+    with recorder.stage('evaluate', rows=len(X_test)):
+        model.predict_proba(X_test)
+    return recorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, default=50_000)
+    parser.add_argument('--trees', type=int, default=50)
+    parser.add_argument('--stages', type=int, default=20_000, help="empty stages timed for the fixed cost")
+    args = parser.parse_args()
+
+    per_stage_us = empty_stage_us(args.stages)
+    print(f"fixed cost of one stage record: {per_stage_us:.1f} us")
+
+    recorder = recorded_run(args.matches, args.trees)
+    print(f"\n{recorder.summary()}")
+    print(f"\n{'stage':<12}{'overhead %':>12}")
+    for stage in recorder.stages:
+        print(f"{stage['stage']:<12}{per_stage_us / 1e6 / stage['wall_seconds'] * 100:>12.4f}")
+    total = sum(stage['wall_seconds'] for stage in recorder.stages)
+    print(f"{'whole run':<12}{per_stage_us / 1e6 * len(recorder.stages) / total * 100:>12.4f}")
+
+
+if __name__ == '__main__':
+    main()
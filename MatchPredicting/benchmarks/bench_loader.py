@@ -0,0 +1,57 @@
+"""
+atp.csv load benchmark: untyped read_csv (as before) vs typed cold load vs warm snapshot load.
+
+Every mode runs in a fresh process so the reported peak RSS belongs to that load alone.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_loader --matches 1000000
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ao_predictor.synthetic import make_matches
+
+
+def _load(mode, csv_path):
+    import pandas as pd
+
+    from ao_predictor.loader import load_atp_csv, snapshot_path
+    from ao_predictor.memory import peak_rss_mb
+
+    start = time.perf_counter()
+    if mode == 'untyped':
+        df_atp = pd.read_csv(csv_path, low_memory=False)
+        df_atp['Tourney Date'] = pd.to_datetime(df_atp['Tour Name Date'].astype(str), format='%Y%m%d')
+    else:
+        if mode == 'cold' and os.path.exists(snapshot_path(csv_path)):
+            os.remove(snapshot_path(csv_path))
+        df_atp = load_atp_csv(csv_path, verbose=False)
+    elapsed = time.perf_counter() - start
+    return elapsed, peak_rss_mb(), df_atp.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'atp.csv')
+        make_matches(args.matches).to_csv(csv_path, index=False)
+        print(f"Synthetic atp.csv: {args.matches:,} matches, {os.path.getsize(csv_path) / 1024 ** 2:.1f} MB")
+
+        ctx = multiprocessing.get_context('spawn')
+        print(f"\n{'mode':<10}{'time (s)':>10}{'peak RSS (MB)':>16}{'frame (MB)':>12}")
+        for mode in ('untyped', 'cold', 'warm'):
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                elapsed, peak, frame_mb = pool.submit(_load, mode, csv_path).result()
+            peak_text = f"{peak:.1f}" if peak is not None else "n/a"
+            print(f"{mode:<10}{elapsed:>10.3f}{peak_text:>16}{frame_mb:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""
+Model backend leaderboard on synthetic matches.
+
+Same measurements as `python -m ao_predictor.models`: fit time, pickled size,
+single-row and batch latency through FastPredictor, test AUC and log-loss.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_models --matches 150000
+"""
+import argparse
+
+from ao_predictor.features import build_match_features
+from ao_predictor.models import MODEL_BACKENDS, format_leaderboard, leaderboard
+from ao_predictor.training import chronological_split
+from benchmarks.common import synthetic_matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, default=150_000)
+    parser.add_argument('--backends', nargs='+', choices=sorted(MODEL_BACKENDS))
+    args = parser.parse_args()
+
+    df_processed = build_match_features(synthetic_matches(args.matches))
+    X_train, X_test, y_train, y_test, _ = chronological_split(df_processed)
+    print(f"{len(X_train):,} training rows, {len(X_test):,} test rows\n")
+    print(format_leaderboard(leaderboard(X_train, X_test, y_train, y_test, args.backends)))
+
+
+if __name__ == '__main__':
+    main()
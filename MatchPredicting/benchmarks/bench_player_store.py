@@ -0,0 +1,89 @@
+"""
+Player store: as-of lookup latency, and reader latency while snapshots are reloaded.
+
+Reader threads resolve random players as of random dates while the main thread
+rewrites the snapshot and refreshes the StoreSnapshot in a loop. Reader p99
+should stay flat because a refresh never holds a lock readers need.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_player_store --matches 1000000 --readers 4 --reloads 10
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from ao_predictor.player_store import PlayerStore, StoreSnapshot
+from benchmarks.common import synthetic_matches
+
+
+def _read(snapshot, names, dates, latencies, stop):
+    rng = np.random.default_rng(threading.get_ident() % 2 ** 32)
+    while not stop.is_set():
+        name, date = names[rng.integers(len(names))], dates[rng.integers(len(dates))]
+        start = time.perf_counter()
+        snapshot.store.lookup(name, date, fill=True)
+        latencies.append(time.perf_counter() - start)
+
+
+def _percentiles(latencies):
+    latencies = np.array(latencies) * 1e6
+    return f"p50 {np.percentile(latencies, 50):6.1f} us   p99 {np.percentile(latencies, 99):6.1f} us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=100_000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--reloads', type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    # Built from the matches as loaded, like `python -m ao_predictor.player_store`
+    store = PlayerStore.build(synthetic_matches(args.matches, clean=False))
+    print(f"built {store.n_observations:,} observations for {len(store.names):,} players "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    rng = np.random.default_rng(0)
+    names = store.names
+    dates = [str(day) for day in np.datetime64('2001-01-01') + rng.integers(0, 9000, 1000)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'players')
+        store.save(path)
+        snapshot = StoreSnapshot(path)
+
+        latencies = []
+        for name, date in zip(rng.choice(names, args.lookups), rng.choice(dates, args.lookups)):
+            start = time.perf_counter()
+            snapshot.store.lookup(name, date, fill=True)
+            latencies.append(time.perf_counter() - start)
+        print(f"single thread:          {_percentiles(latencies)}")
+
+        stop = threading.Event()
+        reader_latencies = [[] for _ in range(args.readers)]
+        readers = [threading.Thread(target=_read, args=(snapshot, names, dates, latencies, stop))
+                   for latencies in reader_latencies]
+        for reader in readers:
+            reader.start()
+        reload_times = []
+        for _ in range(args.reloads):
+            start = time.perf_counter()
+            store.save(path)
+            snapshot.refresh()
+            reload_times.append(time.perf_counter() - start)
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+    all_latencies = [latency for latencies in reader_latencies for latency in latencies]
+    print(f"{args.readers} readers, {args.reloads} reloads: {_percentiles(all_latencies)}   "
+          f"({len(all_latencies):,} lookups, {np.mean(reload_times) * 1000:.0f} ms per save + reload)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Prediction service benchmark: latency and throughput of /predictmenswinner and its batch endpoint.
+
+Requests go through the ASGI app in-process (FastAPI TestClient), so JSON parsing
+and validation are included but network time is not.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_service --model ao_head_to_head_predictor.pkl
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from benchmarks.common import train_synthetic_model
+
+
+def _random_match(rng):
+    return {
+        'player1': 'Player A',
+        'player2': 'Player B',
+        'surface': str(rng.choice(['Hard', 'Clay', 'Grass'])),
+        'round': str(rng.choice(['1st Round', 'Quarterfinals', 'The Final'])),
+        'best_of': str(rng.choice([3, 5])),
+        'player1Odds': f"{rng.uniform(1.1, 4):.2f}",
+        'player2Odds': f"{rng.uniform(1.1, 4):.2f}",
+        'player1Stats': {'rank': str(rng.integers(1, 300)), 'points': str(rng.integers(100, 12000)), 'date': '2026-01-01'},
+        'player2Stats': {'rank': str(rng.integers(1, 300)), 'points': str(rng.integers(100, 12000)), 'date': '2026-01-01'},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help="pickled pipeline, a synthetic one is trained when omitted")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 32, 1024])
+    parser.add_argument('--requests', type=int, default=100, help="requests timed per batch size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = args.model
+        if model_path is None:
+            model_path = os.path.join(tmp_dir, 'model.pkl')
+            joblib.dump(train_synthetic_model()[0], model_path)
+
+        # The service reads its configuration at import time
+        os.environ['AO_MODEL_PATH'] = model_path
+        from fastapi.testclient import TestClient
+
+        from ao_predictor.service import app
+
+        rng = np.random.default_rng(0)
+        with TestClient(app) as client:
+            print(f"{'batch':>6}{'p50 (ms)':>10}{'p99 (ms)':>10}{'matchups/s':>14}")
+            for batch_size in args.batch_sizes:
+                if batch_size == 1:
+                    url, payload = '/predictmenswinner', _random_match(rng)
+                else:
+                    url, payload = '/predictmenswinner/batch', {'matches': [_random_match(rng) for _ in range(batch_size)]}
+
+                client.post(url, json=payload).raise_for_status()
+                latencies = []
+                for _ in range(args.requests):
+                    start = time.perf_counter()
+                    client.post(url, json=payload).raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+
+                latencies = np.array(latencies)
+                print(f"{batch_size:>6}{np.percentile(latencies, 50) * 1e3:>10.2f}{np.percentile(latencies, 99) * 1e3:>10.2f}"
+                      f"{batch_size * len(latencies) / latencies.sum():>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Streaming training: peak RSS as the synthetic atp.csv grows.
+
+Each CSV is written block by block by synthetic.write_atp_csv, so the benchmark
+itself never holds it whole. Every run happens in a fresh process so the
+reported peak RSS belongs to that run alone. The in-memory reference (load the
+CSV and build the feature frame, before any model is fitted) runs up to
+--in-memory-max matches.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_streaming --matches 1000000 5000000 --chunksize 200000
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ao_predictor.synthetic import write_atp_csv
+
+
+def _streaming(csv_path, chunksize):
+    from ao_predictor.memory import peak_rss_mb
+    from ao_predictor.streaming import train_streaming
+
+    start = time.perf_counter()
+    _, metrics = train_streaming(csv_path, chunksize, verbose=False)
+    return time.perf_counter() - start, peak_rss_mb(), metrics['roc_auc']
+
+
+def _in_memory(csv_path):
+    from ao_predictor.features import build_match_features
+    from ao_predictor.loader import load_atp_csv
+    from ao_predictor.memory import peak_rss_mb
+    from ao_predictor.training import clean_matches
+
+    start = time.perf_counter()
+    build_match_features(clean_matches(load_atp_csv(csv_path, use_snapshot=False, verbose=False)))
+    return time.perf_counter() - start, peak_rss_mb(), float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    parser.add_argument('--chunksize', type=int, default=200_000)
+    parser.add_argument('--in-memory-max', type=int, default=1_000_000,
+                        help="largest input the in-memory reference is run on")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context('spawn')
+    print(f"{'mode':<12}{'matches':>12}{'CSV (MB)':>10}{'time (s)':>10}{'peak RSS (MB)':>15}{'AUC':>8}")
+    for n_matches in args.matches:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, 'atp.csv')
+            write_atp_csv(csv_path, n_matches)
+            csv_mb = os.path.getsize(csv_path) / 1024 ** 2
+
+            runs = [('streaming', _streaming, (csv_path, args.chunksize))]
+            if n_matches <= args.in_memory_max:
+                runs.append(('in-memory', _in_memory, (csv_path,)))
+            for mode, run, run_args in runs:
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    elapsed, peak, auc = pool.submit(run, *run_args).result()
+                peak_text = f"{peak:.1f}" if peak is not None else "n/a"
+                print(f"{mode:<12}{n_matches:>12,}{csv_mb:>10.0f}{elapsed:>10.1f}{peak_text:>15}{auc:>8.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Predictor stage benchmarks on synthetic atp.csv files, compared against a saved baseline.
+
+For every --matches size a synthetic atp.csv is written with
+synthetic.write_atp_csv, then each stage is timed in this process:
+
+    load            typed CSV parse (load_atp_csv without the Parquet snapshot)
+    features        clean_matches + build_match_features
+    fit             models.make_model('random_forest') with --trees trees
+    predict_single  FastPredictor.predict_proba_rows on one row, per call
+    predict_batch   FastPredictor.predict_proba on up to --batch-rows test rows
+
+A stage's time is the fastest of its repeats, the least noisy estimate of what
+the code costs. Results are compared with the baseline file: a stage slower
+than the baseline by more than --tolerance is flagged and the exit status is 1,
+so CI can gate on it. A missing baseline is recorded from this run, and
+--update-baseline replaces an existing one. Baselines are per machine.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_suite --matches 50000 200000 [--baseline benchmarks/baseline.json] [--update-baseline]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+
+from ao_predictor.fast_encoding import FastPredictor
+from ao_predictor.features import build_match_features
+from ao_predictor.instrumentation import RunRecorder
+from ao_predictor.loader import load_atp_csv
+from ao_predictor.models import make_model
+from ao_predictor.synthetic import write_atp_csv
+from ao_predictor.training import chronological_split, clean_matches
+
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+
+
+def _timed(recorder, name, repeats, rows, run):
+    """Run repeats times under recorder stages, returns (result of the last run, stage record)"""
+    records = []
+    for _ in range(repeats):
+        with recorder.stage(name, rows=rows) as stage:
+            result = run()
+        records.append(stage)
+    fastest = min(records, key=lambda record: record['wall_seconds'])
+    walls = sorted(record['wall_seconds'] for record in records)
+    return result, {
+        'rows': rows,
+        'seconds': fastest['wall_seconds'],
+        'median_seconds': walls[len(walls) // 2],
+        'cpu_seconds': fastest['cpu_seconds'],
+        'peak_rss_mb': max((record['peak_rss_mb'] or 0) for record in records),
+    }
+
+
+def run_size(csv_path, n_matches, args):
+    """{stage: result} for one synthetic file"""
+    recorder = RunRecorder('bench_suite')
+    results = {}
+
+    df_atp, results['load'] = _timed(recorder, 'load', args.repeats, n_matches,
+                                     lambda: load_atp_csv(csv_path, use_snapshot=False, verbose=False))
+    df_processed, results['features'] = _timed(recorder, 'features', args.repeats, n_matches,
+                                               lambda: build_match_features(clean_matches(df_atp)))
+
+    X_train, X_test, y_train, _, _ = chronological_split(df_processed)
+
+    def fit():
+        # The CLI's backend, only the tree count differs
+        model = make_model('random_forest', X_train, seed=42, n_jobs=-1)
+        model.set_params(classifier__n_estimators=args.trees)
+        return model.fit(X_train, y_train)
+    model, results['fit'] = _timed(recorder, 'fit', args.fit_repeats, len(X_train), fit)
+
+    predictor = FastPredictor.from_pipeline(model, flatten=True)
+    rows = X_test.head(args.single_calls).to_dict('records')
+
+    def predict_single():
+        for row in rows:
+            predictor.predict_proba_rows([row])
+    _, single = _timed(recorder, 'predict_single', args.repeats, len(rows), predict_single)
+    # Per call, so the number does not depend on --single-calls
+    single['seconds'] /= len(rows)
+    single['median_seconds'] /= len(rows)
+    single['cpu_seconds'] /= len(rows)
+    results['predict_single'] = single
+
+    X_batch = X_test.head(args.batch_rows)
+    _, results['predict_batch'] = _timed(recorder, 'predict_batch', args.repeats, len(X_batch),
+                                         lambda: predictor.predict_proba(X_batch))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """[(key, seconds, baseline seconds or None, status)], status is '', 'REGRESSION', 'faster' or 'new'"""
+    rows = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            rows.append((key, result['seconds'], None, 'new'))
+            continue
+        ratio = result['seconds'] / previous['seconds']
+        status = 'REGRESSION' if ratio > 1 + tolerance else 'faster' if ratio < 1 - tolerance else ''
+        rows.append((key, result['seconds'], previous['seconds'], status))
+    return rows
+
+
+def _format_seconds(seconds):
+    return f"{seconds * 1e6:.0f} us" if seconds < 1e-2 else f"{seconds:.3f} s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, nargs='+', default=[50_000, 200_000])
+    parser.add_argument('--trees', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--fit-repeats', type=int, default=1)
+    parser.add_argument('--single-calls', type=int, default=200, help="one-row predictions per predict_single repeat")
+    parser.add_argument('--batch-rows', type=int, default=10_000)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help="replace the baseline with this run")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="relative slowdown flagged as a regression, default 20%%")
+    args = parser.parse_args()
+
+    config = {'trees': args.trees, 'repeats': args.repeats, 'fit_repeats': args.fit_repeats,
+              'single_calls': args.single_calls, 'batch_rows': args.batch_rows}
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_matches in args.matches:
+            csv_path = os.path.join(tmp_dir, f"atp_{n_matches}.csv")
+            size = write_atp_csv(csv_path, n_matches)
+            print(f"Synthetic atp.csv: {n_matches:,} matches, {size / 1024 ** 2:.1f} MB")
+            for stage, result in run_size(csv_path, n_matches, args).items():
+                results[f"{stage}@{n_matches}"] = result
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['config'] != config:
+            print(f"\nWarning: baseline '{args.baseline}' was recorded with {baseline['config']}, "
+                  f"this run uses {config}; timings are not comparable")
+        if baseline['host'] != platform.node():
+            print(f"\nWarning: baseline '{args.baseline}' was recorded on {baseline['host']}")
+
+    comparable = baseline is not None and baseline['config'] == config
+    rows = compare(results, baseline['results'] if comparable else {}, args.tolerance)
+    print(f"\n{'stage@matches':<26}{'time':>12}{'baseline':>12}{'change':>9}{'peak MB':>9}  status")
+    for key, seconds, previous, status in rows:
+        change = f"{seconds / previous - 1:+.0%}" if previous else ''
+        previous_text = _format_seconds(previous) if previous else ''
+        print(f"{key:<26}{_format_seconds(seconds):>12}{previous_text:>12}{change:>9}"
+              f"{results[key]['peak_rss_mb']:>9.0f}  {status}")
+
+    if baseline is None or args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                'host': platform.node(),
+                'python': platform.python_version(),
+                'config': config,
+                'results': results,
+            }, f, indent=2)
+        print(f"\nBaseline written to '{args.baseline}'")
+
+    regressions = [key for key, _, _, status in rows if status == 'REGRESSION']
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Doubled (mirrored rows) vs antisymmetric (one row per match) training on the chronological split.
+
+Each mode trains in a fresh process so peak RSS is not shared between them. Both
+models are scored per match on the same test matches: the probability that
+Player_1 wins, evaluated from Player_1's perspective.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_symmetric --csv atp.csv
+    python -m benchmarks.bench_symmetric --matches 500000
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ao_predictor.synthetic import make_matches
+
+
+def _train_and_score(mode, csv_path, split_date):
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import log_loss, roc_auc_score
+    from sklearn.pipeline import Pipeline
+
+    from ao_predictor.features import build_match_features
+    from ao_predictor.loader import load_atp_csv
+    from ao_predictor.memory import peak_rss_mb
+    from ao_predictor.symmetric import build_canonical_features, predict_proba_symmetric
+    from ao_predictor.training import chronological_split, clean_matches, feature_frame, make_preprocessor
+
+    df_atp = clean_matches(load_atp_csv(csv_path, verbose=False))
+    if mode == 'antisymmetric':
+        df_processed = build_canonical_features(df_atp)
+    else:
+        df_processed = build_match_features(df_atp)
+    X_train, _, y_train, _, _ = chronological_split(df_processed, split_date)
+
+    model = Pipeline(steps=[('preprocessor', make_preprocessor(X_train)),
+                            ('classifier', RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=-1))])
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    peak = peak_rss_mb()
+
+    # Per-match evaluation from Player_1's perspective (the even rows of the doubled frame)
+    test_matches = df_atp[df_atp['Tourney Date'] >= pd.to_datetime(split_date)]
+    X_eval, y_eval = feature_frame(build_match_features(test_matches).iloc[0::2])
+    if mode == 'antisymmetric':
+        proba = predict_proba_symmetric(model, X_eval)[:, 1]
+    else:
+        proba = model.predict_proba(X_eval)[:, 1]
+
+    return {
+        'train_rows': len(X_train),
+        'fit_seconds': fit_seconds,
+        'peak_rss_mb': peak,
+        'auc': roc_auc_score(y_eval, proba),
+        'log_loss': log_loss(y_eval, proba),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', help="atp.csv to use, a synthetic file is generated when omitted")
+    parser.add_argument('--matches', type=int, default=200_000, help="synthetic matches when --csv is not given")
+    parser.add_argument('--split-date', default='2024-01-01')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = args.csv
+        if csv_path is None:
+            csv_path = os.path.join(tmp_dir, 'atp.csv')
+            make_matches(args.matches).to_csv(csv_path, index=False)
+
+        ctx = multiprocessing.get_context('spawn')
+        print(f"{'mode':<15}{'train rows':>12}{'fit (s)':>10}{'peak RSS (MB)':>16}{'AUC':>8}{'log-loss':>10}")
+        for mode in ('doubled', 'antisymmetric'):
+            # Pool workers are daemonic and would stop the forest's n_jobs=-1 from forking
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                result = pool.submit(_train_and_score, mode, csv_path, args.split_date).result()
+            peak = f"{result['peak_rss_mb']:.1f}" if result['peak_rss_mb'] is not None else "n/a"
+            print(f"{mode:<15}{result['train_rows']:>12,}{result['fit_seconds']:>10.2f}{peak:>16}"
+                  f"{result['auc']:>8.4f}{result['log_loss']:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Hyperparameter search: successive halving vs evaluating every configuration on full folds.
+
+Both runs search the same sampled configurations over the same memory-mapped
+feature matrix and time-ordered folds; halving should reach a comparable best
+log-loss for a fraction of the fold work.
+
+Run from MatchPredicting/:
+    python -m benchmarks.bench_tuning --matches 20000 --trials 9 --folds 3 --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from ao_predictor.backtest import BacktestMatrix, prepare_matches
+from ao_predictor.synthetic import make_matches
+from ao_predictor.training import DEFAULT_SPLIT_DATE
+from ao_predictor.tuning import (SEARCH_SPACES, best_config, holdout_start, sample_configs, successive_halving,
+                                 time_series_folds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, default=20_000)
+    parser.add_argument('--backend', choices=sorted(SEARCH_SPACES), default='random_forest')
+    parser.add_argument('--trials', type=int, default=9)
+    parser.add_argument('--folds', type=int, default=3)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    df_atp = make_matches(args.matches)
+    df_atp['Tourney Date'] = pd.to_datetime(df_atp['Tour Name Date'].astype(str), format='%Y%m%d')
+    configs = sample_configs(SEARCH_SPACES[args.backend], args.trials)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        matrix_path = os.path.join(tmp_dir, 'matrix')
+        matrix = BacktestMatrix.build(prepare_matches(df_atp))
+        matrix.save(matrix_path)
+        folds = time_series_folds(matrix, args.folds, end=holdout_start(matrix, DEFAULT_SPLIT_DATE))
+
+        print(f"{'search':<20}{'wall (s)':>10}{'fold work (s)':>15}{'fits':>6}{'best log-loss':>15}  best config")
+        for name, n_rungs in (('successive halving', None), ('full folds', 1)):
+            start = time.perf_counter()
+            results = successive_halving(matrix_path, args.backend, configs, folds, n_rungs=n_rungs,
+                                         n_workers=args.workers, verbose=False)
+            elapsed = time.perf_counter() - start
+            last_rung = results[results['rung'] == results['rung'].max()]
+            print(f"{name:<20}{elapsed:>10.1f}{results['seconds'].sum():>15.1f}{int(results['folds'].sum()):>6}"
+                  f"{last_rung['log_loss'].min():>15.4f}  {best_config(results)}")
+
+
+if __name__ == '__main__':
+    main()
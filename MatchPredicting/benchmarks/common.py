@@ -0,0 +1,29 @@
+"""Shared setup for the benchmarks: cleaned synthetic matches and a pipeline trained on them."""
+import pandas as pd
+
+from ao_predictor.features import build_match_features
+from ao_predictor.models import make_model
+from ao_predictor.synthetic import make_matches
+from ao_predictor.training import chronological_split, clean_matches
+
+
+def synthetic_matches(n_matches, seed=42, clean=True):
+    """Synthetic matches after the same cleaning the predictor applies, or as loaded with clean=False"""
+    df_atp = make_matches(n_matches, seed=seed)
+    df_atp['Tourney Date'] = pd.to_datetime(df_atp['Tour Name Date'].astype(str), format='%Y%m%d')
+    return clean_matches(df_atp) if clean else df_atp
+
+
+def train_synthetic_model(n_matches=50_000, n_estimators=None, seed=42):
+    """
+    Train the CLI's random forest backend on synthetic data, returns (model, X_test, y_test).
+
+    n_estimators overrides the backend's tree count.
+    """
+    df_processed = build_match_features(synthetic_matches(n_matches, seed))
+    X_train, X_test, y_train, y_test, _ = chronological_split(df_processed)
+    model = make_model('random_forest', X_train, seed=seed, n_jobs=-1)
+    if n_estimators is not None:
+        model.set_params(classifier__n_estimators=n_estimators)
+    model.fit(X_train, y_train)
+    return model, X_test, y_test
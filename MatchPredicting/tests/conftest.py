@@ -0,0 +1,23 @@
+"""
+Shared fixtures: a small pipeline trained on synthetic matches.
+
+Run from MatchPredicting/:
+    python -m pytest tests
+"""
+import pytest
+
+from ao_predictor.features import build_match_features
+from ao_predictor.models import make_model
+from ao_predictor.training import chronological_split
+from benchmarks.common import synthetic_matches
+
+
+@pytest.fixture(scope='session')
+def trained_model():
+    """(model, X_test) of a 20-tree random forest on 5,000 synthetic matches"""
+    df_processed = build_match_features(synthetic_matches(5_000))
+    X_train, X_test, y_train, _, _ = chronological_split(df_processed)
+    model = make_model('random_forest', X_train, seed=42, n_jobs=1)
+    model.set_params(classifier__n_estimators=20)
+    model.fit(X_train, y_train)
+    return model, X_test
@@ -0,0 +1,35 @@
+"""CompiledEncoder and FastPredictor against the fitted Pipeline on the whole test set."""
+import numpy as np
+
+from ao_predictor.fast_encoding import FastPredictor
+from ao_predictor.symmetric import predict_proba_symmetric
+
+
+def _dense(matrix):
+    return matrix.toarray() if hasattr(matrix, 'toarray') else matrix
+
+
+def test_encode_rows_matches_preprocessor(trained_model):
+    model, X_test = trained_model
+    predictor = FastPredictor.from_pipeline(model)
+    expected = _dense(model.named_steps['preprocessor'].transform(X_test))
+    rows = X_test.to_dict('records')
+    np.testing.assert_allclose(predictor.encoder.encode_rows(rows), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(predictor.encoder.encode_columns(X_test), expected, rtol=0, atol=1e-12)
+
+
+def test_predict_proba_rows_matches_pipeline(trained_model):
+    model, X_test = trained_model
+    rows = X_test.to_dict('records')
+    expected = model.predict_proba(X_test)
+    for flatten in (False, True):
+        predictor = FastPredictor.from_pipeline(model, flatten=flatten)
+        np.testing.assert_allclose(predictor.predict_proba_rows(rows), expected, rtol=0, atol=1e-12)
+        np.testing.assert_allclose(predictor.predict_proba(X_test), expected, rtol=0, atol=1e-12)
+
+
+def test_symmetric_rows_match_predict_proba_symmetric(trained_model):
+    model, X_test = trained_model
+    predictor = FastPredictor.from_pipeline(model, flatten=True)
+    np.testing.assert_allclose(predictor.predict_proba_rows(X_test.to_dict('records'), symmetric=True),
+                               predict_proba_symmetric(model, X_test), rtol=0, atol=1e-12)
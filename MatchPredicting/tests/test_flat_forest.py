@@ -0,0 +1,31 @@
+"""FlatForest export against the RandomForestClassifier it was built from."""
+import os
+
+import numpy as np
+
+from ao_predictor.flat_forest import FlatForest
+
+
+def test_flat_forest_matches_sklearn(trained_model, tmp_path):
+    model, X_test = trained_model
+    forest = model.named_steps['classifier']
+    X = model.named_steps['preprocessor'].transform(X_test)
+    X = X.toarray() if hasattr(X, 'toarray') else X
+    expected = forest.predict_proba(X)
+
+    flat = FlatForest.from_classifier(forest)
+    np.testing.assert_allclose(flat.predict_proba(X), expected, rtol=0, atol=1e-12)
+
+    path = os.path.join(tmp_path, 'forest.npz')
+    flat.save(path)
+    np.testing.assert_allclose(FlatForest.load(path).predict_proba(X), expected, rtol=0, atol=1e-12)
+
+
+def test_flat_forest_matches_sklearn_around_thresholds(trained_model):
+    forest = trained_model[0].named_steps['classifier']
+    # Random rows in the encoded feature space, spread around every split threshold
+    rng = np.random.default_rng(0)
+    X = rng.normal(0, 1.5, (5_000, forest.n_features_in_))
+    X[:, 3:] = rng.random((5_000, forest.n_features_in_ - 3)) < 0.3
+    np.testing.assert_allclose(FlatForest.from_classifier(forest).predict_proba(X), forest.predict_proba(X),
+                               rtol=0, atol=1e-12)